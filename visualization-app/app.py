@@ -1,11 +1,26 @@
+import uuid
 import streamlit as st
-import json
-import io
-from utils.networkx_utils import NetworkXGraphBuilder
+from utils.networkx_utils import NetworkXGraphBuilder, layout_signature
+from utils.node_filter import NodeFilter, INTERACTIVE_ELEMENT_TYPES
+from utils.graph_sampler import GraphSampler
+from utils.layout_cache import LayoutCache
+from utils.layout_precompute import LayoutPrecomputer
+from utils.crawl_workspace import CrawlWorkspace, MERGED_VIEW
+from utils.crawl_ingest import ingest_crawls
+from utils.crawl_archive import UPLOAD_TYPES
+from utils.node_columns import NodeColumnTable, NUMERIC_COLUMNS, STRING_COLUMNS
+from utils.filter_expression import compile_filter, FilterSyntaxError, SavedFilters
 from components.graph_visualizer import InteractiveGraphVisualizer
 from components.node_analyzer import NodeAnalyzer
 from components.export_manager import ExportManager
-from config import AVAILABLE_LAYOUTS, MAX_NODES_DISPLAY
+from components.journey_panel import JourneyPanel
+from components.store_panel import AnalysisStorePanel
+from components.throughput_panel import ThroughputPanel
+from components.neighborhood_panel import NeighborhoodPanel, explore_neighborhood
+from utils.analysis_store import AnalysisStore
+from utils.journey_analysis import JourneyAnalyzer
+from utils.crawl_throughput import CrawlThroughput
+from config import AVAILABLE_LAYOUTS, MAX_NODES_DISPLAY, SAMPLING_STRATEGIES, LAYOUT_MAX_NODES
 
 st.set_page_config(
     page_title="AutoTestAI Graph Analyzer",
@@ -14,31 +29,120 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def safe_json_loader(uploaded_file):
-    """Ultra-safe JSON loader that handles all edge cases"""
+def safe_json_loader(uploaded_file) -> list:
+    """Decode and normalize every crawl in an upload (plain, .json.gz, .json.zst or .zip) in one
+    streaming pass; malformed records are counted, not raised. One result per crawl."""
+    results = []
     try:
-        uploaded_file.seek(0)
-        raw_content = uploaded_file.read()
-        
-        if isinstance(raw_content, bytes):
-            content_str = raw_content.decode('utf-8')
-        else:
-            content_str = str(raw_content)
-        
-        data = json.loads(content_str)
-        
-        return {
-            'success': True,
-            'data': data,
-            'error': None
-        }
-        
+        for name, data in ingest_crawls(uploaded_file, uploaded_file.name):
+            results.append({
+                'name': name,
+                'success': True,
+                'data': data,
+                'error': None
+            })
     except Exception as e:
-        return {
+        results.append({
+            'name': uploaded_file.name,
             'success': False,
             'data': None,
             'error': str(e)
-        }
+        })
+    if not results:
+        results.append({
+            'name': uploaded_file.name,
+            'success': False,
+            'data': None,
+            'error': "no crawler output (.json, .json.gz or .json.zst) found in the archive"
+        })
+    return results
+
+def load_workspace(uploaded_files) -> tuple:
+    """Keep parsed crawls in the session workspace; only new or changed uploads are parsed"""
+    workspace = st.session_state.get('workspace')
+    if workspace is None:
+        workspace = CrawlWorkspace()
+        st.session_state['workspace'] = workspace
+    
+    uploads = {f.name: f for f in uploaded_files}
+    for name in workspace.crawl_names():
+        crawl = workspace.crawls[name]
+        if crawl['source'] not in uploads or uploads[crawl['source']].size != crawl['source_size']:
+            workspace.remove_crawl(name)
+    loaded_sources = {workspace.crawls[name]['source'] for name in workspace.crawl_names()}
+    
+    errors, warnings = [], []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.name in loaded_sources:
+            continue
+        for result in safe_json_loader(uploaded_file):
+            if not result['success']:
+                errors.append(f"{result['name']}: {result['error']}")
+                continue
+            report = result['data']['report']
+            if report.has_issues:
+                warnings.append(f"{result['name']}: {report.summary()}")
+            workspace.add_crawl(result['name'], result['data'], source_size=uploaded_file.size, source=uploaded_file.name)
+    
+    return workspace, errors, warnings
+
+def get_column_table(nodes):
+    """Column table for the current view, rebuilt only when the view's node list changes"""
+    cached = st.session_state.get('column_table')
+    if cached is None or cached[0] is not nodes:
+        cached = (nodes, NodeColumnTable(nodes))
+        st.session_state['column_table'] = cached
+    return cached[1]
+
+def get_graph_builder(nodes, edges):
+    """Full graph of the current crawl view, built once; filters take views of it"""
+    cached = st.session_state.get('graph_builder')
+    if cached is None or cached[0] is not nodes or cached[1] is not edges:
+        builder = NetworkXGraphBuilder(nodes, edges)
+        builder.build_graph()
+        cached = (nodes, edges, builder)
+        st.session_state['graph_builder'] = cached
+    return cached[2]
+
+@st.cache_resource
+def get_layout_precomputer():
+    """Background layout worker pool shared by every session; jobs are keyed by session"""
+    return LayoutPrecomputer(LayoutCache())
+
+def get_session_key() -> str:
+    return st.session_state.setdefault('session_key', uuid.uuid4().hex)
+
+def get_layout_sample(view, nodes, edges, strategy):
+    """Sampled sub-view that large views are laid out on, drawn again only when the view or strategy changes"""
+    key = (view.builder, view.positions.tobytes(), strategy)
+    cached = st.session_state.get('layout_sample')
+    if cached is None or cached[0] != key:
+        sampler = GraphSampler(nodes, edges, csr=view.to_csr())
+        cached = (key, view.restrict(sampler.select(strategy, MAX_NODES_DISPLAY)))
+        st.session_state['layout_sample'] = cached
+    return cached[1]
+
+def get_visualizer(view, layout_view, layout_type, cache):
+    """Layout and spatial index of the displayed view, kept across reruns so panning and zooming only re-render"""
+    key = (view.builder, view.positions.tobytes(), layout_view.positions.tobytes(), getattr(view, 'center', None), layout_type)
+    cached = st.session_state.get('visualizer')
+    if cached is None or cached[0] != key:
+        positions = view.get_layout_positions(layout_type, cache=cache, sample=layout_view)
+        cached = (key, InteractiveGraphVisualizer(view.G, positions, view.node_store, view=view))
+        st.session_state['visualizer'] = cached
+    return cached[1]
+
+def get_journey_analyzer(nodes, edges):
+    """One analyzer (and its BFS tree cache) per crawl view, reused across reruns"""
+    cached = st.session_state.get('journey_analyzer')
+    if cached is None or cached[0] is not nodes or cached[1] is not edges:
+        cached = (nodes, edges, JourneyAnalyzer(nodes, edges))
+        st.session_state['journey_analyzer'] = cached
+    return cached[2]
+
+@st.cache_resource
+def get_analysis_store():
+    return AnalysisStore()
 
 def main():
     st.title("🕸️ AutoTestAI Smart Crawler - Graph Analyzer")
@@ -48,15 +152,28 @@ def main():
     with st.sidebar:
         st.header("Configuration")
         
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Upload crawler_output.json", 
-            type="json",
-            help="Select the JSON file exported from the Chrome extension"
+            type=UPLOAD_TYPES,
+            accept_multiple_files=True,
+            help="Select one or more JSON files exported from the Chrome extension (e.g. one per role or session). "
+                 ".json.gz, .json.zst and .zip archives of them are decompressed while parsing"
         )
         
-        if uploaded_file:
-            st.write(f"📁 File: {uploaded_file.name}")
-            st.write(f"📏 Size: {uploaded_file.size} bytes")
+        if uploaded_files:
+            for uploaded_file in uploaded_files:
+                st.write(f"📁 File: {uploaded_file.name} ({uploaded_file.size} bytes)")
+            
+            # Parsed here so the view list covers every crawl inside an archive
+            with st.spinner("🔄 Processing uploaded files..."):
+                workspace, load_errors, load_warnings = load_workspace(uploaded_files)
+            
+            crawl_view = st.selectbox(
+                "Crawl View",
+                workspace.view_names() or [MERGED_VIEW],
+                index=0,
+                help="Merged combines all files: nodes by DOM hash with provenance, repeated edges as weights"
+            )
             
             layout_type = st.selectbox(
                 "Graph Layout",
@@ -64,6 +181,23 @@ def main():
                 index=0,
                 help="Choose how the graph nodes should be arranged"
             )
+            # Filled once the view is known: background layout progress
+            layout_status = st.empty()
+            neighborhood_mode = st.toggle(
+                "Neighborhood mode",
+                key="ego_mode",
+                help="Show only the k-hop neighborhood of one page instead of the whole graph"
+            )
+            
+            st.subheader("Viewport")
+            zoom = st.select_slider(
+                "Zoom",
+                options=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+                value=1,
+                help="Zoomed out, pages and edges are aggregated into clusters; zoomed in, hover text and labels are added"
+            )
+            center_x = st.slider("Pan X", 0.0, 1.0, 0.5, 0.01)
+            center_y = st.slider("Pan Y", 0.0, 1.0, 0.5, 0.01)
             
             st.subheader("Filters")
             role_filter = st.multiselect(
@@ -74,36 +208,67 @@ def main():
             
             show_simulated = st.checkbox("Show Simulated Nodes", value=True)
             
+            sampling_strategy = st.selectbox(
+                "Sampling Strategy",
+                SAMPLING_STRATEGIES,
+                index=0,
+                help=f"How to pick the {MAX_NODES_DISPLAY} nodes a larger view is laid out on: BFS from the entry state, "
+                     "stratified by role and depth, or forest-fire sampling"
+            )
+            
             # Interactive Elements Filter
             st.subheader("Interactive Elements")
             interactive_filter = st.multiselect(
                 "Filter by Element Type",
-                ["Buttons", "Checkboxes", "Dropdowns", "Draggables", "Resizables", "Selectables", "Sortables"],
-                default=["Buttons", "Checkboxes", "Dropdowns", "Draggables", "Resizables", "Selectables", "Sortables"],
+                INTERACTIVE_ELEMENT_TYPES,
+                default=INTERACTIVE_ELEMENT_TYPES,
                 help="Filter nodes by interactive elements found on the page"
             )
+            
+            # Filter Expression
+            st.subheader("Filter Expression")
+            saved_filters = SavedFilters()
+            saved = saved_filters.all()
+            saved_name = st.selectbox("Saved Filters", ["(none)"] + sorted(saved))
+            expression_source = st.text_input(
+                "Expression",
+                value=saved.get(saved_name, ""),
+                placeholder='depth <= 3 and forms > 0 and url ~ "/checkout"',
+                help=f"Fields: {', '.join(sorted(list(NUMERIC_COLUMNS) + list(STRING_COLUMNS)))}. "
+                     "Operators: ==, !=, <, <=, >, >=, ~ / !~ (regex), in [...], and, or, not"
+            )
+            filter_expression = None
+            if expression_source.strip():
+                try:
+                    filter_expression = compile_filter(expression_source)
+                except FilterSyntaxError as e:
+                    st.error(f"Invalid filter: {e}")
+            
+            save_name = st.text_input("Save as", placeholder="Filter name")
+            save_col, delete_col = st.columns(2)
+            if save_col.button("Save Filter", disabled=filter_expression is None or not save_name.strip()):
+                saved_filters.save(save_name.strip(), expression_source)
+                st.rerun()
+            if delete_col.button("Delete Filter", disabled=saved_name == "(none)"):
+                saved_filters.delete(saved_name)
+                st.rerun()
     
     # Main content area
-    if uploaded_file is not None:
-        st.write("🔄 Processing uploaded file...")
-        
-        result = safe_json_loader(uploaded_file)
+    if uploaded_files:
+        for error in load_errors:
+            st.error(f"❌ Error loading file: {error}")
+        for warning in load_warnings:
+            st.warning(f"⚠️ Malformed records: {warning}")
         
-        if not result['success']:
-            st.error(f"❌ Error loading file: {result['error']}")
+        if not workspace.crawl_names():
             return
         
-        data = result['data']
-        st.success("✅ File loaded successfully!")
+        st.success(f"✅ {len(workspace.crawl_names())} crawl(s) loaded successfully!")
         
         try:
-            nodes = data.get('nodes', [])
-            edges = data.get('edges', [])
-            metadata = data.get('metadata', {})
-            stats = data.get('stats', {})
-            statistics = data.get('statistics', {})
-            
-            all_stats = {**stats, **statistics}
+            nodes, edges = workspace.view(crawl_view)
+            metadata = workspace.metadata(crawl_view)
+            all_stats = workspace.statistics(crawl_view)
             
             st.write(f"📊 Found {len(nodes)} nodes and {len(edges)} edges")
             
@@ -111,46 +276,12 @@ def main():
                 st.error("No nodes found in the JSON file")
                 return
             
-            # Apply filters
-            filtered_nodes = []
-            for i, n in enumerate(nodes):
-                try:
-                    if not isinstance(n, dict):
-                        continue
-                        
-                    node_role = n.get('role', 'guest')
-                    is_simulated = n.get('simulated', False)
-                    
-                    # Check role and simulated filters
-                    if node_role not in role_filter or (not show_simulated and is_simulated):
-                        continue
-                    
-                    # Check interactive elements filter
-                    if interactive_filter:
-                        interactive_elements = n.get('interactiveElements', {})
-                        has_selected_elements = False
-                        
-                        for element_type in interactive_filter:
-                            element_key = element_type.lower()  # Convert to lowercase
-                            element_data = interactive_elements.get(element_key, {})
-                            
-                            # Check if this element type has any items
-                            if isinstance(element_data, dict):
-                                total = element_data.get('total', 0)
-                                if total > 0:
-                                    has_selected_elements = True
-                                    break
-                            elif isinstance(element_data, list) and len(element_data) > 0:
-                                has_selected_elements = True
-                                break
-                        
-                        # If interactive filter is active and node doesn't have any selected elements, skip it
-                        if not has_selected_elements and len(interactive_filter) < 7:  # Only filter if not all selected
-                            continue
-                    
-                    filtered_nodes.append(n)
-                except Exception:
-                    continue
+            # Apply filters as masks over the view's column table
+            table = get_column_table(nodes)
+            mask = NodeFilter(role_filter, show_simulated, interactive_filter).mask(table)
+            if filter_expression is not None:
+                mask &= filter_expression.mask(table)
+            filtered_nodes = table.take(mask)
             
             st.write(f"🔍 After filtering: {len(filtered_nodes)} nodes")
             
@@ -175,44 +306,79 @@ def main():
                     pass
                 st.metric("Crawl Duration", f"{crawl_time:.1f}s")
             with col4:
-                try:
-                    unique_roles = set()
-                    for n in filtered_nodes:
-                        if isinstance(n, dict):
-                            unique_roles.add(n.get('role', 'guest'))
-                    st.metric("Roles", len(unique_roles))
-                except:
-                    st.metric("Roles", 0)
-            
-            if len(filtered_nodes) > MAX_NODES_DISPLAY:
-                st.warning(f"Graph has {len(filtered_nodes)} nodes. Displaying first {MAX_NODES_DISPLAY} for performance.")
-                filtered_nodes = filtered_nodes[:MAX_NODES_DISPLAY]
+                st.metric("Roles", len({n['role'] for n in filtered_nodes}))
             
-            # Build graph
+            # Filters select an induced view of the crawl's graph, which is built once
             with st.spinner("Building graph..."):
                 try:
-                    graph_builder = NetworkXGraphBuilder(filtered_nodes, edges)
-                    G = graph_builder.build_graph()
-                    positions = graph_builder.get_layout_positions(layout_type)
+                    graph_builder = get_graph_builder(nodes, edges)
+                    view = graph_builder.view(mask)
                 except Exception as e:
                     st.error(f"Error building graph: {e}")
                     return
             
+            # The whole view is drawn (zoomed out as clusters); a larger view's layout runs on a sample
+            layout_view = view
+            if neighborhood_mode:
+                # Bounded BFS around one page: no sampling, the neighborhood is capped instead
+                view = layout_view = NeighborhoodPanel(view).display()
+                if view is None:
+                    return
+                filtered_nodes = view.nodes()
+            elif view.num_nodes > MAX_NODES_DISPLAY:
+                st.info(f"Graph has {view.num_nodes} nodes. Layouts are computed on a {sampling_strategy} sample of "
+                        f"{MAX_NODES_DISPLAY} and extended to the rest; node selection and exports cover the sample.")
+                layout_view = get_layout_sample(view, filtered_nodes, edges, sampling_strategy)
+                filtered_nodes = layout_view.nodes()
+            
+            # Every layout of this view is computed in the background; a new view cancels the old job.
+            # Neighborhoods are small enough to lay out directly (the full view's job keeps running)
+            layout_cache = LayoutCache()
+            precomputer = get_layout_precomputer()
+            if not neighborhood_mode:
+                precomputer.start(layout_view, first=layout_type, owner=get_session_key())
+            
+            with st.spinner("Computing layout..."):
+                try:
+                    G = layout_view.G
+                    if not neighborhood_mode:
+                        precomputer.wait(layout_type, owner=get_session_key())
+                    visualizer = get_visualizer(view, layout_view, layout_type, layout_cache)
+                except Exception as e:
+                    st.error(f"Error computing layout: {e}")
+                    return
+            
+            with layout_status.container():
+                resolved, _ = layout_signature(layout_type, layout_view.num_nodes)
+                if layout_view.num_nodes > LAYOUT_MAX_NODES.get(layout_type, layout_view.num_nodes):
+                    st.caption(f"{layout_type} is approximated with {resolved} above {LAYOUT_MAX_NODES[layout_type]} nodes")
+                statuses = precomputer.progress(get_session_key())
+                ready = sum(status in ("cached", "done") for status in statuses.values())
+                if ready < len(statuses) and not neighborhood_mode:
+                    st.progress(ready / len(statuses), text=f"Precomputing layouts: {ready}/{len(statuses)} ready")
+                    st.button("Refresh", key="layout_progress_refresh", help="Update background layout progress")
+            
             # Create visualization
             with st.spinner("Creating visualization..."):
                 try:
-                    visualizer = InteractiveGraphVisualizer(G, positions, filtered_nodes)
-                    fig = visualizer.create_plotly_figure()
+                    viewport = visualizer.viewport_at(center_x, center_y, zoom)
                 except Exception as e:
                     st.error(f"Error creating visualization: {e}")
                     return
             
             # Display graph (without selection to avoid errors)
             st.subheader("Interactive Graph Visualization")
+            # Filled after the journey panel so selected paths can be highlighted
+            chart_slot = st.empty()
+            
+            highlight_paths = JourneyPanel(get_journey_analyzer(nodes, edges), filtered_nodes).display()
+            if neighborhood_mode:
+                highlight_paths = {"Center": [view.center], **highlight_paths}
             
             try:
+                fig = visualizer.create_viewport_figure(viewport, highlight_paths=highlight_paths)
                 # Display the graph without selection mode to avoid errors
-                st.plotly_chart(
+                chart_slot.plotly_chart(
                     fig, 
                     use_container_width=True
                 )
@@ -220,6 +386,9 @@ def main():
                 st.error(f"Error displaying graph: {e}")
                 return
             
+            # Discovery rates over every filtered node (not just the displayed sample)
+            ThroughputPanel(CrawlThroughput.from_table(table, mask)).display()
+            
             # Node selection using dropdown instead of plotly selection
             st.subheader("Node Analysis")
             
@@ -243,17 +412,37 @@ def main():
                     selected_node = filtered_nodes[selected_index]
                     
                     st.write("📄 Selected Node Analysis:")
-                    analyzer = NodeAnalyzer(selected_node)
+                    st.button(
+                        "🔎 Explore Neighborhood",
+                        on_click=explore_neighborhood,
+                        args=(selected_node['id'],),
+                        help="Switch to neighborhood mode centered on this page"
+                    )
+                    analyzer = NodeAnalyzer(selected_node, graph_builder.get_graph_digest())
                     analyzer.display_node_details()
             else:
                 st.info("No nodes available for analysis")
             
+            # Analysis store: persist per-node results of every loaded crawl for cross-crawl queries
+            store = get_analysis_store()
+            st.sidebar.markdown("---")
+            st.sidebar.subheader("Analysis Store")
+            if st.sidebar.button("Store Analysis", help="Save component analysis of all loaded files to the local SQLite store"):
+                with st.spinner("Storing analysis..."):
+                    try:
+                        for name in workspace.crawl_names():
+                            crawl_id = store.store_crawl(name, workspace.crawls[name]['nodes'], workspace.metadata(name))
+                            st.sidebar.write(f"✅ {name} → crawl {crawl_id}")
+                    except Exception as e:
+                        st.sidebar.error(f"Storing analysis failed: {e}")
+            AnalysisStorePanel(store).display()
+            
             # Export section
             st.sidebar.markdown("---")
             st.sidebar.subheader("Export Options")
             
             try:
-                export_manager = ExportManager(G, filtered_nodes, edges)
+                export_manager = ExportManager(G, filtered_nodes, edges, view.node_store)
                 
                 if st.sidebar.button("Export to GraphML"):
                     try:
@@ -0,0 +1 @@
+# Benchmarks package for AutoTestAI Visualization App
\ No newline at end of file
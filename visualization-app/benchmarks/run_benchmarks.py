@@ -0,0 +1,346 @@
+import argparse
+import gc
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_crawl import PRESET_SIZES, ensure_preset
+from components.export_manager import ExportManager
+from components.graph_visualizer import InteractiveGraphVisualizer
+from components.testable_components import TestableComponentAnalyzer
+from config import AVAILABLE_LAYOUTS, MAX_NODES_DISPLAY
+from utils.data_parser import CrawlerDataParser
+from utils.node_columns import NodeColumnTable
+from utils.filter_expression import compile_filter
+from utils.graph_sampler import GraphSampler
+from utils.journey_analysis import JourneyAnalyzer
+from utils.analysis_store import AnalysisStore
+from utils.crawl_ingest import STREAM_CHUNK_SIZE, CrawlIngestor
+from utils.crawl_throughput import CrawlThroughput
+from utils.layout_cache import LayoutCache
+from utils.networkx_utils import GRAPH_BACKENDS, NetworkXGraphBuilder
+from utils.node_filter import NodeFilter
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Layouts with super-linear cost are only timed up to these node counts
+LAYOUT_SIZE_LIMITS = {
+    "spring": 2_000,
+    "hierarchical": 2_000,
+    "circular": 1_000_000,
+    "kamada_kawai": 1_000,
+    "shell": 1_000_000
+}
+
+# PageRank scores from the two backends may differ by floating point summation order only
+PAGERANK_TOLERANCE = 1e-12
+
+# Chunk sizes the streamed (compressed) ingest is checked at against CrawlIngestor.load
+STREAM_PARITY_CHUNK_SIZES = [1 << 10, 1 << 16, STREAM_CHUNK_SIZE]
+
+# Stages whose absolute time stays under this many seconds are never flagged,
+# so timer noise on tiny stages does not fail the run
+MIN_REGRESSION_SECONDS = 0.05
+
+# A stage is run again (up to --repeat times, best time kept) only while its runs so far took
+# less than this, so cheap stages are repeated and the slow layouts run once
+REPEAT_BUDGET_SECONDS = 1.0
+
+# --update-baselines runs the suite this many times and stores each stage's slowest best time,
+# so a baseline covers ordinary run-to-run noise instead of one lucky run
+BASELINE_RUNS = 3
+
+
+class StageBenchmark:
+    def __init__(self, repeat: int = 5):
+        self.repeat = repeat
+        self.results = {}
+
+    def time_stage(self, name: str, func: Callable, once: bool = False):
+        """Run a stage up to `repeat` times, record the best wall time and return the last result.
+
+        Stages that cache what they compute pass `once`, so later runs do not time the cache.
+        The garbage collector is paused while a stage runs (as timeit does), otherwise a
+        collection triggered by earlier stages lands on whichever stage happens to be running.
+        """
+        best = None
+        result = None
+        spent = 0.0
+        for _ in range(1 if once else self.repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            best = elapsed if best is None else min(best, elapsed)
+            spent += elapsed
+            if spent >= REPEAT_BUDGET_SECONDS:
+                break
+        self.results[name] = best
+        return result
+
+    def skip_stage(self, name: str):
+        self.results[name] = None
+
+
+def run_suite(path: str, repeat: int = 5, layouts: Optional[List[str]] = None) -> Dict[str, Optional[float]]:
+    bench = StageBenchmark(repeat)
+
+    parser = CrawlerDataParser(path)
+    bench.time_stage("parse", parser.load_data)
+    nodes = parser.get_nodes()
+    edges = parser.get_edges()
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    compressed = gzip.compress(raw, compresslevel=1)
+    bench.time_stage("ingest:stream", lambda: CrawlIngestor().load_stream(io.BytesIO(compressed), 'gzip'))
+    parity_errors = run_stream_parity(raw) + run_edge_case_checks()
+
+    node_filter = NodeFilter(["guest", "user", "admin"], show_simulated=False, interactive_filter=["Buttons", "Dropdowns"])
+    bench.time_stage("filter", lambda: node_filter.apply(nodes))
+    table = bench.time_stage("filter:column_table", lambda: NodeColumnTable(nodes))
+    expression = compile_filter('depth <= 3 and forms > 0 and role == "admin" and url ~ "/checkout"')
+    bench.time_stage("filter:expression", lambda: (node_filter.mask(table) & expression.mask(table)).sum())
+
+    throughput = bench.time_stage("throughput:build", lambda: CrawlThroughput.from_table(table))
+    bench.time_stage("throughput:series", lambda: (throughput.rate_series(), throughput.rate_by("role"), throughput.rate_by("depth"),
+                                                   throughput.discovery_by("depth"), throughput.new_state_curve()))
+    bench.time_stage("throughput:stalls", throughput.stalls)
+
+    builder = None
+
+    def build():
+        nonlocal builder
+        builder = NetworkXGraphBuilder(nodes, edges)
+        return builder.build_graph()
+
+    G = bench.time_stage("graph_build", build)
+    full_view = builder.view()
+    bench.time_stage("ego:index", lambda: builder.adjacency, once=True)
+    bench.time_stage("ego:extract", lambda: [full_view.ego(nodes[i]['id'], hops) for i in (0, len(nodes) // 2) for hops in (1, 2, 3)])
+
+    positions = None
+    for layout_type in layouts or AVAILABLE_LAYOUTS:
+        if len(nodes) > LAYOUT_SIZE_LIMITS.get(layout_type, 0):
+            bench.skip_stage(f"layout:{layout_type}")
+            continue
+        positions = bench.time_stage(f"layout:{layout_type}", lambda: builder.get_layout_positions(layout_type))
+
+    if positions is None:
+        # Traces still need coordinates; circular is linear and always affordable
+        positions = builder.get_layout_positions("circular")
+
+    # Views above MAX_NODES_DISPLAY are laid out on a sample and extended to every node
+    sample = full_view.restrict(GraphSampler(nodes, edges, csr=full_view.to_csr()).select("bfs", MAX_NODES_DISPLAY))
+    sample_positions = sample.get_layout_positions("circular")
+    bench.time_stage("layout:extend", lambda: full_view.extend_layout(sample, sample_positions))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LayoutCache(cache_dir)
+        bench.time_stage("layout_cache:store", lambda: (cache.clear(), builder.get_layout_positions("circular", cache=cache)))
+        bench.time_stage("layout_cache:load", lambda: builder.get_layout_positions("circular", cache=cache))
+
+    bench.time_stage("traces", lambda: InteractiveGraphVisualizer(G, positions, builder.node_store).create_plotly_figure())
+    visualizer = InteractiveGraphVisualizer(G, positions, builder.node_store)
+    bench.time_stage("traces:spatial_index", lambda: visualizer.spatial_index, once=True)
+    bench.time_stage("traces:viewport", lambda: [visualizer.create_viewport_figure(visualizer.viewport_at(0.5, 0.5, zoom))
+                                                 for zoom in (1, 8, 64)])
+    bench.time_stage("node_analysis", lambda: [TestableComponentAnalyzer(n).get_all_testable_components() for n in nodes])
+
+    export_manager = ExportManager(G, nodes, edges, builder.node_store)
+    bench.time_stage("export:graphml", export_manager.export_to_graphml)
+    bench.time_stage("export:csv_nodes", export_manager.export_to_csv_nodes)
+    bench.time_stage("export:csv_edges", export_manager.export_to_csv_edges)
+    bench.time_stage("export:dot", export_manager.export_to_dot)
+
+    journeys = bench.time_stage("journeys:build", lambda: JourneyAnalyzer(nodes, edges))
+    source, target = nodes[0]['id'], nodes[-1]['id']
+    bench.time_stage("journeys:k_paths", lambda: journeys.k_shortest_paths(source, target, 5), once=True)
+    bench.time_stage("journeys:sequences", lambda: journeys.action_sequences(2, 3), once=True)
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = AnalysisStore(os.path.join(store_dir, "analysis.sqlite3"))
+        bench.time_stage("store:write", lambda: store.store_crawl("bench", nodes), once=True)
+        bench.time_stage("store:forms_by_type", lambda: store.forms_by_type("login"))
+        bench.time_stage("store:lcp_regressions", store.lcp_regressions)
+        store.close()
+
+    parity_errors += run_backend_stages(bench, nodes, edges)
+    return bench.results, parity_errors
+
+
+def _ingest_outcome(ingest: Callable) -> tuple:
+    """What an ingest produced, comparable across the plain and streamed paths"""
+    try:
+        data = ingest()
+    except json.JSONDecodeError:
+        # orjson and the stdlib word and position syntax errors differently
+        return ("syntax error",)
+    except ValueError as e:
+        return ("error", str(e))
+    return (data['nodes'], data['edges'], data['metadata'], data['statistics'], data['report'].to_dict())
+
+
+class _StreamOnlyIngestor(CrawlIngestor):
+    """Fails any input that would be decoded as one whole document"""
+
+    @staticmethod
+    def decode(raw):
+        raise ValueError("decoded as a whole document")
+
+
+def run_stream_parity(raw: bytes) -> List[str]:
+    """Check that streamed (gzip, zip) ingest matches CrawlIngestor.load on the same text, at several chunk sizes"""
+    cases = {
+        "crawl": (raw, STREAM_PARITY_CHUNK_SIZES),
+        "trailing data": (raw + b' {}', STREAM_PARITY_CHUNK_SIZES[:1]),
+        "truncated": (raw[:len(raw) // 2], STREAM_PARITY_CHUNK_SIZES[:1]),
+        "non-list sections": (b'{"nodes": {"id": "a"}, "edges": "b", "metadata": {}}', STREAM_PARITY_CHUNK_SIZES[:1])
+    }
+    errors = []
+    for name, (text, chunk_sizes) in cases.items():
+        expected = _ingest_outcome(lambda: CrawlIngestor().load(text))
+        compressed = gzip.compress(text, compresslevel=1)
+        for chunk_size in chunk_sizes:
+            streamed = _ingest_outcome(lambda: CrawlIngestor().load_stream(io.BytesIO(compressed), 'gzip', chunk_size))
+            if streamed != expected:
+                errors.append(f"streamed ingest differs from load ({name}, {chunk_size}-byte chunks)")
+
+    # A plain .json member of a deflated zip is parsed as it is inflated, never decoded whole
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr("crawl.json", raw)
+    if _ingest_outcome(lambda: _StreamOnlyIngestor().load(archive.getvalue())) != _ingest_outcome(lambda: CrawlIngestor().load(raw)):
+        errors.append("deflated zip member is not streamed or differs from load")
+    return errors
+
+
+def run_edge_case_checks() -> List[str]:
+    """Small hand-written inputs whose outcome is known exactly"""
+    errors = []
+    ingestor = CrawlIngestor()
+    ingestor.normalize_node({'id': 'a', 'url': 'https://example.com/', 'title': 'Home', 'depth': 0})
+    if ingestor.report.has_issues:
+        errors.append(f"clean node without a role reported as {ingestor.report.node_issues}")
+
+    # An edge to a page that was never crawled is not a journey state
+    journeys = JourneyAnalyzer([{'id': 'a'}, {'id': 'b'}],
+                               [{'from': 'a', 'to': 'b', 'action': 'click', 'role': 'guest'},
+                                {'from': 'b', 'to': 'ghost', 'action': 'click', 'role': 'guest'}])
+    if 'ghost' in journeys.graph.index or journeys.reachable_from('a') != {'b': 1}:
+        errors.append("journey analysis keeps states that are only edge endpoints")
+    return errors
+
+
+def run_backend_stages(bench: StageBenchmark, nodes: List[Dict], edges: List[Dict]) -> List[str]:
+    """Time the core graph algorithms on every backend and check that they agree"""
+    outputs = {}
+    for backend in GRAPH_BACKENDS:
+        builder = NetworkXGraphBuilder(nodes, edges, backend=backend)
+        bench.time_stage(f"{backend}:graph_build", builder.build_graph)
+        outputs[backend] = {
+            'depths': bench.time_stage(f"{backend}:depths", builder.get_depths),
+            'components': bench.time_stage(f"{backend}:components", builder.get_connected_components),
+            'pagerank': bench.time_stage(f"{backend}:pagerank", builder.get_pagerank),
+            'degrees': bench.time_stage(f"{backend}:degrees", builder.get_degree_statistics)
+        }
+
+    reference, candidate = outputs["networkx"], outputs["csr"]
+    errors = []
+    if reference['depths'] != candidate['depths']:
+        errors.append("depths differ between backends")
+    if sorted(map(sorted, reference['components'])) != sorted(map(sorted, candidate['components'])):
+        errors.append("connected components differ between backends")
+    if reference['degrees'] != candidate['degrees']:
+        errors.append("degree statistics differ between backends")
+    pagerank_diff = max((abs(reference['pagerank'][k] - candidate['pagerank'].get(k, 0.0)) for k in reference['pagerank']), default=0.0)
+    if pagerank_diff > PAGERANK_TOLERANCE or reference['pagerank'].keys() != candidate['pagerank'].keys():
+        errors.append(f"pagerank differs between backends (max diff {pagerank_diff:.2e})")
+    return errors
+
+
+def load_baselines(path: str = BASELINES_PATH) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines: Dict, path: str = BASELINES_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def find_regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for stage, elapsed in results.items():
+        expected = baseline.get(stage)
+        if elapsed is None or expected is None:
+            continue
+        if elapsed > expected * tolerance and elapsed > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{stage}: {elapsed:.3f}s vs baseline {expected:.3f}s (x{elapsed / expected:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage-level benchmarks for the visualization pipeline")
+    parser.add_argument("sizes", nargs="*", default=["1k"], help=f"Preset labels: {', '.join(PRESET_SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help=f"Runs per stage, fewer once a stage has taken {REPEAT_BUDGET_SECONDS}s; the best time is kept")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Fail when a stage is slower than baseline by this factor")
+    parser.add_argument("--layouts", nargs="*", help="Subset of AVAILABLE_LAYOUTS to time")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--update-baselines", action="store_true", help=f"Store the slowest results of {BASELINE_RUNS} runs as the new baselines")
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baselines)
+    failed = False
+
+    for label in args.sizes:
+        label = label.lower()
+        path = ensure_preset(label)
+        print(f"== {label} ({PRESET_SIZES[label]} nodes) ==")
+        results, parity_errors = run_suite(path, repeat=args.repeat, layouts=args.layouts)
+        for _ in range(BASELINE_RUNS - 1 if args.update_baselines else 0):
+            rerun, rerun_errors = run_suite(path, repeat=args.repeat, layouts=args.layouts)
+            results = {stage: None if t is None else max(t, rerun[stage]) for stage, t in results.items()}
+            parity_errors += [error for error in rerun_errors if error not in parity_errors]
+
+        for stage, elapsed in results.items():
+            print(f"  {stage:<22} {'skipped' if elapsed is None else f'{elapsed:8.3f}s'}")
+        for error in parity_errors:
+            print(f"  PARITY {error}")
+        failed = failed or bool(parity_errors)
+
+        if args.update_baselines:
+            baselines.setdefault(label, {}).update({stage: round(t, 4) for stage, t in results.items() if t is not None})
+            continue
+
+        regressions = find_regressions(results, baselines.get(label, {}), args.tolerance)
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+        failed = failed or bool(regressions)
+
+    if args.update_baselines:
+        save_baselines(baselines, args.baselines)
+        print(f"Baselines written to {args.baselines}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import random
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+PRESET_SIZES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000
+}
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+ROLES = ["guest", "user", "admin"]
+ROLE_WEIGHTS = [0.5, 0.35, 0.15]
+
+URL_TEMPLATES = {
+    "guest": ["/", "/products/{n}", "/category/{word}", "/search?q={word}", "/login", "/register", "/contact"],
+    "user": ["/account", "/account/orders/{n}", "/cart", "/checkout/step-{step}", "/products/{n}/reviews"],
+    "admin": ["/admin", "/admin/users/{n}", "/admin/orders/{n}", "/admin/settings/{word}"]
+}
+
+WORDS = ["shoes", "books", "garden", "audio", "kids", "sale", "outdoor", "kitchen", "office", "gifts"]
+ACTIONS = ["click", "navigate", "submit", "hover", "select", "back"]
+FORM_TYPES = ["login", "registration", "contact", "search", "order", "payment", "other"]
+INPUT_TYPES = ["text", "email", "password", "number", "checkbox", "radio", "select", "textarea"]
+ELEMENT_TYPES = ["buttons", "checkboxes", "dropdowns", "draggables", "resizables", "selectables", "sortables"]
+API_PATHS = ["/api/products/{n}", "/api/cart", "/api/users/{n}/orders", "/graphql", "/api/search.json", "/static/app.js", "/static/logo.png"]
+
+
+def fnv1a_hash(value: str) -> str:
+    """Same 32-bit FNV-1a hex digest the extension's DOM hasher uses for node ids"""
+    h = 0x811c9dc5
+    for byte in value.encode('utf-8'):
+        h ^= byte
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return format(h, 'x')
+
+
+class SyntheticCrawlGenerator:
+    """Produces crawler_output.json data in the schema emitted by the Chrome extension.
+
+    Topology (parents, depths, roles, timestamps) is fixed up front in compact arrays;
+    node payloads are generated lazily from a per-node seed so that the output is
+    reproducible and large crawls can be streamed to disk.
+    """
+
+    def __init__(self, num_nodes: int, seed: int = 42, avg_extra_edges: float = 2.0,
+                 repeat_edge_ratio: float = 0.15, base_url: str = "https://shop.example.com"):
+        self.num_nodes = num_nodes
+        self.seed = seed
+        self.avg_extra_edges = avg_extra_edges
+        self.repeat_edge_ratio = repeat_edge_ratio
+        self.base_url = base_url
+        self.start_time = 1_700_000_000_000
+        self._build_topology()
+
+    def _build_topology(self):
+        rng = random.Random(self.seed)
+        n = self.num_nodes
+        self.parents = array('i', [-1] * n)
+        self.depths = array('i', [0] * n)
+        self.roles = array('b', [0] * n)
+        self.timestamps = array('q', [self.start_time] * n)
+
+        ts = self.start_time
+        for i in range(1, n):
+            # Prefer recent parents so depth grows roughly like a BFS crawl frontier
+            parent = rng.randint(max(0, i - 50), i - 1) if rng.random() < 0.7 else rng.randint(0, i - 1)
+            self.parents[i] = parent
+            self.depths[i] = self.depths[parent] + 1 if rng.random() < 0.6 else self.depths[parent]
+            self.roles[i] = rng.choices(range(len(ROLES)), weights=ROLE_WEIGHTS)[0]
+            # Occasional stalls (auth waits, slow pages) between otherwise steady discoveries
+            ts += int(rng.expovariate(1 / 800)) + (rng.randint(10_000, 60_000) if rng.random() < 0.002 else 0)
+            self.timestamps[i] = ts
+
+        self.ids = [fnv1a_hash(f"{self.seed}:{i}") for i in range(n)]
+
+    def _url_for(self, rng: random.Random, role: str) -> str:
+        template = rng.choice(URL_TEMPLATES[role])
+        return self.base_url + template.format(n=rng.randint(1, 5000), word=rng.choice(WORDS), step=rng.randint(1, 4))
+
+    def _make_inputs(self, rng: random.Random, count: int) -> List[Dict]:
+        inputs = []
+        for j in range(count):
+            input_type = rng.choice(INPUT_TYPES)
+            name = f"{input_type}_{j}"
+            inputs.append({
+                'type': input_type,
+                'name': name,
+                'id': f"field-{name}",
+                'label': name.replace('_', ' ').title(),
+                'placeholder': f"Enter {input_type}",
+                'required': rng.random() < 0.5
+            })
+        return inputs
+
+    def _make_forms(self, rng: random.Random, url: str) -> List[Dict]:
+        forms = []
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[0.55, 0.3, 0.1, 0.05])[0]):
+            input_count = rng.randint(1, 8)
+            forms.append({
+                'formType': rng.choice(FORM_TYPES),
+                'action': url.split('?')[0] + "/submit",
+                'method': rng.choice(["GET", "POST"]),
+                'inputCount': input_count,
+                'inputs': self._make_inputs(rng, input_count),
+                'validation': {'required': True} if rng.random() < 0.4 else {}
+            })
+        return forms
+
+    def _make_links(self, rng: random.Random, role: str) -> List[Dict]:
+        links = []
+        for j in range(rng.randint(3, 25)):
+            if rng.random() < 0.1:
+                href = f"https://partner{rng.randint(1, 20)}.example.org/{rng.choice(WORDS)}"
+            elif rng.random() < 0.05:
+                href = f"/downloads/{rng.choice(WORDS)}.pdf"
+            else:
+                href = rng.choice(URL_TEMPLATES[role]).format(n=rng.randint(1, 5000), word=rng.choice(WORDS), step=rng.randint(1, 4))
+            links.append({
+                'href': href,
+                'text': rng.choice(["View", "Add to cart", "Login", "Details", "Next", "Submit", "Buy now", "Home"]),
+                'selector': f"a.nav-link:nth-child({j + 1})"
+            })
+        return links
+
+    def _make_requests(self, rng: random.Random) -> List[Dict]:
+        requests = []
+        for _ in range(rng.randint(0, 12)):
+            path = rng.choice(API_PATHS).format(n=rng.randint(1, 5000))
+            requests.append({
+                'url': self.base_url + path,
+                'method': "POST" if path == "/graphql" or rng.random() < 0.2 else "GET",
+                'status': rng.choices([200, 201, 304, 404, 500], weights=[0.8, 0.05, 0.08, 0.05, 0.02])[0],
+                'responseTime': round(rng.lognormvariate(4.5, 0.6), 1),
+                'type': "xhr" if "/api/" in path or path == "/graphql" else "resource"
+            })
+        return requests
+
+    def _make_interactive_elements(self, rng: random.Random) -> Dict:
+        elements = {}
+        for element_type in ELEMENT_TYPES:
+            total = rng.choices([0, 1, 3, 8], weights=[0.5, 0.25, 0.15, 0.1])[0]
+            elements[element_type] = {
+                'total': total,
+                'elements': [
+                    {'text': f"{element_type[:-1]} {k + 1}", 'selector': f"#{element_type}-{k}"}
+                    for k in range(min(total, 5))
+                ]
+            }
+        return elements
+
+    def make_node(self, index: int) -> Dict:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        role = ROLES[self.roles[index]]
+        url = self.base_url + "/" if index == 0 else self._url_for(rng, role)
+        forms = self._make_forms(rng, url)
+        links = self._make_links(rng, role)
+        requests = self._make_requests(rng)
+        has_auth = any(f['formType'] == 'login' for f in forms)
+
+        return {
+            'id': self.ids[index],
+            'url': url,
+            'title': f"{url.rstrip('/').rsplit('/', 1)[-1] or 'Home'} | Example Shop",
+            'timestamp': self.timestamps[index],
+            'role': role,
+            'depth': self.depths[index],
+            'simulated': rng.random() < 0.05,
+            'features': {
+                'linkCount': len(links),
+                'formCount': len(forms),
+                'apiCount': len(requests),
+                'hasAuth': has_auth,
+                'apiEndpoints': len({r['url'] for r in requests}),
+                'webSocketConnections': 0
+            },
+            'links': links,
+            'forms': forms,
+            'network': {
+                'requests': requests,
+                'apiEndpoints': [],
+                'webSockets': []
+            },
+            'interactiveElements': self._make_interactive_elements(rng),
+            'performance': {
+                'webVitals': {
+                    'LCP': round(rng.lognormvariate(0.5, 0.5), 2),
+                    'FID': round(rng.lognormvariate(3.5, 0.7), 1),
+                    'CLS': round(rng.random() * 0.25, 3),
+                    'FCP': round(rng.lognormvariate(0.1, 0.4), 2),
+                    'TTFB': round(rng.lognormvariate(5.0, 0.5), 1)
+                }
+            },
+            'accessibility': {
+                'wcagLevel': rng.choice(["A", "AA", "AAA", "N/A"]),
+                'ariaFailures': rng.choices([0, 1, 2, 5], weights=[0.6, 0.2, 0.1, 0.1])[0],
+                'colorContrast': {'failures': rng.randint(0, 4)},
+                'keyboardNavigation': {'focusable': rng.randint(0, 40)}
+            }
+        }
+
+    def iter_nodes(self) -> Iterator[Dict]:
+        for i in range(self.num_nodes):
+            yield self.make_node(i)
+
+    def iter_edges(self) -> Iterator[Dict]:
+        rng = random.Random(self.seed + 7)
+        emitted = []
+        for i in range(1, self.num_nodes):
+            targets = [i]
+            for _ in range(int(rng.expovariate(1 / self.avg_extra_edges))):
+                targets.append(rng.randint(0, self.num_nodes - 1))
+
+            source = self.parents[i]
+            for target in targets:
+                edge = {
+                    'from': self.ids[source],
+                    'to': self.ids[target],
+                    'action': rng.choice(ACTIONS),
+                    'role': ROLES[self.roles[i]],
+                    'timestamp': self.timestamps[i]
+                }
+                yield edge
+                # Crawls revisit the same transition; keep a bounded pool to repeat from
+                if len(emitted) < 10_000:
+                    emitted.append(edge)
+                else:
+                    emitted[rng.randrange(len(emitted))] = edge
+
+            if emitted and rng.random() < self.repeat_edge_ratio:
+                yield dict(rng.choice(emitted), timestamp=self.timestamps[i])
+
+    def _metadata(self) -> Dict:
+        return {
+            'generatedAt': "2024-01-01T00:00:00.000Z",
+            'version': "1.0.0",
+            'generator': "synthetic",
+            'seed': self.seed,
+            'startUrl': self.base_url + "/",
+            'totalCrawlTime': self.timestamps[-1] - self.start_time if self.num_nodes else 0
+        }
+
+    def _statistics(self, total_edges: int) -> Dict:
+        role_counts = {role: 0 for role in ROLES}
+        for r in self.roles:
+            role_counts[ROLES[r]] += 1
+        return {
+            'totalNodes': self.num_nodes,
+            'totalEdges': total_edges,
+            'roles': {role: {'nodes': count} for role, count in role_counts.items()}
+        }
+
+    def generate(self) -> Dict:
+        edges = list(self.iter_edges())
+        return {
+            'metadata': self._metadata(),
+            'nodes': list(self.iter_nodes()),
+            'edges': edges,
+            'stats': {'totalNodes': self.num_nodes, 'totalEdges': len(edges)},
+            'statistics': self._statistics(len(edges))
+        }
+
+    def write(self, path: str) -> str:
+        """Stream the crawl to disk without materialising every node in memory"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"metadata": ' + json.dumps(self._metadata()) + ',\n"nodes": [\n')
+            for i, node in enumerate(self.iter_nodes()):
+                if i:
+                    f.write(',\n')
+                f.write(json.dumps(node))
+
+            f.write('\n],\n"edges": [\n')
+            total_edges = 0
+            for edge in self.iter_edges():
+                if total_edges:
+                    f.write(',\n')
+                f.write(json.dumps(edge))
+                total_edges += 1
+
+            f.write('\n],\n"stats": ' + json.dumps({'totalNodes': self.num_nodes, 'totalEdges': total_edges}))
+            f.write(',\n"statistics": ' + json.dumps(self._statistics(total_edges)) + '}\n')
+        return path
+
+
+def preset_path(label: str, data_dir: Optional[str] = None) -> str:
+    return os.path.join(data_dir or DATA_DIR, f"crawler_output_{label}.json")
+
+
+def ensure_preset(label: str, seed: int = 42, data_dir: Optional[str] = None) -> str:
+    """Return the path of a generated preset crawl, generating it on first use"""
+    path = preset_path(label, data_dir)
+    if not os.path.exists(path):
+        SyntheticCrawlGenerator(PRESET_SIZES[label], seed=seed).write(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic crawler_output.json files")
+    parser.add_argument("sizes", nargs="*", default=["1k"],
+                        help=f"Preset labels ({', '.join(PRESET_SIZES)}) or explicit node counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        label = size.lower()
+        num_nodes = PRESET_SIZES[label] if label in PRESET_SIZES else int(size)
+        path = SyntheticCrawlGenerator(num_nodes, seed=args.seed).write(preset_path(label, args.output_dir))
+        print(f"Wrote {num_nodes} nodes to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Headless entry point for running the app's analyses without Streamlit.
+
+    python cli.py filter crawler_output.json -e 'depth <= 3 and url ~ "/checkout"'
+    python cli.py filter crawler_output.json --saved checkout --format csv
+    python cli.py filter --list
+    python cli.py journeys crawler_output.json paths SOURCE_ID TARGET_ID -k 5
+    python cli.py journeys crawler_output.json sequences --min-length 2 --max-length 4
+    python cli.py journeys crawler_output.json --format json funnel STATE_ID STATE_ID STATE_ID
+    python cli.py store add crawl_1.json crawl_2.json
+    python cli.py store forms login --last 20
+    python cli.py store lcp-regressions --min-ratio 1.5
+    python cli.py throughput crawler_output.json.gz stalls --stall 30
+    python cli.py serve crawl_1.json crawl_2.json.gz --port 8765
+"""
+import argparse
+import json
+import os
+import sys
+import pandas as pd
+from utils.data_parser import CrawlerDataParser
+from utils.node_columns import NodeColumnTable
+from utils.filter_expression import compile_filter, FilterSyntaxError, SavedFilters
+from utils.journey_analysis import JourneyAnalyzer, journey_table
+from utils.analysis_store import AnalysisStore, FORM_TYPES
+from utils.crawl_throughput import CrawlThroughput
+from utils.query_service import QueryError, serve
+from config import (THROUGHPUT_BINS, THROUGHPUT_STALL_SECONDS, QUERY_SERVICE_HOST, QUERY_SERVICE_PORT,
+                    QUERY_SERVICE_WORKERS)
+from components.export_manager import ExportManager
+
+def cmd_filter(args) -> int:
+    saved_filters = SavedFilters(args.filters_file) if args.filters_file else SavedFilters()
+    if args.list:
+        for name, source in sorted(saved_filters.all().items()):
+            print(f"{name}\t{source}")
+        return 0
+
+    source = args.expression or (saved_filters.get(args.saved) if args.saved else None)
+    if not args.crawl or not source:
+        print("error: a crawl file and --expression or an existing --saved filter are required", file=sys.stderr)
+        return 2
+    try:
+        expression = compile_filter(source)
+    except FilterSyntaxError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.save:
+        saved_filters.save(args.save, source)
+
+    nodes = CrawlerDataParser(args.crawl).get_nodes()
+    matched = expression.apply(NodeColumnTable(nodes))
+
+    if args.format == "ids":
+        sys.stdout.write("".join(f"{node['id']}\n" for node in matched))
+    elif args.format == "json":
+        json.dump(matched, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        ExportManager(None, matched, []).export_to_csv_nodes().to_csv(sys.stdout, index=False)
+    print(f"{len(matched)}/{len(nodes)} nodes matched", file=sys.stderr)
+    return 0
+
+
+def cmd_journeys(args) -> int:
+    parser = CrawlerDataParser(args.crawl)
+    analyzer = JourneyAnalyzer(parser.get_nodes(), parser.get_edges())
+    try:
+        if args.mode == "paths":
+            rows = analyzer.k_shortest_paths(args.source, args.target, args.k)
+        elif args.mode == "sequences":
+            rows = analyzer.action_sequences(args.min_length, args.max_length, args.top, args.role)
+        else:
+            rows = analyzer.funnel(args.states)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        journey_table(rows).to_csv(sys.stdout, index=False)
+    return 0
+
+
+def cmd_store(args) -> int:
+    store = AnalysisStore(args.db) if args.db else AnalysisStore()
+    if args.action == "add":
+        for path in args.crawls:
+            parser = CrawlerDataParser(path)
+            crawl_id = store.store_crawl(os.path.basename(path), parser.get_nodes(), parser.data['metadata'])
+            print(f"{path}: crawl {crawl_id}", file=sys.stderr)
+        return 0
+
+    if args.action == "crawls":
+        rows = store.crawls()
+    elif args.action == "forms":
+        rows = store.forms_by_type(args.form_type, args.last)
+    elif args.action == "apis":
+        rows = store.apis_by_template(args.template, args.last) if args.template else store.api_templates()
+    elif args.action == "pages":
+        rows = store.pages(url=args.url, role=args.role, crawl_id=args.crawl_id)
+    else:
+        rows = store.lcp_regressions(args.min_ratio, args.min_increase)
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        pd.DataFrame(rows).to_csv(sys.stdout, index=False)
+    return 0
+
+
+def cmd_throughput(args) -> int:
+    throughput = CrawlThroughput.from_nodes(CrawlerDataParser(args.crawl).get_nodes())
+    bin_seconds = args.bin_seconds or throughput.bin_seconds(args.bins)
+    if args.report == "summary":
+        rows = [throughput.summary(args.stall, bin_seconds)]
+    elif args.report == "rate":
+        rows = throughput.rate_series(bin_seconds)
+    elif args.report in ("roles", "depths"):
+        by = args.report[:-1]
+        rows = throughput.rate_by(by, bin_seconds) if args.timeline else throughput.discovery_by(by)
+    elif args.report == "stalls":
+        rows = throughput.stalls(args.stall)
+    else:
+        rows = throughput.new_state_curve(args.bins)
+
+    frame = pd.DataFrame(rows)
+    if args.format == "json":
+        json.dump(frame.to_dict(orient="records"), sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    else:
+        frame.to_csv(sys.stdout, index=False)
+    return 0
+
+
+def cmd_serve(args) -> int:
+    try:
+        server = serve(args.crawls, args.host, args.port, args.workers, args.verbose, args.load_dir)
+    except QueryError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    host, port = server.server_address[:2]
+    print(f"Serving {', '.join(server.service.workspace.crawl_names()) or 'no crawls'} on http://{host}:{port} "
+          f"({args.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AutoTestAI graph analyzer (headless)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    filter_parser = subparsers.add_parser("filter", help="Select nodes with a filter expression")
+    filter_parser.add_argument("crawl", nargs="?", help="crawler_output.json")
+    filter_parser.add_argument("-e", "--expression", help="Filter expression")
+    filter_parser.add_argument("--saved", help="Name of a saved filter to run")
+    filter_parser.add_argument("--save", metavar="NAME", help="Save the expression under this name")
+    filter_parser.add_argument("--list", action="store_true", help="List saved filters and exit")
+    filter_parser.add_argument("--format", choices=["ids", "csv", "json"], default="ids")
+    filter_parser.add_argument("--filters-file", help="Saved filters file (default: SAVED_FILTERS_PATH)")
+    filter_parser.set_defaults(func=cmd_filter)
+
+    journeys_parser = subparsers.add_parser("journeys", help="Shortest paths, action sequences and funnels")
+    journeys_parser.add_argument("crawl", help="crawler_output.json")
+    journeys_parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    modes = journeys_parser.add_subparsers(dest="mode", required=True)
+    paths_parser = modes.add_parser("paths", help="k shortest paths between two states")
+    paths_parser.add_argument("source")
+    paths_parser.add_argument("target")
+    paths_parser.add_argument("-k", type=int, default=3)
+    sequences_parser = modes.add_parser("sequences", help="Most frequent action sequences")
+    sequences_parser.add_argument("--min-length", type=int, default=2)
+    sequences_parser.add_argument("--max-length", type=int, default=3)
+    sequences_parser.add_argument("--top", type=int, default=20)
+    sequences_parser.add_argument("--role")
+    funnel_parser = modes.add_parser("funnel", help="Conversion between consecutive states")
+    funnel_parser.add_argument("states", nargs="+")
+    journeys_parser.set_defaults(func=cmd_journeys)
+
+    store_parser = subparsers.add_parser("store", help="Persist analysis results and query them across crawls")
+    store_parser.add_argument("--db", help="SQLite file (default: ANALYSIS_DB_PATH)")
+    store_parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    actions = store_parser.add_subparsers(dest="action", required=True)
+    add_parser = actions.add_parser("add", help="Analyze crawls and store the results")
+    add_parser.add_argument("crawls", nargs="+")
+    actions.add_parser("crawls", help="List stored crawls")
+    forms_parser = actions.add_parser("forms", help="Forms of one type across recent crawls")
+    forms_parser.add_argument("form_type", choices=FORM_TYPES)
+    forms_parser.add_argument("--last", type=int, default=20)
+    apis_parser = actions.add_parser("apis", help="Endpoint templates, or calls to one template")
+    apis_parser.add_argument("template", nargs="?")
+    apis_parser.add_argument("--last", type=int, default=20)
+    pages_parser = actions.add_parser("pages", help="Stored page results by url, role or crawl")
+    pages_parser.add_argument("--url")
+    pages_parser.add_argument("--role")
+    pages_parser.add_argument("--crawl-id", type=int)
+    lcp_parser = actions.add_parser("lcp-regressions", help="Pages whose LCP grew since their previous crawl")
+    lcp_parser.add_argument("--min-ratio", type=float, default=1.2)
+    lcp_parser.add_argument("--min-increase", type=float, default=0.0)
+    store_parser.set_defaults(func=cmd_store)
+
+    throughput_parser = subparsers.add_parser("throughput", help="Discovery rates, stalls and new-state curves over node timestamps")
+    throughput_parser.add_argument("crawl", help="crawler_output.json (.json.gz, .json.zst)")
+    throughput_parser.add_argument("report", choices=["summary", "rate", "roles", "depths", "stalls", "states"])
+    throughput_parser.add_argument("--bins", type=int, default=THROUGHPUT_BINS, help="Time bins across the crawl")
+    throughput_parser.add_argument("--bin-seconds", type=float, help="Fixed bin width instead of --bins")
+    throughput_parser.add_argument("--stall", type=float, default=THROUGHPUT_STALL_SECONDS, help="Stall threshold in seconds")
+    throughput_parser.add_argument("--timeline", action="store_true", help="roles/depths: pages per second per bin")
+    throughput_parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    throughput_parser.set_defaults(func=cmd_throughput)
+
+    serve_parser = subparsers.add_parser("serve", help="Local HTTP/JSON query service over resident crawls")
+    serve_parser.add_argument("crawls", nargs="*", help="Crawl files to load at startup")
+    serve_parser.add_argument("--host", default=QUERY_SERVICE_HOST)
+    serve_parser.add_argument("--port", type=int, default=QUERY_SERVICE_PORT)
+    serve_parser.add_argument("--workers", type=int, default=QUERY_SERVICE_WORKERS, help="Worker threads serving connections")
+    serve_parser.add_argument("--load-dir", help="Allow POST /crawls to load files from this directory (off by default)")
+    serve_parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    serve_parser.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
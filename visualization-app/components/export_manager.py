@@ -2,19 +2,28 @@ import networkx as nx
 import pandas as pd
 from typing import Dict, List
 import json
+from utils.node_store import NodeStore
 
 class ExportManager:
-    def __init__(self, graph: nx.Graph, nodes: List[Dict], edges: List[Dict]):
+    def __init__(self, graph: nx.Graph, nodes: List[Dict], edges: List[Dict], node_store: NodeStore = None):
         self.G = graph
         self.nodes = nodes
         self.edges = edges
+        self.node_store = node_store if node_store is not None else NodeStore(nodes)
     
     def export_to_graphml(self) -> str:
         try:
-            return '\n'.join(nx.generate_graphml(self.G))
+            return '\n'.join(nx.generate_graphml(self._graph_with_attributes()))
         except Exception as e:
             return f"Error generating GraphML: {str(e)}"
     
+    def _graph_with_attributes(self) -> nx.DiGraph:
+        # Full node attributes are pulled from the store only for the duration of the export
+        H = nx.DiGraph()
+        H.add_nodes_from((n, self.node_store.export_attributes(n)) for n in self.G.nodes())
+        H.add_edges_from(self.G.edges(data=True))
+        return H
+    
     def export_to_csv_nodes(self) -> pd.DataFrame:
         df_data = []
         for node in self.nodes:
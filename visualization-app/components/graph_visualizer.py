@@ -1,19 +1,32 @@
 import plotly.graph_objects as go
 import networkx as nx
-from config import NODE_COLORS
+import numpy as np
+from typing import Dict, List
+from config import NODE_COLORS, LOD_MAX_MARKS, LOD_MAX_EDGES, LOD_HOVER_NODES, LOD_LABEL_NODES, JOURNEY_COLORS
+from utils.networkx_utils import GraphView
+from utils.node_store import NodeStore
+from utils.spatial_index import GridSpatialIndex, Viewport
+
+DEFAULT_NODE_COLOR = '#D3D3D3'
 
 class InteractiveGraphVisualizer:
-    def __init__(self, graph: nx.Graph, positions: dict, node_data: list):
+    def __init__(self, graph: nx.Graph, positions: dict, node_data, view: GraphView = None):
         self.G = graph
         self.pos = positions
-        self.node_data = {n['id']: n for n in node_data}
+        # Accept the builder's shared store so the id -> node map is not duplicated
+        self.node_data = node_data if isinstance(node_data, NodeStore) else NodeStore(node_data)
+        # With a view, node ids, edges and roles are sliced from precomputed arrays
+        self.view = view
+        self._index = None
         
     def create_plotly_figure(self):
         edge_trace = self._create_edge_trace()
         node_trace = self._create_node_trace()
-        
+        return self._build_figure([edge_trace, node_trace])
+    
+    def _build_figure(self, traces, viewport: Viewport = None):
         fig = go.Figure(
-            data=[edge_trace, node_trace],
+            data=traces,
             layout=go.Layout(
                 showlegend=True,
                 hovermode='closest',
@@ -25,8 +38,179 @@ class InteractiveGraphVisualizer:
             )
         )
         
+        if viewport is not None:
+            fig.update_xaxes(range=[viewport[0], viewport[1]])
+            fig.update_yaxes(range=[viewport[2], viewport[3]])
+        
         return fig
     
+    @property
+    def spatial_index(self) -> GridSpatialIndex:
+        if self._index is None:
+            roles = list(NODE_COLORS)
+            self._colors = np.array(list(NODE_COLORS.values()) + [DEFAULT_NODE_COLOR])
+            if self.view is not None:
+                self._node_ids = self.view.node_ids.tolist()
+                distinct, inverse = np.unique(self.view.attribute_array('role', 'guest').astype(str), return_inverse=True)
+                self._role_codes = np.array([roles.index(r) if r in NODE_COLORS else len(roles) for r in distinct], dtype=np.int64)[inverse]
+                coords = np.array([self.pos[n] for n in self._node_ids], dtype=np.float64).reshape(-1, 2)
+                self._index = GridSpatialIndex(coords[:, 0], coords[:, 1], self.view.edge_src, self.view.edge_dst, self._role_codes)
+                return self._index
+            
+            self._node_ids = list(self.G.nodes())
+            self._role_codes = np.array([
+                roles.index(r) if r in NODE_COLORS else len(roles)
+                for r in (self.node_data.get_attribute(n, 'role', 'guest') for n in self._node_ids)
+            ], dtype=np.int64)
+            self._index = GridSpatialIndex.from_positions(self._node_ids, self.pos, list(self.G.edges()), self._role_codes)
+        return self._index
+    
+    def viewport_at(self, center_x: float = 0.5, center_y: float = 0.5, zoom: float = 1.0) -> Viewport:
+        return self.spatial_index.viewport_at(center_x, center_y, zoom)
+    
+    def create_viewport_figure(self, viewport: Viewport = None, max_marks: int = LOD_MAX_MARKS, highlight_paths: Dict[str, List[str]] = None):
+        """Figure containing only the marks inside the viewport, at a detail level matching the zoom.
+        
+        Cost depends on what is visible, not on graph size: zoomed out, nodes and edges come from
+        pre-aggregated grid cells; zoomed in, only the nodes in the viewport and their edges are
+        drawn, with hover text and then labels added as fewer nodes remain visible.
+        """
+        index = self.spatial_index
+        if viewport is None:
+            viewport = index.viewport_at(0.5, 0.5, 1.0)
+        
+        if index.count_in_view(viewport) > max_marks:
+            traces = self._aggregated_traces(viewport, max_marks)
+        else:
+            traces = self._detailed_traces(viewport)
+        if highlight_paths:
+            traces += self._highlight_traces(highlight_paths)
+        
+        # Small margin so boundary markers are not clipped
+        pad_x = (viewport[1] - viewport[0]) * 0.02
+        pad_y = (viewport[3] - viewport[2]) * 0.02
+        return self._build_figure(traces, (viewport[0] - pad_x, viewport[1] + pad_x, viewport[2] - pad_y, viewport[3] + pad_y))
+    
+    def _aggregated_traces(self, viewport: Viewport, max_marks: int):
+        index = self.spatial_index
+        level = index.level_for(viewport, max_marks)
+        agg = index.aggregate(level)
+        side = agg['side']
+        c0, c1, r0, r1 = index.cell_range_at(level, viewport)
+        
+        columns, rows = agg['cells'] // side, agg['cells'] % side
+        in_view = (columns >= c0) & (columns <= c1) & (rows >= r0) & (rows <= r1)
+        visible_cells = np.zeros(side * side, dtype=bool)
+        visible_cells[agg['cells'][in_view]] = True
+        
+        src, dst, weight = agg['edge_src_cell'], agg['edge_dst_cell'], agg['edge_weight']
+        keep = (visible_cells[src] | visible_cells[dst]) & (src != dst)
+        src, dst, weight = src[keep], dst[keep], weight[keep]
+        if len(weight) > max_marks:
+            heaviest = np.argpartition(-weight, max_marks)[:max_marks]
+            src, dst, weight = src[heaviest], dst[heaviest], weight[heaviest]
+        
+        traces = []
+        # One trace per width bucket, since Plotly line width is per trace
+        buckets = np.minimum(np.log2(weight).astype(np.int64) // 2, 3) if len(weight) else weight
+        for bucket in np.unique(buckets):
+            chosen = buckets == bucket
+            traces.append(go.Scatter(
+                x=self._segments(agg['centroid_x'][src[chosen]], agg['centroid_x'][dst[chosen]]),
+                y=self._segments(agg['centroid_y'][src[chosen]], agg['centroid_y'][dst[chosen]]),
+                line=dict(width=0.5 + bucket, color='#888'),
+                hoverinfo='none',
+                mode='lines',
+                name='Edges',
+                showlegend=bool(bucket == buckets.min())
+            ))
+        
+        counts = agg['counts'][in_view]
+        traces.append(go.Scatter(
+            x=agg['x'][in_view], y=agg['y'][in_view],
+            mode='markers',
+            hoverinfo='text',
+            text=[f"{c} pages" for c in counts],
+            marker=dict(
+                size=np.clip(6 + 3 * np.sqrt(counts), 6, 40),
+                color=self._colors[agg['category'][in_view]],
+                line=dict(width=1, color='white')
+            ),
+            name='Page clusters'
+        ))
+        return traces
+    
+    def _detailed_traces(self, viewport: Viewport):
+        index = self.spatial_index
+        visible = index.query(viewport)
+        edges = index.incident_edges(visible)
+        if len(edges) > LOD_MAX_EDGES:
+            edges = index.incident_edges(visible, both_endpoints=True)[:LOD_MAX_EDGES]
+        
+        src, dst = index.edge_src[edges], index.edge_dst[edges]
+        edge_trace = go.Scatter(
+            x=self._segments(index.xs[src], index.xs[dst]),
+            y=self._segments(index.ys[src], index.ys[dst]),
+            line=dict(width=0.5, color='#888'),
+            hoverinfo='none',
+            mode='lines',
+            name='Edges'
+        )
+        
+        node_trace = go.Scatter(
+            x=index.xs[visible], y=index.ys[visible],
+            mode='markers',
+            hoverinfo='skip',
+            marker=dict(
+                size=15,
+                color=self._colors[self._role_codes[visible]],
+                line=dict(width=2, color='white')
+            ),
+            name='Pages'
+        )
+        
+        if len(visible) <= LOD_HOVER_NODES:
+            node_ids = [self._node_ids[i] for i in visible]
+            node_trace.hoverinfo = 'text'
+            node_trace.text = [self._hover_text(n) for n in node_ids]
+            if len(visible) <= LOD_LABEL_NODES:
+                node_trace.mode = 'markers+text'
+                node_trace.textposition = 'top center'
+                node_trace.hovertext = node_trace.text
+                node_trace.text = [str(self.node_data.get_attribute(n, 'title', n))[:24] for n in node_ids]
+        
+        return [edge_trace, node_trace]
+    
+    def _highlight_traces(self, paths: Dict[str, List[str]]):
+        """One trace per named path drawn over the graph; hops to nodes without a position are skipped"""
+        traces = []
+        for rank, (name, path) in enumerate(paths.items()):
+            placed = [n for n in path if n in self.pos]
+            if not placed:
+                continue
+            xs = np.array([self.pos[n][0] for n in placed], dtype=np.float64)
+            ys = np.array([self.pos[n][1] for n in placed], dtype=np.float64)
+            color = JOURNEY_COLORS[rank % len(JOURNEY_COLORS)]
+            traces.append(go.Scatter(
+                x=xs, y=ys,
+                mode='lines+markers',
+                line=dict(width=4, color=color),
+                marker=dict(size=18, color=color, symbol='circle-open', line=dict(width=3)),
+                hoverinfo='text',
+                text=[self._hover_text(n) for n in placed],
+                name=f"{name} ({len(path) - 1} hops)"
+            ))
+        return traces
+    
+    def _hover_text(self, node) -> str:
+        node_info = self.node_data.get(node, {})
+        return f"{node}<br>{node_info.get('title', 'Unknown')}<br>{node_info.get('url', '')}"
+    
+    @staticmethod
+    def _segments(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        # NaN breaks the line between consecutive segments, like None in a list
+        return np.column_stack((starts, ends, np.full(len(starts), np.nan))).ravel()
+    
     def _create_edge_trace(self):
         edge_x, edge_y = [], []
         
@@ -52,13 +236,8 @@ class InteractiveGraphVisualizer:
             node_x.append(x)
             node_y.append(y)
             
-            node_info = self.node_data.get(node, {})
-            title = node_info.get('title', 'Unknown')
-            role = node_info.get('role', 'guest')
-            url = node_info.get('url', '')
-            
-            node_text.append(f"{node}<br>{title}<br>{url}")
-            node_color.append(NODE_COLORS.get(role, '#D3D3D3'))
+            node_text.append(self._hover_text(node))
+            node_color.append(NODE_COLORS.get(self.node_data.get_attribute(node, 'role', 'guest'), DEFAULT_NODE_COLOR))
         
         return go.Scatter(
             x=node_x, y=node_y,
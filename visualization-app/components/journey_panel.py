@@ -0,0 +1,127 @@
+import json
+import streamlit as st
+import plotly.graph_objects as go
+from typing import Dict, List
+from config import JOURNEY_MAX_PATHS
+from utils.journey_analysis import JourneyAnalyzer, journey_table
+
+class JourneyPanel:
+    def __init__(self, analyzer: JourneyAnalyzer, candidate_nodes: List[Dict]):
+        self.analyzer = analyzer
+        # States offered for selection: the displayed nodes that exist in the analyzed view
+        self.candidates = [n['id'] for n in candidate_nodes if n['id'] in analyzer.graph.index]
+        self.labels = {n['id']: self._label(n) for n in candidate_nodes}
+
+    @staticmethod
+    def _label(node: Dict) -> str:
+        url = node.get('url', '')
+        return f"{node.get('title', node['id'])} ({url[:30]}...)" if len(url) > 30 else f"{node.get('title', node['id'])} ({url})"
+
+    def display(self) -> Dict[str, List[str]]:
+        """Render the journey tabs and return the named paths to highlight in the graph"""
+        st.subheader("Journey Analysis")
+        st.caption("Computed over every recorded transition in the selected crawl view")
+
+        if not self.candidates:
+            st.info("No states available for journey analysis")
+            return {}
+
+        paths_tab, sequences_tab, funnel_tab = st.tabs(["🛤️ Paths", "🔁 Action Sequences", "📉 Funnel"])
+        highlights = {}
+        with paths_tab:
+            highlights.update(self._display_paths())
+        with sequences_tab:
+            self._display_sequences()
+        with funnel_tab:
+            highlights.update(self._display_funnel())
+        return highlights
+
+    def _display_paths(self) -> Dict[str, List[str]]:
+        col1, col2 = st.columns(2)
+        with col1:
+            source = st.selectbox("From state", self.candidates, format_func=self.labels.get, key="journey_source")
+
+        reachable = self.analyzer.reachable_from(source)
+        targets = sorted((n for n in self.candidates if n in reachable), key=lambda n: (reachable[n], self.labels[n]))
+        if not targets:
+            st.info("No displayed state is reachable from this state")
+            return {}
+
+        with col2:
+            target = st.selectbox(
+                "To state",
+                targets,
+                format_func=lambda n: f"{self.labels[n]} · {reachable[n]} hops",
+                key="journey_target"
+            )
+        k = st.slider("Number of paths", 1, JOURNEY_MAX_PATHS, 3, key="journey_k")
+        highlight = st.checkbox("Highlight paths in graph", value=True, key="journey_highlight")
+
+        paths = self.analyzer.k_shortest_paths(source, target, k)
+        for record in paths:
+            steps = [record['titles'][0]]
+            for action, title in zip(record['actions'], record['titles'][1:]):
+                steps.append(f"*{action or '?'}* → {title}")
+            st.markdown(f"**Path {record['rank']}** ({record['hops']} hops): " + " ".join(steps))
+
+        self._download_buttons(paths, "journey_paths")
+        return {f"Path {record['rank']}": record['path'] for record in paths} if highlight else {}
+
+    def _display_sequences(self):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            role = st.selectbox("Role", ["All"] + self.analyzer.roles.tolist(), key="journey_sequence_role")
+        with col2:
+            min_length, max_length = st.slider("Sequence length", 2, 5, (2, 3), key="journey_sequence_length")
+        with col3:
+            top = st.number_input("Top sequences", 5, 200, 20, step=5, key="journey_sequence_top")
+
+        sequences = self.analyzer.action_sequences(min_length, max_length, int(top), None if role == "All" else role)
+        if not sequences:
+            st.info("No action sequences of this length")
+            return
+        st.dataframe(journey_table(sequences), use_container_width=True, hide_index=True)
+        self._download_buttons(sequences, "action_sequences")
+
+    def _display_funnel(self) -> Dict[str, List[str]]:
+        steps = st.multiselect(
+            "Funnel states (in order)",
+            self.candidates,
+            format_func=self.labels.get,
+            max_selections=10,
+            key="journey_funnel_steps",
+            help="Conversion at each step is the share of traversals leaving it that move closer to the next step"
+        )
+        if len(steps) < 2:
+            st.info("Select at least two states")
+            return {}
+
+        rows = self.analyzer.funnel(steps)
+        fig = go.Figure(go.Funnel(
+            y=[f"{row['step']}. {str(row['title'])[:30]}" for row in rows],
+            x=[row['cumulative'] * 100 for row in rows],
+            texttemplate="%{x:.1f}%"
+        ))
+        fig.update_layout(height=80 + 50 * len(rows), margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(journey_table(rows), use_container_width=True, hide_index=True)
+        self._download_buttons(rows, "funnel")
+
+        highlight = st.checkbox("Highlight funnel route in graph", value=False, key="journey_funnel_highlight")
+        if not highlight:
+            return {}
+        route = []
+        for a, b in zip(steps, steps[1:]):
+            hop = self.analyzer.shortest_path(a, b)
+            if hop:
+                route += hop if not route else hop[1:]
+        return {"Funnel route": route} if route else {}
+
+    def _download_buttons(self, rows: List[Dict], name: str):
+        if not rows:
+            return
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Download CSV", journey_table(rows).to_csv(index=False), f"{name}.csv", "text/csv", key=f"{name}_csv")
+        with col2:
+            st.download_button("Download JSON", json.dumps(rows, indent=2, default=str), f"{name}.json", "application/json", key=f"{name}_json")
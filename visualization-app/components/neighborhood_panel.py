@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import List, Optional
+from config import EGO_CENTER_OPTIONS, EGO_DEFAULT_HOPS, EGO_MAX_HOPS, EGO_MAX_NODES
+from utils.networkx_utils import EgoView, GraphView
+
+DIRECTIONS = {"both": "Both directions", "out": "Outgoing", "in": "Incoming"}
+
+def explore_neighborhood(node_id: str):
+    """Button callback: switch to neighborhood mode centered on a node"""
+    st.session_state['ego_mode'] = True
+    st.session_state['ego_center'] = node_id
+    st.session_state['ego_hops'] = EGO_DEFAULT_HOPS
+
+
+def _reset_hops():
+    st.session_state['ego_hops'] = EGO_DEFAULT_HOPS
+
+
+def _change_hops(delta: int):
+    hops = st.session_state.get('ego_hops', EGO_DEFAULT_HOPS) + delta
+    st.session_state['ego_hops'] = min(max(hops, 1), EGO_MAX_HOPS)
+
+
+class NeighborhoodPanel:
+    """Center, direction, roles and hop controls for neighborhood mode.
+
+    The hop count lives in session_state so Expand / Collapse add or remove one hop
+    around the same center across reruns; picking another center starts over.
+    """
+
+    def __init__(self, view: GraphView):
+        self.view = view
+
+    def _label(self, node_id: str) -> str:
+        node = self.view.node_store.get(node_id, {})
+        url = node.get('url', '')
+        return f"{node.get('title', node_id)} ({url[:30]}...)" if len(url) > 30 else f"{node.get('title', node_id)} ({url})"
+
+    def _candidates(self, query: str) -> List[str]:
+        """Up to EGO_CENTER_OPTIONS pages whose title, URL or id contain the query, shallowest first"""
+        view = self.view
+        key = (view.builder, view.positions.tobytes(), query)
+        cached = st.session_state.get('ego_candidates')
+        if cached is None or cached[0] != key:
+            order = np.argsort(view.attribute_array('depth', 0).astype(np.int64), kind='stable')
+            if query:
+                text = (pd.Series(view.attribute_array('title', '')).astype(str) + ' '
+                        + pd.Series(view.attribute_array('url', '')).astype(str) + ' ' + pd.Series(view.node_ids))
+                matches = text.str.contains(query, case=False, regex=False).to_numpy()
+                order = order[matches[order]]
+            cached = (key, view.node_ids[order[:EGO_CENTER_OPTIONS]].tolist())
+            st.session_state['ego_candidates'] = cached
+        return cached[1]
+
+    def display(self) -> Optional[EgoView]:
+        st.subheader("Neighborhood")
+        view = self.view
+        if not view.num_nodes:
+            st.info("No nodes available for neighborhood mode")
+            return None
+
+        # A center from another view or filter is dropped instead of failing the selectbox
+        center = st.session_state.get('ego_center')
+        position = view.builder.index.get(center)
+        if center is not None and (position is None or not view.contains(np.array([position]))[0]):
+            del st.session_state['ego_center']
+
+        col1, col2, col3 = st.columns([3, 2, 2])
+        with col1:
+            # Only a bounded list is offered, so the control stays small on very large crawls;
+            # the current center (e.g. handed over by Explore Neighborhood) is always in it
+            query = st.text_input("Find center", key="ego_search", placeholder="Title, URL or id")
+            options = self._candidates(query.strip())
+            center = st.session_state.get('ego_center')
+            if center is not None:
+                options = [center] + [node_id for node_id in options if node_id != center]
+            if not options:
+                st.info(f"No page matches '{query}'")
+                return None
+            center = st.selectbox("Center node", options, format_func=self._label, key="ego_center",
+                                  on_change=_reset_hops)
+        with col2:
+            direction = st.radio("Direction", list(DIRECTIONS), format_func=DIRECTIONS.get, horizontal=True, key="ego_direction")
+        with col3:
+            all_roles = np.unique(view.attribute_array('role', 'guest').astype(str)).tolist()
+            if not set(st.session_state.get('ego_roles', [])) <= set(all_roles):
+                del st.session_state['ego_roles']
+            roles = st.multiselect("Through roles", all_roles, default=all_roles, key="ego_roles",
+                                   help="Only pages of these roles are traversed; the center is always shown")
+
+        hops = st.session_state.setdefault('ego_hops', EGO_DEFAULT_HOPS)
+        ego = view.ego(center, hops, direction, None if set(roles) == set(all_roles) else roles)
+
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            st.button("➕ Expand", on_click=_change_hops, args=(1,), disabled=hops >= EGO_MAX_HOPS or ego.truncated,
+                      key="ego_expand", help="Add one more hop")
+        with col2:
+            st.button("➖ Collapse", on_click=_change_hops, args=(-1,), disabled=hops <= 1,
+                      key="ego_collapse", help="Remove the outermost hop")
+        with col3:
+            caption = (f"{ego.num_nodes} node{'s' if ego.num_nodes != 1 else ''} and {ego.num_edges} "
+                       f"edge{'s' if ego.num_edges != 1 else ''} within {hops} hop{'s' if hops > 1 else ''}")
+            if ego.truncated:
+                caption += f" (cut off at {EGO_MAX_NODES} nodes, nearest first)"
+            st.caption(caption)
+        return ego
@@ -1,11 +1,24 @@
 import streamlit as st
-from typing import Dict
+import pandas as pd
+from typing import Callable, Dict, List
+from config import NODE_DETAIL_PAGE_SIZE
 from components.testable_components import TestableComponentAnalyzer
 from utils.ai_test_suggester import AITestSuggester
+from utils.crawl_throughput import format_timestamp
 
 class NodeAnalyzer:
-    def __init__(self, node_data: Dict):
+    """Detail panel for one node.
+
+    Streamlit runs the body of an expander whether or not it is open, so the list
+    sections (interactive elements, forms, links, APIs) sit behind toggles instead:
+    their rows are only computed once a toggle is switched on, then kept in
+    session_state for the selected node (of the crawl graph with `graph_digest`) and
+    shown one page at a time as a dataframe.
+    """
+
+    def __init__(self, node_data: Dict, graph_digest: str = ""):
         self.node = node_data
+        self.graph_digest = graph_digest
         self.component_analyzer = TestableComponentAnalyzer(node_data)
         self.ai_suggester = AITestSuggester()
     
@@ -22,159 +35,155 @@ class NodeAnalyzer:
         with col3:
             st.metric("Simulated", "Yes" if self.node.get('simulated') else "No")
         with col4:
-            timestamp = self.node.get('timestamp', 'N/A')
-            # Handle both string and integer timestamps
-            if isinstance(timestamp, (int, float)):
-                timestamp = str(timestamp)
-            st.metric("Timestamp", timestamp[:10] if len(str(timestamp)) > 10 else timestamp)
+            # Epoch milliseconds and date strings both end up as a UTC date and time
+            timestamp = format_timestamp(self.node.get('timestamp'))
+            st.metric("Timestamp", timestamp[:10] if len(timestamp) > 10 else timestamp)
         
         st.write(f"**URL:** {self.node.get('url', 'N/A')}")
+        st.write(f"**Discovered:** {timestamp}")
         
-        # Get all testable components
-        testable_components = self.component_analyzer.get_all_testable_components()
+        # Counts come straight from the node; section data is computed on demand
+        counts = self.component_analyzer.count_components()
+        authentication = self.component_analyzer.analyze_authentication()
         
-        # Display testable components sections
-        self._display_summary_metrics(testable_components)
-        self._display_interactive_elements_section()
-        self._display_forms_section(testable_components['forms'])
-        self._display_links_section(testable_components['links'])
-        self._display_apis_section(testable_components['apis'])
-        self._display_authentication_section(testable_components['authentication'])
-        self._display_performance_section(testable_components['performance'])
-        self._display_accessibility_section(testable_components['accessibility'])
-        self._display_security_section(testable_components['security'])
+        self._display_summary_metrics(counts, authentication)
+        self._display_interactive_elements_section(counts['interactive_elements'])
+        self._display_forms_section(counts['forms'], counts['inputs'])
+        self._display_links_section(counts['links'])
+        self._display_apis_section(counts['apis'])
+        self._display_authentication_section(authentication)
+        self._display_performance_section(self.component_analyzer.analyze_performance())
+        self._display_accessibility_section(self.component_analyzer.analyze_accessibility())
+        self._display_security_section(self.component_analyzer.analyze_security())
         
         # AI-powered test suggestions
-        self._display_ai_test_suggestions(testable_components)
+        self._display_ai_test_suggestions()
+    
+    def _cached(self, section: str, compute: Callable):
+        """Section data for the selected node, computed once and kept across reruns"""
+        # The graph digest tells a node of a newly loaded crawl from a same-id node of the previous one
+        key = (self.graph_digest, self.node.get('id'))
+        cache = st.session_state.get('node_details')
+        if cache is None or cache['key'] != key:
+            cache = st.session_state['node_details'] = {'key': key, 'sections': {}}
+        if section not in cache['sections']:
+            cache['sections'][section] = compute()
+        return cache['sections'][section]
+    
+    def _display_table(self, rows: List[Dict], columns: List[str], key: str):
+        """One page of rows as a dataframe; only the visible slice is turned into a frame"""
+        if not rows:
+            return
+        pages = (len(rows) - 1) // NODE_DETAIL_PAGE_SIZE + 1
+        page = 1
+        if pages > 1:
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                page = int(st.number_input("Page", 1, pages, 1, key=f"{key}_page_{self.node.get('id')}"))
+            with col2:
+                st.caption(f"{len(rows)} rows · page {page} of {pages}")
+        start = (page - 1) * NODE_DETAIL_PAGE_SIZE
+        page_rows = rows[start:start + NODE_DETAIL_PAGE_SIZE]
+        st.dataframe(pd.DataFrame(page_rows, columns=columns), use_container_width=True, hide_index=True)
     
-    def _display_summary_metrics(self, components: Dict):
+    def _display_summary_metrics(self, counts: Dict, auth_data: Dict):
         st.subheader("🎯 Testable Components Summary")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Forms", components['forms']['total_count'])
+            st.metric("Forms", counts['forms'])
         with col2:
-            st.metric("Links", components['links']['total_count'])
+            st.metric("Links", counts['links'])
         with col3:
-            st.metric("APIs", components['apis']['total_count'])
+            st.metric("APIs", counts['apis'])
         with col4:
-            has_auth = "Yes" if components['authentication']['has_authentication'] else "No"
+            has_auth = "Yes" if auth_data['has_authentication'] else "No"
             st.metric("Authentication", has_auth)
     
-    def _display_interactive_elements_section(self):
-        """Display interactive elements found on the page"""
-        interactive_elements = self.node.get('interactiveElements', {})
-        
-        if not interactive_elements:
-            return
-        
-        # Count total interactive elements
-        total_count = 0
-        for element_type, element_data in interactive_elements.items():
+    def _interactive_element_rows(self) -> List[Dict]:
+        rows = []
+        for element_type, element_data in self.node.get('interactiveElements', {}).items():
             if isinstance(element_data, dict):
-                total_count += element_data.get('total', 0)
+                elements = element_data.get('elements', [])
             elif isinstance(element_data, list):
-                total_count += len(element_data)
-        
-        with st.expander(f"🎮 Interactive Elements ({total_count})", expanded=total_count > 0):
-            if total_count > 0:
-                for element_type, element_data in interactive_elements.items():
-                    if isinstance(element_data, dict):
-                        element_count = element_data.get('total', 0)
-                        elements = element_data.get('elements', [])
-                    elif isinstance(element_data, list):
-                        element_count = len(element_data)
-                        elements = element_data
-                    else:
-                        continue
-                    
-                    if element_count > 0:
-                        st.markdown(f"**{element_type.title()}** ({element_count})")
-                        
-                        # Show first 5 elements
-                        for i, elem in enumerate(elements[:5], 1):
-                            if isinstance(elem, dict):
-                                elem_text = elem.get('text', elem.get('label', elem.get('id', 'Unknown')))
-                                elem_selector = elem.get('selector', 'N/A')
-                                st.write(f"  {i}. {elem_text} (`{elem_selector}`)")
-                            elif isinstance(elem, str):
-                                st.write(f"  {i}. {elem}")
-                        
-                        if element_count > 5:
-                            st.write(f"  ... and {element_count - 5} more")
-                        
-                        st.markdown("---")
+                elements = element_data
             else:
-                st.info("No interactive elements detected on this page")
+                continue
+            for elem in elements:
+                if isinstance(elem, dict):
+                    rows.append({
+                        'type': element_type,
+                        'text': elem.get('text', elem.get('label', elem.get('id', 'Unknown'))),
+                        'selector': elem.get('selector', 'N/A')
+                    })
+                elif isinstance(elem, str):
+                    rows.append({'type': element_type, 'text': elem, 'selector': 'N/A'})
+        return rows
     
-    def _display_forms_section(self, forms_data: Dict):
-        with st.expander(f"📝 Forms ({forms_data['total_count']})", expanded=forms_data['total_count'] > 0):
-            if forms_data['total_count'] > 0:
-                for i, form in enumerate(forms_data['items'], 1):
-                    st.markdown(f"**Form {i}: {form['form_type'].title()} Form**")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"Action: `{form['action']}`")
-                    with col2:
-                        st.write(f"Method: `{form['method']}`")
-                    with col3:
-                        st.write(f"Inputs: {form['input_count']}")
-                    
-                    if form['inputs']:
-                        st.write("**Input Fields:**")
-                        for inp in form['inputs']:
-                            input_type = inp.get('type', 'text')
-                            input_name = inp.get('name', inp.get('id', 'unnamed'))
-                            input_label = inp.get('label', '')
-                            input_placeholder = inp.get('placeholder', '')
-                            
-                            # Build display string with all available info
-                            display_parts = [f"{input_type}"]
-                            if input_name and input_name != 'unnamed':
-                                display_parts.append(f"name='{input_name}'")
-                            if input_label:
-                                display_parts.append(f"label='{input_label}'")
-                            if input_placeholder:
-                                display_parts.append(f"placeholder='{input_placeholder}'")
-                            
-                            st.write(f"  - {' | '.join(display_parts)}")
-                    st.markdown("---")
-            else:
-                st.info("No forms detected on this page")
+    def _display_interactive_elements_section(self, total_count: int):
+        """Display interactive elements found on the page"""
+        if not self.node.get('interactiveElements'):
+            return
+        
+        if not st.toggle(f"🎮 Interactive Elements ({total_count})", key="node_section_interactive"):
+            return
+        if total_count > 0:
+            rows = self._cached('interactive_elements', self._interactive_element_rows)
+            self._display_table(rows, ['type', 'text', 'selector'], "node_interactive")
+        else:
+            st.info("No interactive elements detected on this page")
     
-    def _display_links_section(self, links_data: Dict):
-        with st.expander(f"🔗 Links ({links_data['total_count']})", expanded=False):
-            if links_data['total_count'] > 0:
-                link_types = {}
-                for link in links_data['items']:
-                    link_type = link['link_type']
-                    if link_type not in link_types:
-                        link_types[link_type] = []
-                    link_types[link_type].append(link)
-                
-                for link_type, links in link_types.items():
-                    st.markdown(f"**{link_type.title()}** ({len(links)})")
-                    for link in links[:5]:  # Show first 5
-                        st.write(f"  - {link['text']}: `{link['href']}`")
-            else:
-                st.info("No links detected on this page")
+    def _form_rows(self):
+        forms, inputs = [], []
+        for i, form in enumerate(self.component_analyzer.analyze_forms()['items'], 1):
+            forms.append({
+                'form': i,
+                'form_type': form['form_type'],
+                'action': form['action'],
+                'method': form['method'],
+                'input_count': form['input_count'],
+                'has_validation': form['has_validation']
+            })
+            for inp in form['inputs']:
+                inputs.append({
+                    'form': i,
+                    'type': inp.get('type', 'text'),
+                    'name': inp.get('name', inp.get('id', '')),
+                    'label': inp.get('label', ''),
+                    'placeholder': inp.get('placeholder', ''),
+                    'required': inp.get('required', False)
+                })
+        return forms, inputs
     
-    def _display_apis_section(self, apis_data: Dict):
-        with st.expander(f"🌐 API Calls ({apis_data['total_count']})", expanded=False):
-            if apis_data['total_count'] > 0:
-                for i, api in enumerate(apis_data['items'], 1):
-                    st.markdown(f"**API Call {i}: {api['api_type']}**")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"Method: `{api['method']}`")
-                    with col2:
-                        st.write(f"Status: {api['status']}")
-                    with col3:
-                        st.write(f"Response Time: {api['response_time']}ms")
-                    st.write(f"URL: `{api['url']}`")
-                    st.markdown("---")
-            else:
-                st.info("No API calls detected on this page")
+    def _display_forms_section(self, form_count: int, input_count: int):
+        if not st.toggle(f"📝 Forms ({form_count}, {input_count} inputs)", key="node_section_forms"):
+            return
+        if form_count > 0:
+            forms, inputs = self._cached('forms', self._form_rows)
+            self._display_table(forms, ['form', 'form_type', 'action', 'method', 'input_count', 'has_validation'], "node_forms")
+            if inputs:
+                st.write("**Input Fields:**")
+                self._display_table(inputs, ['form', 'type', 'name', 'label', 'placeholder', 'required'], "node_inputs")
+        else:
+            st.info("No forms detected on this page")
+    
+    def _display_links_section(self, link_count: int):
+        if not st.toggle(f"🔗 Links ({link_count})", key="node_section_links"):
+            return
+        links = self._cached('links', lambda: self.component_analyzer.analyze_links()['items'])
+        if links:
+            self._display_table(links, ['link_type', 'text', 'href', 'selector'], "node_links")
+        else:
+            st.info("No links detected on this page")
+    
+    def _display_apis_section(self, api_count: int):
+        if not st.toggle(f"🌐 API Calls ({api_count})", key="node_section_apis"):
+            return
+        apis = self._cached('apis', lambda: self.component_analyzer.analyze_apis()['items'])
+        if apis:
+            self._display_table(apis, ['api_type', 'method', 'status', 'response_time', 'url'], "node_apis")
+        else:
+            st.info("No API calls detected on this page")
     
     def _display_authentication_section(self, auth_data: Dict):
         with st.expander("🔐 Authentication", expanded=auth_data['has_authentication']):
@@ -189,7 +198,7 @@ class NodeAnalyzer:
             if perf_data['lcp'] > 0:
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("LCP", f"{perf_data['lcp']:.2f}s", 
+                    st.metric("LCP", f"{perf_data['lcp']:.2f}s",
                              delta="Poor" if perf_data['lcp'] > 2.5 else "Good")
                 with col2:
                     st.metric("FID", f"{perf_data['fid']:.0f}ms",
@@ -218,11 +227,17 @@ class NodeAnalyzer:
             with col2:
                 st.write(f"**PII Detected:** {'Yes' if security_data['has_pii'] else 'No'}")
     
-    def _display_ai_test_suggestions(self, testable_components: Dict):
+    def _display_ai_test_suggestions(self):
         st.subheader("🤖 AI-Powered Test Case Suggestions")
+        if not st.toggle("Generate test case suggestions", key="node_section_ai",
+                         help="Sends this page's component analysis to the Gemini API"):
+            return
+        
+        def suggest():
+            with st.spinner("Generating test case suggestions with AI..."):
+                return self.ai_suggester.suggest_test_cases(self.component_analyzer.get_all_testable_components(), self.node)
         
-        with st.spinner("Generating test case suggestions with AI..."):
-            test_cases = self.ai_suggester.suggest_test_cases(testable_components, self.node)
+        test_cases = self._cached('ai_suggestions', suggest)
         
         if test_cases:
             for i, tc in enumerate(test_cases, 1):
@@ -231,4 +246,4 @@ class NodeAnalyzer:
                     st.write(f"**Type:** {tc.get('type', 'N/A')}")
                     st.write(f"**Priority:** {tc.get('priority', 'N/A')}")
         else:
-            st.warning("No test case suggestions generated")
\ No newline at end of file
+            st.warning("No test case suggestions generated")
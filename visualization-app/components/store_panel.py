@@ -0,0 +1,60 @@
+import streamlit as st
+import pandas as pd
+from config import ANALYSIS_RECENT_CRAWLS
+from utils.analysis_store import AnalysisStore, FORM_TYPES
+
+QUERIES = ["Forms by type", "LCP regressions", "API endpoints", "Pages", "Stored crawls"]
+
+class AnalysisStorePanel:
+    def __init__(self, store: AnalysisStore):
+        self.store = store
+
+    def display(self):
+        with st.expander("🗄️ Cross-Crawl Queries"):
+            crawls = self.store.crawls()
+            if not crawls:
+                st.info("No crawls stored yet. Use **Store Analysis** in the sidebar to add the loaded files.")
+                return
+
+            query = st.selectbox("Query", QUERIES, key="store_query")
+            rows = None
+            if query == "Forms by type":
+                col1, col2 = st.columns(2)
+                with col1:
+                    form_type = st.selectbox("Form type", FORM_TYPES, key="store_form_type")
+                with col2:
+                    last = st.number_input("Most recent crawls", 1, 1000, ANALYSIS_RECENT_CRAWLS, key="store_form_last")
+                rows = self.store.forms_by_type(form_type, int(last))
+            elif query == "LCP regressions":
+                col1, col2 = st.columns(2)
+                with col1:
+                    ratio = st.number_input("Minimum ratio", 1.0, 10.0, 1.2, step=0.1, key="store_lcp_ratio")
+                with col2:
+                    increase = st.number_input("Minimum increase (s)", 0.0, 60.0, 0.0, step=0.1, key="store_lcp_increase")
+                rows = self.store.lcp_regressions(ratio, increase)
+            elif query == "API endpoints":
+                templates = self.store.api_templates()
+                template = st.selectbox("Endpoint template", ["(all)"] + [t['template'] for t in templates], key="store_api_template")
+                rows = templates if template == "(all)" else self.store.apis_by_template(template)
+            elif query == "Pages":
+                col1, col2 = st.columns(2)
+                with col1:
+                    url = st.text_input("URL", key="store_page_url").strip()
+                with col2:
+                    role = st.selectbox("Role", ["(any)", "guest", "user", "admin"], key="store_page_role")
+                if url or role != "(any)":
+                    rows = self.store.pages(url=url or None, role=None if role == "(any)" else role)
+                else:
+                    st.info("Enter a URL or choose a role")
+            else:
+                rows = crawls
+
+            if rows is None:
+                return
+            if rows:
+                df = pd.DataFrame(rows)
+                st.write(f"{len(df)} rows")
+                st.dataframe(df, use_container_width=True, hide_index=True)
+                st.download_button("Download CSV", df.to_csv(index=False), "query.csv", "text/csv", key="store_query_csv")
+            else:
+                st.info("No results")
@@ -17,6 +17,24 @@ class TestableComponentAnalyzer:
             'security': self.analyze_security()
         }
     
+    def count_components(self) -> Dict:
+        """Raw element counts read straight from the node, without classifying anything"""
+        forms = self.node.get('forms', [])
+        network = self.node.get('network', {})
+        interactive = 0
+        for element_data in self.node.get('interactiveElements', {}).values():
+            if isinstance(element_data, dict):
+                interactive += element_data.get('total', 0)
+            elif isinstance(element_data, list):
+                interactive += len(element_data)
+        return {
+            'forms': len(forms),
+            'inputs': sum(len(form.get('inputs', [])) for form in forms),
+            'links': len(self.node.get('links', [])),
+            'apis': len(network.get('requests', [])) + len(network.get('websockets', [])),
+            'interactive_elements': interactive
+        }
+    
     def analyze_forms(self) -> Dict:
         classified_forms = self.classifier.classify_forms()
         
@@ -0,0 +1,79 @@
+import streamlit as st
+import plotly.graph_objects as go
+from config import THROUGHPUT_BINS, THROUGHPUT_STALL_SECONDS
+from utils.crawl_throughput import CrawlThroughput
+
+class ThroughputPanel:
+    def __init__(self, throughput: CrawlThroughput):
+        self.throughput = throughput
+
+    def display(self):
+        st.subheader("Crawl Throughput")
+        throughput = self.throughput
+        if throughput.num_timed < 2:
+            st.info("Not enough timestamped nodes for a throughput timeline")
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            bins = st.slider("Time bins", 10, 1000, THROUGHPUT_BINS, step=10, key="throughput_bins")
+            bin_seconds = throughput.bin_seconds(bins)
+        with col2:
+            stall_seconds = st.number_input("Stall threshold (s)", 0.1, 3600.0, THROUGHPUT_STALL_SECONDS,
+                                            key="throughput_stall_seconds")
+
+        summary = throughput.summary(stall_seconds, bin_seconds)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Pages/s", f"{summary['pages_per_second']:.2f}")
+        with col2:
+            st.metric("Peak Pages/s", f"{summary['peak_pages_per_second']:.2f}")
+        with col3:
+            st.metric("Stalls", summary['stalls'])
+        with col4:
+            st.metric("Stalled", f"{summary['stalled_seconds']:.0f}s")
+        if summary['timed_pages'] < summary['pages']:
+            st.caption(f"{summary['pages'] - summary['timed_pages']} nodes without a timestamp are left out")
+        st.caption(f"{bin_seconds:g}s bins over {throughput.duration:.0f}s")
+
+        rate_tab, role_tab, depth_tab, stall_tab, state_tab = st.tabs(
+            ["📈 Pages/s", "👥 By Role", "🪜 By Depth", "⏸️ Stalls", "🆕 New States"]
+        )
+        with rate_tab:
+            rates = throughput.rate_series(bin_seconds)
+            fig = go.Figure(go.Scatter(x=rates['time'], y=rates['pages_per_second'], mode='lines', name="Pages/s"))
+            self._show(fig, "Seconds since crawl start", "Pages/s")
+        with role_tab:
+            self._display_grouped('role', bin_seconds)
+        with depth_tab:
+            self._display_grouped('depth', bin_seconds)
+        with stall_tab:
+            stalls = throughput.stalls(stall_seconds)
+            if stalls.empty:
+                st.info(f"No gaps longer than {stall_seconds:g}s between discoveries")
+            else:
+                st.dataframe(stalls, use_container_width=True, hide_index=True)
+                st.download_button("Download CSV", stalls.to_csv(index=False), "stalls.csv", "text/csv", key="throughput_stalls_csv")
+        with state_tab:
+            curve = throughput.new_state_curve(bins)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=curve['time'], y=curve['states'], mode='lines', name="States"))
+            fig.add_trace(go.Scatter(x=curve['time'], y=curve['urls'], mode='lines', name="Distinct URLs"))
+            fig.add_trace(go.Scatter(x=curve['time'], y=curve['since_new_url'], mode='lines', name="Seconds since new URL",
+                                     yaxis='y2', line=dict(dash='dot')))
+            fig.update_layout(yaxis2=dict(title="Seconds since new URL", overlaying='y', side='right'))
+            self._show(fig, "Seconds since crawl start", "Discovered")
+
+    def _display_grouped(self, by: str, bin_seconds: float):
+        rates = self.throughput.rate_by(by, bin_seconds)
+        fig = go.Figure()
+        for group, rows in rates.groupby(by, sort=True):
+            fig.add_trace(go.Scatter(x=rows['time'], y=rows['pages_per_second'], mode='lines', name=f"{by} {group}",
+                                     stackgroup='rate'))
+        self._show(fig, "Seconds since crawl start", "Pages/s")
+        st.dataframe(self.throughput.discovery_by(by), use_container_width=True, hide_index=True)
+
+    @staticmethod
+    def _show(fig: go.Figure, x_title: str, y_title: str):
+        fig.update_layout(height=320, margin=dict(l=0, r=0, t=10, b=0), xaxis_title=x_title, yaxis_title=y_title)
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from config import ANALYSIS_DB_PATH, ANALYSIS_RECENT_CRAWLS
+from components.testable_components import TestableComponentAnalyzer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    crawl_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE,
+    crawled_at TEXT,
+    stored_at REAL NOT NULL,
+    node_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    crawl_id INTEGER NOT NULL REFERENCES crawls(crawl_id) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    url TEXT, title TEXT, role TEXT, depth INTEGER, simulated INTEGER,
+    has_auth INTEGER, uses_https INTEGER,
+    form_count INTEGER, link_count INTEGER, api_count INTEGER,
+    lcp REAL, fid REAL, cls REAL, fcp REAL, ttfb REAL,
+    has_performance_issues INTEGER, aria_failures INTEGER, color_contrast_failures INTEGER,
+    PRIMARY KEY (crawl_id, node_id)
+);
+CREATE TABLE IF NOT EXISTS forms (
+    crawl_id INTEGER NOT NULL REFERENCES crawls(crawl_id) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    form_type TEXT, action TEXT, method TEXT, input_count INTEGER, has_validation INTEGER
+);
+CREATE TABLE IF NOT EXISTS links (
+    crawl_id INTEGER NOT NULL REFERENCES crawls(crawl_id) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    link_type TEXT, href TEXT, text TEXT, selector TEXT
+);
+CREATE TABLE IF NOT EXISTS apis (
+    crawl_id INTEGER NOT NULL REFERENCES crawls(crawl_id) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    api_type TEXT, method TEXT, url TEXT, template TEXT, status INTEGER, response_time REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_url ON pages(url, crawl_id);
+CREATE INDEX IF NOT EXISTS idx_pages_role ON pages(role, crawl_id);
+CREATE INDEX IF NOT EXISTS idx_forms_type ON forms(form_type, crawl_id);
+CREATE INDEX IF NOT EXISTS idx_forms_crawl ON forms(crawl_id, node_id);
+CREATE INDEX IF NOT EXISTS idx_links_crawl ON links(crawl_id, node_id);
+CREATE INDEX IF NOT EXISTS idx_apis_template ON apis(template, crawl_id);
+CREATE INDEX IF NOT EXISTS idx_apis_crawl ON apis(crawl_id, node_id);
+"""
+
+FORM_TYPES = ['login', 'registration', 'contact', 'search', 'order', 'payment', 'other']
+
+# Path segments that identify a resource rather than an endpoint
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8,}|[0-9a-fA-F-]{36})$')
+
+def api_template(url: str) -> str:
+    """Endpoint template for grouping requests: path with ids replaced, query dropped"""
+    path = urlsplit(url).path or '/'
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+def crawl_digest(nodes: List[Dict]) -> str:
+    """Content digest of a crawl's nodes, so re-storing the same upload is a no-op"""
+    h = hashlib.sha256()
+    for node in sorted(nodes, key=lambda n: n['id']):
+        h.update(json.dumps(node, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+class AnalysisStore:
+    """SQLite store of per-node TestableComponentAnalyzer results across crawls.
+
+    Each stored crawl gets a crawl_id; pages, forms, links and APIs are written with one
+    executemany per table inside a single transaction. Indexes on url, role, form type,
+    API template and crawl_id keep cross-crawl questions to index lookups.
+    """
+
+    def __init__(self, db_path: str = ANALYSIS_DB_PATH):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._write_lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def find_crawl(self, digest: str) -> Optional[int]:
+        row = self.conn.execute("SELECT crawl_id FROM crawls WHERE digest = ?", (digest,)).fetchone()
+        return row['crawl_id'] if row else None
+
+    def store_crawl(self, name: str, nodes: List[Dict], metadata: Dict = None) -> int:
+        """Analyze every node and store the results; returns the crawl_id (existing one if already stored)"""
+        digest = crawl_digest(nodes)
+        existing = self.find_crawl(digest)
+        if existing is not None:
+            return existing
+
+        pages, forms, links, apis = [], [], [], []
+        for node in nodes:
+            node_id = node['id']
+            components = TestableComponentAnalyzer(node).get_all_testable_components()
+            performance, accessibility = components['performance'], components['accessibility']
+            pages.append((
+                node_id, node['url'], node['title'], node['role'], node['depth'], int(node['simulated']),
+                int(bool(components['authentication']['has_authentication'])), int(components['security']['uses_https']),
+                components['forms']['total_count'], components['links']['total_count'], components['apis']['total_count'],
+                performance['lcp'], performance['fid'], performance['cls'], performance['fcp'], performance['ttfb'],
+                int(performance['has_issues']), accessibility['aria_failures'], accessibility['color_contrast_failures']
+            ))
+            forms.extend((node_id, f['form_type'], f['action'], f['method'], f['input_count'], int(f['has_validation']))
+                         for f in components['forms']['items'])
+            links.extend((node_id, l['link_type'], l['href'], l['text'], l['selector']) for l in components['links']['items'])
+            apis.extend((node_id, a['api_type'], a['method'], a['url'], api_template(a['url']), a['status'], a['response_time'])
+                        for a in components['apis']['items'])
+
+        metadata = metadata or {}
+        with self._write_lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO crawls (name, digest, crawled_at, stored_at, node_count) VALUES (?, ?, ?, ?, ?)",
+                (name, digest, metadata.get('generatedAt'), time.time(), len(nodes))
+            )
+            crawl_id = cursor.lastrowid
+            self.conn.executemany(f"INSERT INTO pages VALUES ({crawl_id}, {', '.join('?' * 19)})", pages)
+            self.conn.executemany(f"INSERT INTO forms VALUES ({crawl_id}, ?, ?, ?, ?, ?, ?)", forms)
+            self.conn.executemany(f"INSERT INTO links VALUES ({crawl_id}, ?, ?, ?, ?, ?)", links)
+            self.conn.executemany(f"INSERT INTO apis VALUES ({crawl_id}, ?, ?, ?, ?, ?, ?, ?)", apis)
+        return crawl_id
+
+    def delete_crawl(self, crawl_id: int):
+        with self._write_lock, self.conn:
+            self.conn.execute("DELETE FROM crawls WHERE crawl_id = ?", (crawl_id,))
+
+    def _rows(self, sql: str, params=()) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def crawls(self) -> List[Dict]:
+        return self._rows("SELECT * FROM crawls ORDER BY crawl_id DESC")
+
+    def forms_by_type(self, form_type: str, last_crawls: int = ANALYSIS_RECENT_CRAWLS) -> List[Dict]:
+        """e.g. every login form across the most recent crawls"""
+        return self._rows("""
+            SELECT c.crawl_id, c.name AS crawl, p.url, p.title, p.role, f.action, f.method, f.input_count, f.has_validation
+            FROM forms f
+            JOIN pages p ON p.crawl_id = f.crawl_id AND p.node_id = f.node_id
+            JOIN crawls c ON c.crawl_id = f.crawl_id
+            WHERE f.form_type = ? AND f.crawl_id IN (SELECT crawl_id FROM crawls ORDER BY crawl_id DESC LIMIT ?)
+            ORDER BY c.crawl_id DESC, p.url
+        """, (form_type, last_crawls))
+
+    def pages(self, url: str = None, role: str = None, crawl_id: int = None) -> List[Dict]:
+        clauses, params = [], []
+        for column, value in (('url', url), ('role', role), ('crawl_id', crawl_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._rows(f"SELECT * FROM pages {where} ORDER BY crawl_id DESC, url", params)
+
+    def apis_by_template(self, template: str, last_crawls: int = ANALYSIS_RECENT_CRAWLS) -> List[Dict]:
+        """Calls to one endpoint template, with latency and status, across recent crawls"""
+        return self._rows("""
+            SELECT a.crawl_id, c.name AS crawl, p.url AS page_url, a.method, a.url, a.status, a.response_time
+            FROM apis a
+            JOIN pages p ON p.crawl_id = a.crawl_id AND p.node_id = a.node_id
+            JOIN crawls c ON c.crawl_id = a.crawl_id
+            WHERE a.template = ? AND a.crawl_id IN (SELECT crawl_id FROM crawls ORDER BY crawl_id DESC LIMIT ?)
+            ORDER BY a.crawl_id DESC, a.response_time DESC
+        """, (template, last_crawls))
+
+    def api_templates(self, crawl_id: int = None) -> List[Dict]:
+        where = "WHERE crawl_id = ?" if crawl_id is not None else ""
+        return self._rows(f"""
+            SELECT template, COUNT(*) AS calls, COUNT(DISTINCT crawl_id) AS crawls, AVG(response_time) AS avg_response_time
+            FROM apis {where} GROUP BY template ORDER BY calls DESC
+        """, (crawl_id,) if crawl_id is not None else ())
+
+    def lcp_regressions(self, min_ratio: float = 1.2, min_increase: float = 0.0) -> List[Dict]:
+        """Pages (url and role) whose LCP in their latest crawl exceeds the previous crawl's by the given margins"""
+        return self._rows("""
+            WITH per_crawl AS (
+                SELECT url, role, crawl_id, AVG(lcp) AS lcp
+                FROM pages WHERE lcp > 0 GROUP BY url, role, crawl_id
+            ), ordered AS (
+                SELECT url, role, crawl_id, lcp,
+                       LAG(lcp) OVER (PARTITION BY url, role ORDER BY crawl_id) AS previous_lcp,
+                       LAG(crawl_id) OVER (PARTITION BY url, role ORDER BY crawl_id) AS previous_crawl_id,
+                       ROW_NUMBER() OVER (PARTITION BY url, role ORDER BY crawl_id DESC) AS recency
+                FROM per_crawl
+            )
+            SELECT url, role, previous_crawl_id, crawl_id, previous_lcp, lcp, lcp - previous_lcp AS increase
+            FROM ordered
+            WHERE recency = 1 AND previous_lcp IS NOT NULL
+              AND lcp >= previous_lcp * ? AND lcp - previous_lcp >= ?
+            ORDER BY increase DESC
+        """, (min_ratio, min_increase))
@@ -0,0 +1,79 @@
+import gzip
+import io
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Accepted by the uploader; zip members are matched against CRAWL_SUFFIXES
+UPLOAD_TYPES = ["json", "gz", "zst", "zip"]
+CRAWL_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
+
+def detect_compression(stream: BinaryIO) -> Optional[str]:
+    """'gzip', 'zstd', 'zip' or None for plain JSON, from the first bytes without consuming them"""
+    if hasattr(stream, 'peek'):
+        magic = stream.peek(4)[:4]
+    else:
+        start = stream.tell()
+        magic = stream.read(4)
+        stream.seek(start)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    if magic.startswith(ZIP_MAGIC):
+        return 'zip'
+    return None
+
+
+def is_stored(stream: BinaryIO) -> bool:
+    """True for an in-memory buffer or a seekable file, whose bytes can be read whole without decompressing"""
+    return isinstance(stream, (io.BytesIO, io.BufferedReader)) and stream.seekable()
+
+
+def open_decompressed(stream: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """Stream that yields decompressed bytes chunk by chunk as it is read"""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("Reading .zst files requires the 'zstandard' package (pip install zstandard, "
+                         "listed in requirements.txt)")
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+    return stream
+
+
+def iter_crawl_streams(source, name: str) -> Iterator[Tuple[str, BinaryIO, Optional[str]]]:
+    """(crawl name, stream, compression) for each crawl in an upload or path.
+
+    Plain and single-file compressed inputs yield one crawl under `name`; zip archives
+    yield one per member ending in CRAWL_SUFFIXES, named `name/member`. Members are
+    read straight from the archive, never extracted.
+    """
+    opened = not hasattr(source, 'read')
+    stream = open(source, 'rb') if opened else source
+    try:
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        compression = detect_compression(stream)
+        if compression != 'zip':
+            yield name, stream, compression
+            return
+
+        with zipfile.ZipFile(stream) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(CRAWL_SUFFIXES):
+                    continue
+                with archive.open(member) as member_stream:
+                    yield f"{name}/{member.filename}", member_stream, detect_compression(member_stream)
+    finally:
+        if opened:
+            stream.close()
@@ -0,0 +1,427 @@
+import codecs
+import io
+import json
+import re
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+from utils.crawl_archive import is_stored, iter_crawl_streams, open_decompressed
+
+try:
+    import orjson
+    JSON_BACKEND = "orjson"
+except ImportError:
+    orjson = None
+    JSON_BACKEND = "json"
+
+
+class NodeRecord(TypedDict, total=False):
+    id: str
+    url: str
+    title: str
+    role: str
+    depth: int
+    simulated: bool
+    timestamp: Any
+    forms: List[Dict]
+    links: List[Dict]
+    network: Dict
+    interactiveElements: Dict
+
+
+EdgeRecord = TypedDict('EdgeRecord', {'from': str, 'to': str, 'action': str, 'role': str})
+
+STREAM_CHUNK_SIZE = 1 << 20  # Decompressed bytes read per step when parsing a stream
+
+LIST_FIELDS = ('forms', 'links')
+DICT_FIELDS = ('interactiveElements', 'features', 'performance', 'accessibility')
+
+
+class IngestReport:
+    def __init__(self):
+        self.nodes_total = 0
+        self.nodes_kept = 0
+        self.edges_total = 0
+        self.edges_kept = 0
+        self.node_issues: Dict[str, int] = {}
+        self.edge_issues: Dict[str, int] = {}
+
+    def _count(self, issues: Dict[str, int], reason: str):
+        issues[reason] = issues.get(reason, 0) + 1
+
+    @property
+    def nodes_dropped(self) -> int:
+        return self.nodes_total - self.nodes_kept
+
+    @property
+    def edges_dropped(self) -> int:
+        return self.edges_total - self.edges_kept
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(self.node_issues or self.edge_issues)
+
+    def summary(self) -> str:
+        parts = [f"{self.nodes_kept}/{self.nodes_total} nodes and {self.edges_kept}/{self.edges_total} edges kept"]
+        for label, issues in (("node", self.node_issues), ("edge", self.edge_issues)):
+            if issues:
+                parts.append(f"{label} issues: " + ", ".join(f"{k}={v}" for k, v in sorted(issues.items())))
+        return "; ".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            'nodes_total': self.nodes_total,
+            'nodes_kept': self.nodes_kept,
+            'edges_total': self.edges_total,
+            'edges_kept': self.edges_kept,
+            'node_issues': dict(self.node_issues),
+            'edge_issues': dict(self.edge_issues)
+        }
+
+
+class CrawlIngestor:
+    """Single decode + validate + normalize pass over a crawler output.
+
+    Every node that comes out has a string `id` and the defaults the rest of the app
+    relies on (role, depth, simulated, url, title, list/dict payload fields); every edge
+    has string `from`/`to`, `action` and `role`. Records that cannot be repaired are
+    dropped and counted in `report`, so later stages can index records directly.
+    """
+
+    def __init__(self):
+        self.report = IngestReport()
+        self._seen_ids = set()
+
+    @staticmethod
+    def decode(raw) -> Any:
+        if orjson is not None:
+            return orjson.loads(raw)
+        if isinstance(raw, (bytes, bytearray)):
+            raw = raw.decode('utf-8')
+        return json.loads(raw)
+
+    def load(self, source) -> Dict:
+        """Decode a path, file-like object, bytes or str and ingest it; gzip and zstd input is streamed"""
+        if isinstance(source, str) and source.lstrip().startswith('{'):
+            return self.ingest(self.decode(source))
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+
+        crawls = iter_crawl_streams(source, '')
+        try:
+            try:
+                _, stream, compression = next(crawls)
+            except StopIteration:
+                raise ValueError("No crawler output (.json, .json.gz or .json.zst) found in the archive")
+            data = self.load_stream(stream, compression)
+            if next(crawls, None) is not None:
+                raise ValueError("The archive holds several crawls; load it with ingest_crawls")
+            return data
+        finally:
+            crawls.close()
+
+    def load_stream(self, stream: BinaryIO, compression: Optional[str] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> Dict:
+        """Ingest one crawl from a binary stream.
+
+        Plain JSON already in memory or in a seekable file is read and decoded in one call
+        (the fastest path). Everything else (compressed input, zip members, pipes) is
+        decompressed chunk by chunk and parsed incrementally: each node and edge is decoded
+        and normalized as soon as its text is complete, so the decompressed document is
+        never held in memory as a whole.
+        """
+        if compression is None and is_stored(stream):
+            return self.ingest(self.decode(stream.read()))
+
+        reader = _JSONStream(open_decompressed(stream, compression), chunk_size)
+        nodes, edges, sections = [], [], {}
+        handlers = {'nodes': (self.normalize_node, nodes), 'edges': (self.normalize_edge, edges)}
+        if not reader.peek():
+            raise reader.error("Expecting value")
+        if reader.peek() != '{':
+            raise ValueError("Crawler output must be a JSON object with 'nodes' and 'edges'")
+        reader.advance()
+        if reader.peek() == '}':
+            reader.advance()
+        else:
+            while True:
+                if reader.peek() != '"':
+                    raise reader.error("Expecting property name enclosed in double quotes")
+                key = reader.value()
+                reader.expect(':', "Expecting ':' delimiter")
+                if key in handlers:
+                    normalize, records = handlers[key]
+                    items = reader.array_items() if reader.peek() == '[' else _section(reader.value())
+                    for raw in items:
+                        record = normalize(raw)
+                        if record is not None:
+                            records.append(record)
+                else:
+                    sections[key] = reader.value()
+                if reader.expect(',}', "Expecting ',' delimiter") == '}':
+                    break
+        if reader.peek():
+            raise reader.error("Extra data")
+
+        return self._result(
+            nodes,
+            edges,
+            sections.get('metadata') or {},
+            {**(sections.get('stats') or {}), **(sections.get('statistics') or {})}
+        )
+
+    def ingest(self, data: Any) -> Dict:
+        if not isinstance(data, dict):
+            raise ValueError("Crawler output must be a JSON object with 'nodes' and 'edges'")
+        return self.ingest_records(
+            _section(data.get('nodes')),
+            _section(data.get('edges')),
+            data.get('metadata') or {},
+            {**(data.get('stats') or {}), **(data.get('statistics') or {})}
+        )
+
+    def ingest_records(self, nodes: Iterable, edges: Iterable, metadata: Dict = None, statistics: Dict = None) -> Dict:
+        normalized_nodes = [n for n in map(self.normalize_node, nodes) if n is not None]
+        normalized_edges = [e for e in map(self.normalize_edge, edges) if e is not None]
+        return self._result(normalized_nodes, normalized_edges, metadata, statistics)
+
+    def _result(self, nodes: List[NodeRecord], edges: List[EdgeRecord], metadata: Dict, statistics: Dict) -> Dict:
+        self.count_dangling_edges(edges)
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'metadata': metadata if isinstance(metadata, dict) else {},
+            'statistics': statistics if isinstance(statistics, dict) else {},
+            'report': self.report
+        }
+
+    def normalize_node(self, raw: Any) -> Optional[NodeRecord]:
+        report = self.report
+        report.nodes_total += 1
+        if not isinstance(raw, dict):
+            report._count(report.node_issues, 'not_an_object')
+            return None
+
+        node_id = raw.get('id')
+        if isinstance(node_id, int) and not isinstance(node_id, bool):
+            node_id = str(node_id)
+        if not isinstance(node_id, str) or not node_id:
+            report._count(report.node_issues, 'missing_id')
+            return None
+        if node_id in self._seen_ids:
+            report._count(report.node_issues, 'duplicate_id')
+            return None
+        self._seen_ids.add(node_id)
+
+        node = raw
+        node['id'] = node_id
+        repaired = False
+
+        role = node.get('role')
+        if not isinstance(role, str) or not role:
+            node['role'] = 'guest'
+            repaired = repaired or role is not None
+        depth = node.get('depth')
+        if isinstance(depth, bool) or not isinstance(depth, int):
+            node['depth'] = _to_int(depth)
+            repaired = repaired or depth is not None
+        if not isinstance(node.get('simulated'), bool):
+            node['simulated'] = bool(node.get('simulated'))
+        for key, default in (('url', ''), ('title', 'Untitled Page')):
+            if not isinstance(node.get(key), str):
+                repaired = repaired or node.get(key) is not None
+                node[key] = default if node.get(key) is None else str(node[key])
+
+        for key in LIST_FIELDS:
+            value = node.get(key)
+            if not isinstance(value, list):
+                repaired = repaired or value is not None
+                node[key] = []
+            elif not all(isinstance(item, dict) for item in value):
+                node[key] = [item for item in value if isinstance(item, dict)]
+                repaired = True
+        for key in DICT_FIELDS:
+            if not isinstance(node.get(key), dict):
+                repaired = repaired or node.get(key) is not None
+                node[key] = {}
+        # Element counts are compared numerically by the filters
+        for element_data in node['interactiveElements'].values():
+            if isinstance(element_data, dict) and 'total' in element_data:
+                total = element_data['total']
+                if isinstance(total, bool) or not isinstance(total, int):
+                    element_data['total'] = _to_int(total)
+                    repaired = True
+
+        network = node.get('network')
+        if not isinstance(network, dict):
+            repaired = repaired or network is not None
+            network = node['network'] = {}
+        if not isinstance(network.get('requests'), list):
+            network['requests'] = []
+        elif not all(isinstance(r, dict) for r in network['requests']):
+            network['requests'] = [r for r in network['requests'] if isinstance(r, dict)]
+            repaired = True
+
+        if repaired:
+            report._count(report.node_issues, 'repaired')
+        report.nodes_kept += 1
+        return node
+
+    def normalize_edge(self, raw: Any) -> Optional[EdgeRecord]:
+        report = self.report
+        report.edges_total += 1
+        if not isinstance(raw, dict):
+            report._count(report.edge_issues, 'not_an_object')
+            return None
+
+        edge = raw
+        for key in ('from', 'to'):
+            value = edge.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                edge[key] = str(value)
+            elif not isinstance(value, str) or not value:
+                report._count(report.edge_issues, f'missing_{key}')
+                return None
+
+        if not isinstance(edge.get('action'), str):
+            edge['action'] = '' if edge.get('action') is None else str(edge['action'])
+        if not isinstance(edge.get('role'), str) or not edge['role']:
+            edge['role'] = 'guest'
+
+        report.edges_kept += 1
+        return edge
+
+    def count_dangling_edges(self, edges: List[EdgeRecord]):
+        """Record edges whose endpoints are not among the ingested nodes; they are kept as-is"""
+        dangling = sum(1 for e in edges if e['from'] not in self._seen_ids or e['to'] not in self._seen_ids)
+        if dangling:
+            self.report.edge_issues['dangling_endpoint'] = dangling
+
+
+def ingest_crawls(source, name: str) -> Iterator[Tuple[str, Dict]]:
+    """(crawl name, ingested data) for each crawl in a plain, compressed or zip input, each with its own report"""
+    for crawl_name, stream, compression in iter_crawl_streams(source, name):
+        yield crawl_name, CrawlIngestor().load_stream(stream, compression)
+
+
+class _JSONStream:
+    """Incremental reader over JSON text arriving in chunks.
+
+    Values are decoded with the stdlib raw_decode from a sliding buffer; when a value
+    runs past the end of the buffer the next chunk is appended and decoding retried.
+    Consumed text is dropped on every refill, so the buffer holds about one chunk plus
+    the value being decoded. Errors report positions in the whole document, like
+    json.loads on the decompressed text would.
+    """
+
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _decoder = json.JSONDecoder()
+    # A decode error this close to the end of the buffer may only mean the value continues
+    # in the next chunk (a cut literal, number or escape); anywhere else it is final
+    _TAIL = 8
+
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.offset = 0       # Characters dropped from the buffer so far
+        self.lines = 0        # Newlines among them
+        self.line_start = 0   # Document offset of the line the buffer starts in
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False once the stream is exhausted"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            # Nothing is dropped here, so buffer positions held by the caller stay valid
+            self.eof = True
+            self.text += self.text_decoder.decode(b'', final=True)
+            return False
+        dropped = self.text[:self.pos]
+        newline = dropped.rfind('\n')
+        if newline >= 0:
+            self.lines += dropped.count('\n')
+            self.line_start = self.offset + newline + 1
+        self.offset += self.pos
+        self.text = self.text[self.pos:] + self.text_decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    def error(self, message: str, pos: Optional[int] = None) -> json.JSONDecodeError:
+        """A JSONDecodeError at a buffer position, located in the whole document"""
+        pos = self.pos if pos is None else pos
+        newline = self.text.rfind('\n', 0, pos)
+        line_start = self.offset + newline + 1 if newline >= 0 else self.line_start
+        return _StreamDecodeError(message, self.offset + pos, self.lines + self.text.count('\n', 0, pos) + 1,
+                                  self.offset + pos - line_start + 1)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ('' at end of input)"""
+        while True:
+            self.pos = self._WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.fill():
+                return self.text[self.pos:self.pos + 1]
+
+    def advance(self):
+        self.pos += 1
+
+    def expect(self, allowed: str, message: str) -> str:
+        char = self.peek()
+        if not char or char not in allowed:
+            raise self.error(message)
+        self.advance()
+        return char
+
+    def value(self) -> Any:
+        if not self.peek():
+            raise self.error("Expecting value")
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                # Only a value cut off by the buffer end is retried with more text
+                truncated = e.msg.startswith('Unterminated string') or e.pos >= len(self.text) - self._TAIL
+                if truncated and self.fill():
+                    continue
+                raise self.error(e.msg, e.pos) from None
+            # A number ending exactly at the buffer end may continue in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect('[', "Expecting value")
+        if self.peek() == ']':
+            self.advance()
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]', "Expecting ',' delimiter") == ']':
+                return
+
+
+class _StreamDecodeError(json.JSONDecodeError):
+    """JSONDecodeError whose position was worked out by _JSONStream instead of from a document"""
+
+    def __init__(self, msg: str, pos: int, lineno: int, colno: int):
+        ValueError.__init__(self, f"{msg}: line {lineno} column {colno} (char {pos})")
+        self.msg, self.doc, self.pos, self.lineno, self.colno = msg, '', pos, lineno, colno
+
+    def __reduce__(self):
+        return self.__class__, (self.msg, self.pos, self.lineno, self.colno)
+
+
+def _section(value: Any) -> list:
+    """A nodes/edges section as a list; anything but an array counts as one record that is not an object"""
+    if isinstance(value, list):
+        return value
+    return [] if value is None else [None]
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from config import THROUGHPUT_BINS, THROUGHPUT_STALL_SECONDS
+
+def timestamps_ms(values: Iterable) -> np.ndarray:
+    """Epoch milliseconds as float64: numbers pass through, date strings are parsed, anything else is NaN"""
+    values = list(values)
+    raw = np.empty(len(values), dtype=object)
+    raw[:] = values
+    result = np.full(len(raw), np.nan)
+    is_number = np.fromiter((isinstance(v, (int, float)) and not isinstance(v, bool) for v in values), dtype=bool, count=len(raw))
+    result[is_number] = raw[is_number].astype(np.float64)
+    is_string = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(raw))
+    if is_string.any():
+        parsed = pd.to_datetime(pd.Series(raw[is_string]), errors='coerce', utc=True, format='ISO8601')
+        result[is_string] = (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy() * 1000
+    return result
+
+def format_timestamp(value) -> str:
+    """A node timestamp as a UTC date and time, or as given when it cannot be parsed"""
+    millis = timestamps_ms([value])[0]
+    if np.isnan(millis):
+        return 'N/A' if value is None else str(value)
+    return pd.Timestamp(millis, unit='ms', tz='UTC').strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] + ' UTC'
+
+class CrawlThroughput:
+    """Discovery-rate analytics over node timestamps.
+
+    Nodes are sorted by timestamp once; every series below is then a bincount,
+    diff or searchsorted over those arrays, so a million-node crawl costs one sort.
+    Nodes without a usable timestamp are counted but left out of the timeline.
+    Times are reported in seconds since the first timestamped node.
+    """
+
+    def __init__(self, timestamps: np.ndarray, roles: np.ndarray, depths: np.ndarray, urls: np.ndarray,
+                 ids: Optional[np.ndarray] = None, rows: Optional[np.ndarray] = None, role_names: Optional[np.ndarray] = None):
+        """`roles` are names, or codes into `role_names` when given; `urls` may be names or codes"""
+        valid = ~np.isnan(timestamps)
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(timestamps[valid], kind='stable')]
+        self.num_nodes = len(timestamps)
+        self.rows = order if rows is None else rows[order]
+        self.start_ms = float(timestamps[order[0]]) if len(order) else 0.0
+        self.times = (timestamps[order] - self.start_ms) / 1000.0
+        if role_names is None:
+            role_names, roles = np.unique(np.asarray(roles, dtype=object).astype(str), return_inverse=True)
+        self.role_names = np.asarray(role_names)
+        self.roles = np.asarray(roles, dtype=np.int64)[order]
+        self.depths = np.asarray(depths, dtype=np.int64)[order]
+        self.urls = np.unique(np.asarray(urls)[order], return_inverse=True)[1]
+        self.ids = None if ids is None else np.asarray(ids, dtype=object)[order]
+
+    @classmethod
+    def from_nodes(cls, nodes: List[Dict]) -> 'CrawlThroughput':
+        """Straight from normalized nodes (see CrawlIngestor), without building a column table"""
+        return cls(
+            timestamps_ms([n.get('timestamp') for n in nodes]),
+            [n['role'] for n in nodes],
+            np.fromiter((n['depth'] for n in nodes), dtype=np.int64, count=len(nodes)),
+            [n['url'] for n in nodes],
+            ids=[n['id'] for n in nodes]
+        )
+
+    @classmethod
+    def from_table(cls, table, mask: Optional[np.ndarray] = None) -> 'CrawlThroughput':
+        """From a NodeColumnTable (whose parsed timestamps are reused), optionally restricted to the rows selected by `mask`"""
+        timestamps = table.timestamps
+        strings = table.strings
+        rows = np.arange(len(table)) if mask is None else np.flatnonzero(mask)
+        return cls(
+            timestamps[rows],
+            strings['role'].codes[rows],
+            table.numeric['depth'][rows],
+            strings['url'].codes[rows],
+            ids=strings['id'].values[strings['id'].codes[rows]],
+            rows=rows,
+            role_names=strings['role'].values
+        )
+
+    @property
+    def num_timed(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def bin_seconds(self, bins: int = THROUGHPUT_BINS) -> float:
+        """Bin width that splits the crawl into about `bins` intervals (at least one second)"""
+        return max(1.0, float(np.ceil(self.duration / max(bins, 1))))
+
+    def _bins(self, bin_seconds: Optional[float]):
+        width = bin_seconds or self.bin_seconds()
+        index = (self.times // width).astype(np.int64)
+        return width, index, int(index[-1]) + 1 if len(index) else 0
+
+    def rate_series(self, bin_seconds: Optional[float] = None) -> pd.DataFrame:
+        """Pages discovered per bin and per second over the whole crawl"""
+        width, index, num_bins = self._bins(bin_seconds)
+        pages = np.bincount(index, minlength=num_bins)
+        return pd.DataFrame({
+            'time': np.arange(num_bins) * width,
+            'pages': pages,
+            'pages_per_second': pages / width,
+            'cumulative_pages': np.cumsum(pages)
+        })
+
+    def _group(self, by: str):
+        if by == 'role':
+            return self.roles, self.role_names
+        if by == 'depth':
+            offset = self.depths.min() if len(self.depths) else 0
+            return self.depths - offset, np.arange(offset, offset + (np.ptp(self.depths) + 1 if len(self.depths) else 0))
+        raise ValueError(f"Unknown grouping: {by} (expected 'role' or 'depth')")
+
+    def rate_by(self, by: str, bin_seconds: Optional[float] = None) -> pd.DataFrame:
+        """Pages per second over time for each role or depth, in long form (one row per bin and group)"""
+        codes, names = self._group(by)
+        width, index, num_bins = self._bins(bin_seconds)
+        counts = np.bincount(index * len(names) + codes, minlength=num_bins * len(names)).reshape(num_bins, len(names))
+        present = counts.sum(axis=0) > 0
+        counts, names = counts[:, present], names[present]
+        return pd.DataFrame({
+            'time': np.repeat(np.arange(num_bins) * width, len(names)),
+            by: np.tile(names, num_bins),
+            'pages': counts.ravel(),
+            'pages_per_second': counts.ravel() / width
+        })
+
+    def discovery_by(self, by: str) -> pd.DataFrame:
+        """Per role or depth: pages, share, first/last discovery and rate while that group was active"""
+        codes, names = self._group(by)
+        pages = np.bincount(codes, minlength=len(names))
+        first = np.full(len(names), np.inf)
+        last = np.full(len(names), -np.inf)
+        np.minimum.at(first, codes, self.times)
+        np.maximum.at(last, codes, self.times)
+        present = pages > 0
+        pages, first, last = pages[present], first[present], last[present]
+        active = last - first
+        return pd.DataFrame({
+            by: names[present],
+            'pages': pages,
+            'share': pages / max(self.num_timed, 1),
+            'first_seen': first,
+            'last_seen': last,
+            'pages_per_second': np.where(active > 0, pages / np.where(active > 0, active, 1), np.nan)
+        })
+
+    def stalls(self, threshold_seconds: float = THROUGHPUT_STALL_SECONDS) -> pd.DataFrame:
+        """Gaps between consecutive discoveries longer than the threshold, longest first"""
+        gaps = np.diff(self.times)
+        before = np.flatnonzero(gaps > threshold_seconds)
+        stalls = pd.DataFrame({
+            'start': self.times[before],
+            'end': self.times[before + 1],
+            'gap_seconds': gaps[before],
+            'pages_before': before + 1
+        })
+        if self.ids is not None:
+            stalls['last_node'] = self.ids[before]
+            stalls['next_node'] = self.ids[before + 1]
+        return stalls.sort_values('gap_seconds', ascending=False, kind='stable').reset_index(drop=True)
+
+    def new_state_curve(self, points: int = THROUGHPUT_BINS) -> pd.DataFrame:
+        """Cumulative states and distinct URLs over time, with time since the last new URL.
+
+        A growing `since_new_url` while states keep arriving means the crawl is
+        revisiting known URLs in new states rather than reaching new pages.
+        """
+        if not len(self.times):
+            return pd.DataFrame(columns=['time', 'states', 'urls', 'since_new_state', 'since_new_url'])
+        _, first = np.unique(self.urls, return_index=True)
+        new_url = np.zeros(len(self.times), dtype=bool)
+        new_url[first] = True
+        url_times = self.times[new_url]
+
+        grid = np.linspace(0.0, self.duration, max(points, 2))
+        states = np.searchsorted(self.times, grid, side='right')
+        urls = np.searchsorted(url_times, grid, side='right')
+        return pd.DataFrame({
+            'time': grid,
+            'states': states,
+            'urls': urls,
+            'since_new_state': grid - self.times[np.maximum(states - 1, 0)],
+            'since_new_url': grid - url_times[np.maximum(urls - 1, 0)]
+        })
+
+    def summary(self, threshold_seconds: float = THROUGHPUT_STALL_SECONDS, bin_seconds: Optional[float] = None) -> Dict:
+        gaps = np.diff(self.times)
+        stalled = gaps[gaps > threshold_seconds]
+        rates = self.rate_series(bin_seconds)['pages_per_second'] if len(self.times) else pd.Series(dtype=float)
+        return {
+            'pages': self.num_nodes,
+            'timed_pages': self.num_timed,
+            'duration_seconds': self.duration,
+            'pages_per_second': self.num_timed / self.duration if self.duration > 0 else 0.0,
+            'peak_pages_per_second': float(rates.max()) if len(rates) else 0.0,
+            'median_gap_seconds': float(np.median(gaps)) if len(gaps) else 0.0,
+            'p95_gap_seconds': float(np.percentile(gaps, 95)) if len(gaps) else 0.0,
+            'stalls': int(len(stalled)),
+            'stalled_seconds': float(stalled.sum()),
+            'distinct_urls': int(len(np.unique(self.urls)))
+        }
@@ -0,0 +1,205 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MERGED_VIEW = "Merged"
+
+class StringInterner:
+    """Shared dictionary encoding for repeated strings.
+
+    Every distinct string is stored once and gets an integer code. `canonical` returns the
+    single stored instance, so payload dicts that repeat the same URL, selector or title
+    across nodes and crawls all point at one string object.
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def canonical(self, value: str) -> str:
+        return self.strings[self.intern(value)]
+
+    def intern_many(self, values: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.intern(v) for v in values), dtype=np.int32)
+
+    def decode(self, codes: np.ndarray) -> List[str]:
+        strings = self.strings
+        return [strings[c] for c in codes.tolist()]
+
+    def intern_payload(self, value: Any) -> Any:
+        """Rebuild a JSON value with every string (keys included) replaced by its canonical instance"""
+        if isinstance(value, str):
+            return self.canonical(value)
+        if isinstance(value, dict):
+            return {self.canonical(k): self.intern_payload(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.intern_payload(v) for v in value]
+        return value
+
+    def add_payload(self, value: Any):
+        """Intern every string of a JSON value (keys included) without rebuilding it"""
+        if isinstance(value, str):
+            self.intern(value)
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                self.intern(k)
+                self.add_payload(v)
+        elif isinstance(value, list):
+            for v in value:
+                self.add_payload(v)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class CrawlWorkspace:
+    """Several crawler outputs for one site, held once and viewable per crawl or merged.
+
+    Nodes are merged by DOM-hash id with provenance (which crawls saw each node); edges
+    are stored as interned code arrays and unioned on (from, to, action, role) with the
+    number of traversals across crawls as weight. Views are derived from the stored
+    records, so switching between them never re-parses the uploaded files.
+    """
+
+    def __init__(self):
+        self.strings = StringInterner()
+        self.crawls: Dict[str, Dict] = {}
+        self._merged = None
+        self._view_cache: Tuple[Optional[str], Optional[Tuple[List[Dict], List[Dict]]]] = (None, None)
+
+    def add_crawl(self, name: str, data: Dict, source_size: int = None, source: str = None):
+        """Add an ingested crawl (see CrawlIngestor), whose records are already normalized.
+
+        `source` names the uploaded file it came from (several crawls can share one archive).
+        """
+        strings = self.strings
+        nodes = [strings.intern_payload(n) for n in data['nodes']]
+
+        edges = data['edges']
+        edge_codes = np.empty((len(edges), 4), dtype=np.int32)
+        for i, e in enumerate(edges):
+            edge_codes[i] = (strings.intern(e['from']), strings.intern(e['to']), strings.intern(e['action']), strings.intern(e['role']))
+        timestamps = np.array([e.get('timestamp') if isinstance(e.get('timestamp'), (int, float)) else np.nan for e in edges],
+                              dtype=np.float64)
+
+        self.crawls[name] = {
+            'nodes': nodes,
+            'edge_codes': edge_codes,
+            'edge_timestamps': timestamps,
+            'metadata': data['metadata'],
+            'statistics': data['statistics'],
+            'source_size': source_size,
+            'source': source or name
+        }
+        self._invalidate()
+
+    def remove_crawl(self, name: str):
+        if self.crawls.pop(name, None) is not None:
+            self._rebuild_strings()
+            self._invalidate()
+
+    def _rebuild_strings(self):
+        """Intern only what the remaining crawls use, so strings of removed crawls are released.
+
+        Their payloads already hold canonical instances, which the new interner keeps; only
+        the edge code arrays are remapped.
+        """
+        old = self.strings.strings
+        strings = StringInterner()
+        for crawl in self.crawls.values():
+            for node in crawl['nodes']:
+                strings.add_payload(node)
+            if len(crawl['edge_codes']):
+                used = np.unique(crawl['edge_codes'])
+                remap = np.zeros(len(old), dtype=np.int32)
+                remap[used] = strings.intern_many(old[c] for c in used.tolist())
+                crawl['edge_codes'] = remap[crawl['edge_codes']]
+        self.strings = strings
+
+    def _invalidate(self):
+        self._merged = None
+        self._view_cache = (None, None)
+
+    def crawl_names(self) -> List[str]:
+        return list(self.crawls)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.crawls
+
+    def view_names(self) -> List[str]:
+        return ([MERGED_VIEW] if len(self.crawls) > 1 else []) + self.crawl_names()
+
+    def view(self, name: str = MERGED_VIEW) -> Tuple[List[Dict], List[Dict]]:
+        """Nodes and edges for one crawl, or for the merged workspace"""
+        if self._view_cache[0] == name:
+            return self._view_cache[1]
+
+        if name == MERGED_VIEW or name not in self.crawls:
+            merged = self.merge()
+            result = (merged['nodes'], self._decode_edges(merged['edge_codes'], merged['weights']))
+        else:
+            crawl = self.crawls[name]
+            result = (crawl['nodes'], self._decode_edges(crawl['edge_codes'], timestamps=crawl['edge_timestamps']))
+
+        self._view_cache = (name, result)
+        return result
+
+    def metadata(self, name: str = MERGED_VIEW) -> Dict:
+        if name in self.crawls:
+            return self.crawls[name]['metadata']
+        total_time = sum(c['metadata'].get('totalCrawlTime') or c['metadata'].get('crawlTime') or 0 for c in self.crawls.values())
+        return {'totalCrawlTime': total_time, 'crawls': self.crawl_names()}
+
+    def statistics(self, name: str = MERGED_VIEW) -> Dict:
+        if name in self.crawls:
+            return self.crawls[name]['statistics']
+        merged = self.merge()
+        return {'totalNodes': len(merged['nodes']), 'totalEdges': int(merged['weights'].sum()), 'uniqueEdges': len(merged['weights'])}
+
+    def provenance(self, node_id: str) -> List[str]:
+        return self.merge()['provenance'].get(node_id, [])
+
+    def merge(self) -> Dict:
+        if self._merged is not None:
+            return self._merged
+
+        nodes: Dict[str, Dict] = {}
+        provenance: Dict[str, List[str]] = {}
+        for name, crawl in self.crawls.items():
+            for node in crawl['nodes']:
+                seen_in = provenance.setdefault(node['id'], [])
+                if name not in seen_in:
+                    seen_in.append(name)
+                nodes.setdefault(node['id'], node)
+
+        # Shallow copies share every payload with the per-crawl nodes; only provenance is added
+        merged_nodes = [dict(node, crawls=provenance[node_id]) for node_id, node in nodes.items()]
+
+        all_codes = [c['edge_codes'] for c in self.crawls.values() if len(c['edge_codes'])]
+        if all_codes:
+            edge_codes, weights = np.unique(np.concatenate(all_codes), axis=0, return_counts=True)
+        else:
+            edge_codes, weights = np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.int64)
+
+        self._merged = {'nodes': merged_nodes, 'edge_codes': edge_codes, 'weights': weights, 'provenance': provenance}
+        return self._merged
+
+    def _decode_edges(self, edge_codes: np.ndarray, weights: np.ndarray = None, timestamps: np.ndarray = None) -> List[Dict]:
+        strings = self.strings.strings
+        edges = []
+        for i, (src, dst, action, role) in enumerate(edge_codes.tolist()):
+            edge = {'from': strings[src], 'to': strings[dst], 'action': strings[action], 'role': strings[role]}
+            if weights is not None:
+                edge['weight'] = int(weights[i])
+            if timestamps is not None and not np.isnan(timestamps[i]):
+                ts = float(timestamps[i])
+                edge['timestamp'] = int(ts) if ts.is_integer() else ts
+            edges.append(edge)
+        return edges
@@ -0,0 +1,303 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+class CSRGraph:
+    """Directed graph stored as interned node ids plus a scipy.sparse CSR adjacency matrix.
+
+    Repeated edges are summed into the matrix data (edge multiplicity), while the
+    algorithms below work on the distinct-edge structure so that they agree with
+    the networkx DiGraph built from the same records.
+    """
+
+    def __init__(self, node_ids: List[str], sources: np.ndarray, targets: np.ndarray, weights: Optional[np.ndarray] = None):
+        self.node_ids = np.asarray(node_ids, dtype=object)
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        n = len(node_ids)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if weights is None:
+            weights = np.ones(len(sources), dtype=np.float64)
+
+        self.adjacency = sp.csr_matrix((weights, (sources, targets)), shape=(n, n))
+        self.adjacency.sum_duplicates()
+        self._structure = None
+        self._transposed = None
+        self._symmetric = None
+
+    @classmethod
+    def from_records(cls, node_ids: Iterable[str], edges: List[Dict], keep_unknown: bool = True) -> 'CSRGraph':
+        ids, index = [], {}
+        for node_id in node_ids:
+            if node_id not in index:
+                index[node_id] = len(ids)
+                ids.append(node_id)
+        sources, targets = [], []
+
+        for edge in edges:
+            edge_from, edge_to = edge['from'], edge['to']
+            if not keep_unknown and (edge_from not in index or edge_to not in index):
+                continue
+            # Kept edges to unknown ids add their endpoints as nodes (as DiGraph.add_edge would);
+            # the graph builders drop such edges instead and count them in dropped_edges
+            for endpoint in (edge_from, edge_to):
+                if endpoint not in index:
+                    index[endpoint] = len(ids)
+                    ids.append(endpoint)
+            sources.append(index[edge_from])
+            targets.append(index[edge_to])
+
+        return cls(ids, np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return self.adjacency.nnz
+
+    @property
+    def structure(self) -> sp.csr_matrix:
+        """Unweighted adjacency: 1.0 for every distinct edge"""
+        if self._structure is None:
+            self._structure = self.adjacency.copy()
+            self._structure.data[:] = 1.0
+        return self._structure
+
+    def oriented(self, direction: str) -> sp.csr_matrix:
+        if direction == "out":
+            return self.structure
+        if direction == "in":
+            if self._transposed is None:
+                self._transposed = self.structure.T.tocsr()
+            return self._transposed
+        if self._symmetric is None:
+            self._symmetric = (self.structure + self.structure.T).tocsr()
+        return self._symmetric
+
+    def indices_of(self, node_ids: Iterable[str]) -> np.ndarray:
+        return np.array([self.index[n] for n in node_ids if n in self.index], dtype=np.int64)
+
+    @staticmethod
+    def _gather_neighbors(matrix: sp.csr_matrix, frontier: np.ndarray) -> np.ndarray:
+        """Concatenate the CSR rows of every frontier node without a Python loop"""
+        starts = matrix.indptr[frontier]
+        lengths = matrix.indptr[frontier + 1] - starts
+        total = lengths.sum()
+        if total == 0:
+            return np.empty(0, dtype=matrix.indices.dtype)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return matrix.indices[offsets + np.arange(total)]
+
+    @staticmethod
+    def _gather_edges(matrix: sp.csr_matrix, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Like _gather_neighbors, also returning the frontier node each neighbor was reached from"""
+        starts = matrix.indptr[frontier]
+        lengths = matrix.indptr[frontier + 1] - starts
+        total = lengths.sum()
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return np.repeat(frontier, lengths), matrix.indices[offsets + np.arange(total)].astype(np.int64)
+
+    def bfs_levels(self, sources: np.ndarray, direction: str = "out", max_depth: Optional[int] = None) -> np.ndarray:
+        """Hop distance from the nearest source for every node; -1 where unreachable"""
+        matrix = self.oriented(direction)
+        depth = np.full(self.num_nodes, -1, dtype=np.int64)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        depth[frontier] = 0
+        level = 0
+
+        while frontier.size and (max_depth is None or level < max_depth):
+            level += 1
+            neighbors = self._gather_neighbors(matrix, frontier)
+            neighbors = np.unique(neighbors[depth[neighbors] < 0])
+            depth[neighbors] = level
+            frontier = neighbors
+
+        return depth
+
+    def ego_levels(self, center: int, hops: int, direction: str = "both",
+                   allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                   max_nodes: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Nodes within `hops` of one node and their hop distance, nearest first.
+
+        Unlike bfs_levels nothing is allocated per graph node, so the cost depends on the
+        size of the neighborhood only. `allowed` masks candidate nodes before they are
+        visited (e.g. by role); once `max_nodes` would be exceeded the last level is cut
+        short and the returned flag is set.
+        """
+        matrix = self.oriented(direction)
+        visited = np.array([center], dtype=np.int64)
+        indices, levels = [visited], [np.zeros(1, dtype=np.int64)]
+        frontier, count, truncated = visited, 1, False
+
+        for level in range(1, hops + 1):
+            if not frontier.size or truncated:
+                break
+            neighbors = np.unique(self._gather_neighbors(matrix, frontier)).astype(np.int64)
+            neighbors = neighbors[~np.isin(neighbors, visited, assume_unique=True)]
+            if allowed is not None and neighbors.size:
+                neighbors = neighbors[allowed(neighbors)]
+            if max_nodes is not None and count + neighbors.size > max_nodes:
+                neighbors, truncated = neighbors[:max(max_nodes - count, 0)], True
+            indices.append(neighbors)
+            levels.append(np.full(neighbors.size, level, dtype=np.int64))
+            visited = np.union1d(visited, neighbors)
+            frontier, count = neighbors, count + neighbors.size
+
+        return np.concatenate(indices), np.concatenate(levels), truncated
+
+    def bfs_tree(self, source: int, direction: str = "out") -> Tuple[np.ndarray, np.ndarray]:
+        """Hop distance (-1 if unreachable) and BFS parent (-1 for the source) from one node"""
+        matrix = self.oriented(direction)
+        depth = np.full(self.num_nodes, -1, dtype=np.int64)
+        parent = np.full(self.num_nodes, -1, dtype=np.int64)
+        depth[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+
+        while frontier.size:
+            level += 1
+            origins, neighbors = self._gather_edges(matrix, frontier)
+            fresh = depth[neighbors] < 0
+            neighbors, first = np.unique(neighbors[fresh], return_index=True)
+            parent[neighbors] = origins[fresh][first]
+            depth[neighbors] = level
+            frontier = neighbors
+
+        return depth, parent
+
+    def bidirectional_path(self, source: int, target: int, blocked_nodes: Optional[np.ndarray] = None,
+                           blocked_edges: Optional[np.ndarray] = None) -> Optional[List[int]]:
+        """Shortest path as node indices, searching forward from source and backward from target.
+
+        Each step expands whichever frontier has fewer outgoing edges, so the search touches
+        roughly two balls of half the path length instead of one of the full length.
+        `blocked_nodes` is a boolean mask of nodes the path may not visit and `blocked_edges`
+        holds `source * num_nodes + target` codes of edges it may not use.
+        """
+        if source == target:
+            return [source]
+        n = self.num_nodes
+        matrices = (self.oriented("out"), self.oriented("in"))
+        depth = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+        parent = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+        depth[0][source] = 0
+        depth[1][target] = 0
+        frontiers = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+
+        while frontiers[0].size and frontiers[1].size:
+            work = [int((m.indptr[f + 1] - m.indptr[f]).sum()) for m, f in zip(matrices, frontiers)]
+            side = 0 if work[0] <= work[1] else 1
+            origins, neighbors = self._gather_edges(matrices[side], frontiers[side])
+            keep = depth[side][neighbors] < 0
+            if blocked_nodes is not None:
+                keep &= ~blocked_nodes[neighbors]
+            if blocked_edges is not None and len(blocked_edges):
+                codes = origins * n + neighbors if side == 0 else neighbors * n + origins
+                keep &= ~np.isin(codes, blocked_edges)
+            origins, neighbors = origins[keep], neighbors[keep]
+            neighbors, first = np.unique(neighbors, return_index=True)
+            parent[side][neighbors] = origins[first]
+            depth[side][neighbors] = depth[side][frontiers[side][0]] + 1
+            frontiers[side] = neighbors
+
+            met = neighbors[depth[1 - side][neighbors] >= 0]
+            if met.size:
+                meet = int(met[np.argmin(depth[0][met] + depth[1][met])])
+                return self.walk_parents(parent[0], meet)[::-1] + self.walk_parents(parent[1], meet)[1:]
+        return None
+
+    @staticmethod
+    def walk_parents(parent: np.ndarray, node: int) -> List[int]:
+        path = [node]
+        while parent[node] >= 0:
+            node = int(parent[node])
+            path.append(node)
+        return path
+
+    def root_indices(self) -> np.ndarray:
+        """Entry states: nodes without incoming edges, or the first node if every node has one"""
+        roots = np.flatnonzero(self.in_degrees() == 0)
+        if roots.size == 0 and self.num_nodes:
+            roots = np.array([0], dtype=np.int64)
+        return roots
+
+    def bfs_depths(self, sources: Optional[List[str]] = None, direction: str = "out") -> Dict[str, int]:
+        source_idx = self.root_indices() if sources is None else self.indices_of(sources)
+        depth = self.bfs_levels(source_idx, direction)
+        reached = np.flatnonzero(depth >= 0)
+        return dict(zip(self.node_ids[reached].tolist(), depth[reached].tolist()))
+
+    def connected_components(self, connection: str = "weak") -> List[set]:
+        count, labels = connected_components(self.structure, directed=True, connection=connection)
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        return [set(self.node_ids[group].tolist()) for group in np.split(order, boundaries)] if count else []
+
+    def pagerank(self, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> Dict[str, float]:
+        """Power iteration with the same normalisation and dangling-node handling as nx.pagerank"""
+        n = self.num_nodes
+        if n == 0:
+            return {}
+        A = self.structure
+        out_weight = np.asarray(A.sum(axis=1)).ravel()
+        inv = np.zeros(n)
+        nonzero = out_weight != 0
+        inv[nonzero] = 1.0 / out_weight[nonzero]
+        P = sp.diags(inv, format='csr') @ A
+
+        x = np.full(n, 1.0 / n)
+        personalization = np.full(n, 1.0 / n)
+        dangling = ~nonzero
+
+        for _ in range(max_iter):
+            last = x
+            x = alpha * (x @ P + x[dangling].sum() * personalization) + (1 - alpha) * personalization
+            if np.absolute(x - last).sum() < n * tol:
+                return dict(zip(self.node_ids.tolist(), x.tolist()))
+        raise ArithmeticError(f"pagerank: power iteration failed to converge in {max_iter} iterations")
+
+    def out_degrees(self) -> np.ndarray:
+        return np.diff(self.structure.indptr)
+
+    def in_degrees(self) -> np.ndarray:
+        return np.bincount(self.structure.indices, minlength=self.num_nodes)
+
+    def degree_statistics(self) -> Dict:
+        stats = {}
+        for name, degrees in (("in", self.in_degrees()), ("out", self.out_degrees()),
+                              ("total", self.in_degrees() + self.out_degrees())):
+            stats[name] = summarize_degrees(degrees)
+        return stats
+
+    def subgraph(self, node_ids: Iterable[str]) -> 'CSRGraph':
+        keep = self.indices_of(node_ids)
+        sub = self.adjacency[keep][:, keep].tocoo()
+        return CSRGraph(self.node_ids[keep].tolist(), sub.row, sub.col, sub.data)
+
+    def edge_arrays(self):
+        coo = self.structure.tocoo()
+        return coo.row, coo.col
+
+    def to_networkx(self):
+        import networkx as nx
+        G = nx.DiGraph()
+        G.add_nodes_from(self.node_ids.tolist())
+        rows, cols = self.edge_arrays()
+        G.add_edges_from(zip(self.node_ids[rows].tolist(), self.node_ids[cols].tolist()))
+        return G
+
+
+def summarize_degrees(degrees: np.ndarray) -> Dict:
+    if degrees.size == 0:
+        return {'min': 0, 'max': 0, 'mean': 0.0, 'median': 0.0}
+    return {
+        'min': int(degrees.min()),
+        'max': int(degrees.max()),
+        'mean': float(degrees.mean()),
+        'median': float(np.median(degrees))
+    }
@@ -1,24 +1,17 @@
-import json
 from typing import Dict, List, Any
-import io
+from utils.crawl_ingest import CrawlIngestor, IngestReport
 
 class CrawlerDataParser:
     def __init__(self, json_file):
         self.json_file = json_file
         self.data = None
+        self.report: IngestReport = None
         
     def load_data(self) -> Dict[str, Any]:
-        # Handle both file paths and uploaded file objects
-        if hasattr(self.json_file, 'read'):
-            # Streamlit uploaded file object
-            content = self.json_file.read()
-            if isinstance(content, bytes):
-                content = content.decode('utf-8')
-            self.data = json.loads(content)
-        else:
-            # File path
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+        # Handles file paths and uploaded file objects; nodes and edges come back normalized
+        ingestor = CrawlIngestor()
+        self.data = ingestor.load(self.json_file)
+        self.report = ingestor.report
         return self.data
     
     def get_nodes(self) -> List[Dict]:
@@ -39,7 +32,5 @@ class CrawlerDataParser:
     def get_statistics(self) -> Dict:
         if not self.data:
             self.load_data()
-        # Handle both 'stats' and 'statistics' keys
-        stats = self.data.get('stats', {})
-        statistics = self.data.get('statistics', {})
-        return {**stats, **statistics}  # Merge both
\ No newline at end of file
+        # 'stats' and 'statistics' are merged once during ingest
+        return self.data.get('statistics', {})
\ No newline at end of file
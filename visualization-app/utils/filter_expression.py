@@ -0,0 +1,253 @@
+import json
+import os
+import re
+import tempfile
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from utils.node_columns import NodeColumnTable, NUMERIC_COLUMNS, STRING_COLUMNS
+from config import SAVED_FILTERS_PATH
+
+Mask = Callable[[NodeColumnTable], np.ndarray]
+
+TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<op>==|!=|<=|>=|!~|<|>|~|\(|\)|\[|\]|,)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+)""", re.VERBOSE)
+
+KEYWORDS = {'and', 'or', 'not', 'in', 'true', 'false'}
+NUMERIC_OPS = {'==': np.equal, '!=': np.not_equal, '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+STRING_OPS = {'==', '!=', '~', '!~'}
+
+class FilterSyntaxError(ValueError):
+    def __init__(self, message: str, position: int = None):
+        super().__init__(message if position is None else f"{message} (at position {position})")
+        self.position = position
+
+
+def tokenize(source: str) -> List[tuple]:
+    tokens = []
+    pos = 0
+    source = source.rstrip()
+    while pos < len(source):
+        match = TOKEN_RE.match(source, pos)
+        if match is None or match.end() == pos:
+            raise FilterSyntaxError(f"Unexpected character {source[pos:].lstrip()[:1]!r}", pos)
+        kind = match.lastgroup
+        text, start = match.group(kind), match.start(kind)
+        if kind == 'name' and text.lower() in KEYWORDS:
+            kind, text = 'keyword', text.lower()
+        tokens.append((kind, text, start))
+        pos = match.end()
+    tokens.append(('end', '', len(source)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser that returns a closure computing the boolean mask.
+
+    expr       := and_expr ('or' and_expr)*
+    and_expr   := not_expr ('and' not_expr)*
+    not_expr   := 'not' not_expr | '(' expr ')' | comparison
+    comparison := field [op literal | 'in' '[' literal (',' literal)* ']']
+    """
+
+    def __init__(self, source: str):
+        self.tokens = tokenize(source)
+        self.index = 0
+        self.fields = set()
+
+    def peek(self) -> tuple:
+        return self.tokens[self.index]
+
+    def next(self) -> tuple:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, kind: str, text: str = None) -> tuple:
+        token = self.next()
+        if token[0] != kind or (text is not None and token[1] != text):
+            raise FilterSyntaxError(f"Expected {text or kind}, found {token[1] or 'end of expression'!r}", token[2])
+        return token
+
+    def parse(self) -> Mask:
+        if self.peek()[0] == 'end':
+            raise FilterSyntaxError("Empty filter expression")
+        mask = self.parse_or()
+        self.expect('end')
+        return mask
+
+    def parse_or(self) -> Mask:
+        terms = [self.parse_and()]
+        while self.peek()[:2] == ('keyword', 'or'):
+            self.next()
+            terms.append(self.parse_and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda table: np.logical_or.reduce([term(table) for term in terms])
+
+    def parse_and(self) -> Mask:
+        terms = [self.parse_not()]
+        while self.peek()[:2] == ('keyword', 'and'):
+            self.next()
+            terms.append(self.parse_not())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda table: np.logical_and.reduce([term(table) for term in terms])
+
+    def parse_not(self) -> Mask:
+        token = self.peek()
+        if token[:2] == ('keyword', 'not'):
+            self.next()
+            inner = self.parse_not()
+            return lambda table: ~inner(table)
+        if token[:2] == ('op', '('):
+            self.next()
+            inner = self.parse_or()
+            self.expect('op', ')')
+            return inner
+        return self.parse_comparison()
+
+    def parse_literal(self):
+        kind, text, position = self.next()
+        if kind == 'number':
+            return float(text)
+        if kind == 'string':
+            return re.sub(r'\\(["\'\\])', r'\1', text[1:-1])
+        if kind == 'keyword' and text in ('true', 'false'):
+            return 1.0 if text == 'true' else 0.0
+        raise FilterSyntaxError(f"Expected a value, found {text or 'end of expression'!r}", position)
+
+    def parse_comparison(self) -> Mask:
+        _, field, position = self.expect('name')
+        if field not in NUMERIC_COLUMNS and field not in STRING_COLUMNS:
+            known = ", ".join(sorted(list(NUMERIC_COLUMNS) + list(STRING_COLUMNS)))
+            raise FilterSyntaxError(f"Unknown field {field!r}; available fields: {known}", position)
+        self.fields.add(field)
+        is_string = field in STRING_COLUMNS
+
+        kind, op, op_position = self.peek()
+        if (kind, op) == ('keyword', 'in'):
+            self.next()
+            self.expect('op', '[')
+            values = [self.parse_literal()]
+            while self.peek()[:2] == ('op', ','):
+                self.next()
+                values.append(self.parse_literal())
+            self.expect('op', ']')
+            self._check_types(field, values, op_position)
+            if is_string:
+                return lambda table: table.strings[field].isin(values)
+            return lambda table: np.isin(table.numeric[field], values)
+
+        if kind != 'op' or op not in NUMERIC_OPS and op not in STRING_OPS:
+            if is_string:
+                raise FilterSyntaxError(f"String field {field!r} needs a comparison", op_position)
+            # A bare numeric field is true when non-zero, e.g. `simulated` or `has_auth`
+            return lambda table: np.nan_to_num(table.numeric[field]) != 0
+        self.next()
+        value = self.parse_literal()
+        self._check_types(field, [value], op_position)
+
+        if is_string:
+            if op not in STRING_OPS:
+                raise FilterSyntaxError(f"Operator {op!r} is not supported for string field {field!r}", op_position)
+            if op in ('~', '!~'):
+                try:
+                    re.compile(value)
+                except re.error as e:
+                    raise FilterSyntaxError(f"Invalid pattern {value!r}: {e}", op_position)
+                if op == '~':
+                    return lambda table: table.strings[field].search(value)
+                return lambda table: ~table.strings[field].search(value)
+            if op == '==':
+                return lambda table: table.strings[field].equals(value)
+            return lambda table: ~table.strings[field].equals(value)
+
+        if op not in NUMERIC_OPS:
+            raise FilterSyntaxError(f"Operator {op!r} is not supported for numeric field {field!r}", op_position)
+        compare = NUMERIC_OPS[op]
+        return lambda table: compare(table.numeric[field], value)
+
+    @staticmethod
+    def _check_types(field: str, values: List, position: int):
+        expected = str if field in STRING_COLUMNS else float
+        for value in values:
+            if not isinstance(value, expected):
+                kind = "string" if expected is str else "numeric"
+                raise FilterSyntaxError(f"Field {field!r} is {kind}; cannot compare with {value!r}", position)
+
+
+class FilterExpression:
+    """A parsed filter, e.g. `depth <= 3 and forms > 0 and role == "admin" and url ~ "/checkout"`.
+
+    Parsing happens once; `mask` evaluates the compiled predicates as NumPy operations
+    over a NodeColumnTable.
+    """
+
+    def __init__(self, source: str):
+        self.source = source.strip()
+        parser = _Parser(self.source)
+        self._mask = parser.parse()
+        self.fields = sorted(parser.fields)
+
+    def mask(self, table: NodeColumnTable) -> np.ndarray:
+        return np.asarray(self._mask(table), dtype=bool)
+
+    def apply(self, table: NodeColumnTable) -> List[Dict]:
+        return table.take(self.mask(table))
+
+
+@lru_cache(maxsize=128)
+def compile_filter(source: str) -> FilterExpression:
+    return FilterExpression(source)
+
+
+class SavedFilters:
+    """Named filter expressions persisted as JSON, shared by the app and the CLI"""
+
+    def __init__(self, path: str = SAVED_FILTERS_PATH):
+        self.path = path
+
+    def all(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                filters = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {k: v for k, v in filters.items() if isinstance(v, str)} if isinstance(filters, dict) else {}
+
+    def get(self, name: str) -> Optional[str]:
+        return self.all().get(name)
+
+    def save(self, name: str, source: str):
+        compile_filter(source)  # Reject expressions that do not parse
+        filters = self.all()
+        filters[name] = source.strip()
+        self._write(filters)
+
+    def delete(self, name: str):
+        filters = self.all()
+        if filters.pop(name, None) is not None:
+            self._write(filters)
+
+    def _write(self, filters: Dict[str, str]):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # A temp file per writer: sessions are threads of one process and may save at once
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(filters, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
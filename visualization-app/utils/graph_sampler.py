@@ -0,0 +1,170 @@
+import random
+from collections import deque
+import numpy as np
+from typing import Dict, List, Tuple
+from utils.csr_graph import CSRGraph
+
+class GraphSampler:
+    """Picks at most `budget` nodes and returns the subgraph they induce.
+
+    All strategies work on a CSR adjacency over the given nodes only (edges to
+    unknown ids are ignored), so every returned edge has both endpoints in the sample.
+    An existing CSR over the same nodes (e.g. from GraphView.to_csr) can be passed
+    instead of edge records.
+    """
+
+    def __init__(self, nodes: List[Dict], edges: List[Dict], seed: int = 42, csr: CSRGraph = None):
+        self.nodes = nodes
+        self.edges = edges
+        self.seed = seed
+        self.csr = csr if csr is not None else CSRGraph.from_records((n['id'] for n in nodes), edges, keep_unknown=False)
+        self._levels = None
+
+    def sample(self, strategy: str, budget: int) -> Tuple[List[Dict], List[Dict]]:
+        if len(self.nodes) <= budget:
+            return self.nodes, self.edges
+        return self.induced_subgraph(self.select(strategy, budget))
+
+    def select(self, strategy: str, budget: int) -> np.ndarray:
+        """Sorted CSR indices of the sampled nodes"""
+        if self.csr.num_nodes <= budget:
+            return np.arange(self.csr.num_nodes)
+        if strategy == "stratified":
+            return self.stratified_sample(budget)
+        if strategy == "forest_fire":
+            return self.forest_fire_sample(budget)
+        return self.bfs_sample(budget)
+
+    def entry_indices(self) -> np.ndarray:
+        """Entry states: the shallowest recorded crawl depth, else nodes without incoming edges"""
+        depths = self._depth_array()
+        if depths.size and depths.min() != depths.max():
+            return np.flatnonzero(depths == depths.min())
+        return self.csr.root_indices()
+
+    def bfs_levels(self) -> np.ndarray:
+        """BFS hop distance from the entry states; unreachable nodes rank after every reached one"""
+        if self._levels is None:
+            levels = self.csr.bfs_levels(self.entry_indices(), "out")
+            levels[levels < 0] = levels.max() + 1 if levels.size else 0
+            self._levels = levels
+        return self._levels
+
+    def bfs_sample(self, budget: int) -> np.ndarray:
+        return _take_lowest(self.bfs_levels(), np.arange(self.csr.num_nodes), budget)
+
+    def stratified_sample(self, budget: int) -> np.ndarray:
+        """Proportional allocation over (role, depth) strata, nearest-to-entry nodes first in each"""
+        roles = self._attribute_array('role', 'guest')
+        _, role_codes = np.unique(roles, return_inverse=True)
+        depths = self._depth_array()
+        depths -= depths.min() if depths.size else 0
+        strata = role_codes * (depths.max() + 1 if depths.size else 1) + depths
+
+        counts = np.bincount(strata)
+        quotas = _allocate(counts, budget)
+
+        levels = self.bfs_levels()
+        order = np.lexsort((levels, strata))
+        stratum_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank_in_stratum = np.empty_like(order)
+        rank_in_stratum[order] = np.arange(order.size) - stratum_start[strata[order]]
+        return np.flatnonzero(rank_in_stratum < quotas[strata])
+
+    def forest_fire_sample(self, budget: int, forward_probability: float = 0.7, backward_ratio: float = 0.3) -> np.ndarray:
+        """Forest-fire sampling: burn a geometric number of neighbours from each burning node,
+        reigniting from the entry states and then random nodes when the fire dies out"""
+        rng = random.Random(self.seed)
+        out_matrix = self.csr.oriented("out")
+        in_matrix = self.csr.oriented("in")
+        n = self.csr.num_nodes
+        burned = np.zeros(n, dtype=bool)
+        selected = []
+
+        # Entry states ignite first, then a random permutation guarantees termination
+        entries = list(self.entry_indices())
+        rng.shuffle(entries)
+        fallback = list(range(n))
+        rng.shuffle(fallback)
+        seeds = deque(entries + fallback)
+
+        while seeds and len(selected) < budget:
+            seed = seeds.popleft()
+            if burned[seed]:
+                continue
+
+            burned[seed] = True
+            selected.append(seed)
+            queue = deque([seed])
+            while queue and len(selected) < budget:
+                current = queue.popleft()
+                for matrix, probability in ((out_matrix, forward_probability), (in_matrix, forward_probability * backward_ratio)):
+                    neighbors = matrix.indices[matrix.indptr[current]:matrix.indptr[current + 1]]
+                    neighbors = neighbors[~burned[neighbors]].tolist()
+                    if not neighbors:
+                        continue
+                    # Geometric burn count with mean p / (1 - p)
+                    burn = 0
+                    while rng.random() < probability:
+                        burn += 1
+                    for v in rng.sample(neighbors, min(burn, len(neighbors))):
+                        if len(selected) >= budget:
+                            break
+                        burned[v] = True
+                        selected.append(v)
+                        queue.append(v)
+
+        return np.sort(np.array(selected, dtype=np.int64))
+
+    def induced_subgraph(self, selected: np.ndarray) -> Tuple[List[Dict], List[Dict]]:
+        keep_ids = set(self.csr.node_ids[selected].tolist())
+        nodes = [n for n in self.nodes if n['id'] in keep_ids]
+        edges = [e for e in self.edges if e.get('from') in keep_ids and e.get('to') in keep_ids]
+        return nodes, edges
+
+    def _depth_array(self) -> np.ndarray:
+        depths = self._attribute_array('depth', 0)
+        return np.array([d if isinstance(d, (int, float)) else 0 for d in depths], dtype=np.int64)
+
+    def _attribute_array(self, key: str, default) -> np.ndarray:
+        values = {}
+        for n in self.nodes:
+            values.setdefault(n['id'], n.get(key, default))
+        return np.array([values.get(node_id, default) for node_id in self.csr.node_ids])
+
+
+def _take_lowest(keys: np.ndarray, candidates: np.ndarray, budget: int) -> np.ndarray:
+    """The `budget` candidates with the smallest integer keys, ties broken by position, in linear time"""
+    if candidates.size <= budget:
+        return candidates
+    counts = np.bincount(keys[candidates])
+    cutoff = np.searchsorted(np.cumsum(counts), budget)
+    below = candidates[keys[candidates] < cutoff]
+    at_cutoff = candidates[keys[candidates] == cutoff][:budget - below.size]
+    return np.sort(np.concatenate((below, at_cutoff)))
+
+
+def _allocate(counts: np.ndarray, budget: int) -> np.ndarray:
+    """Largest-remainder proportional allocation of `budget` over strata, one slot per
+    non-empty stratum first when the budget allows it"""
+    quotas = np.zeros_like(counts)
+    non_empty = counts > 0
+    if budget >= non_empty.sum():
+        quotas[non_empty] = 1
+    remaining = budget - quotas.sum()
+    capacity = counts - quotas
+    if remaining <= 0 or capacity.sum() == 0:
+        return quotas
+
+    share = capacity * (remaining / capacity.sum())
+    extra = np.minimum(np.floor(share).astype(np.int64), capacity)
+    leftover = remaining - extra.sum()
+    if leftover > 0:
+        by_remainder = np.argsort(-(share - extra), kind='stable')
+        for i in by_remainder:
+            if leftover == 0:
+                break
+            if extra[i] < capacity[i]:
+                extra[i] += 1
+                leftover -= 1
+    return quotas + extra
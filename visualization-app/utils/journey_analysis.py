@@ -0,0 +1,230 @@
+import heapq
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import JOURNEY_BFS_CACHE_SIZE
+from utils.csr_graph import CSRGraph
+from utils.node_store import NodeStore
+
+class JourneyAnalyzer:
+    """User-journey queries over the action-labelled state graph.
+
+    Built once per view on the CSR backend. Single shortest paths use a cached BFS tree
+    when one exists for either endpoint and bidirectional BFS otherwise; k-shortest paths
+    run Yen's algorithm on top of the bidirectional search. Action sequences and funnels
+    count recorded traversals, so repeated edges (or merged-crawl weights) count as often
+    as they were taken.
+    """
+
+    def __init__(self, nodes: List[Dict], edges: List[Dict], bfs_cache_size: int = JOURNEY_BFS_CACHE_SIZE):
+        self.node_store = NodeStore(nodes)
+        # Edges to pages that were never crawled are dropped (as by the graph builders), so
+        # they cannot turn up as journey steps or endpoints
+        edges = [e for e in edges if e['from'] in self.node_store and e['to'] in self.node_store]
+        self.graph = CSRGraph.from_records((n['id'] for n in nodes), edges, keep_unknown=False)
+        index = self.graph.index
+        n = self.graph.num_nodes
+
+        self.edge_src = np.fromiter((index[e['from']] for e in edges), dtype=np.int64, count=len(edges))
+        self.edge_dst = np.fromiter((index[e['to']] for e in edges), dtype=np.int64, count=len(edges))
+        self.edge_weight = np.fromiter((e.get('weight', 1) for e in edges), dtype=np.float64, count=len(edges))
+        self.actions, self.edge_action = np.unique(np.array([e['action'] for e in edges], dtype=object).astype(str), return_inverse=True)
+        self.roles, self.edge_role = np.unique(np.array([e['role'] for e in edges], dtype=object).astype(str), return_inverse=True)
+
+        # Most frequently recorded action per (from, to) pair, for labelling path hops
+        pair_codes = self.edge_src * n + self.edge_dst
+        pair_action = np.zeros(0, dtype=np.int64)
+        if len(edges):
+            combined, counts = np.unique(np.column_stack((pair_codes, self.edge_action)), axis=0, return_counts=True)
+            order = np.lexsort((-counts, combined[:, 0]))
+            self._label_pairs, first = np.unique(combined[order, 0], return_index=True)
+            pair_action = combined[order, 1][first]
+        else:
+            self._label_pairs = np.zeros(0, dtype=np.int64)
+        self._label_actions = pair_action
+        self.traversals = sp.csr_matrix((self.edge_weight, (self.edge_src, self.edge_dst)), shape=(n, n))
+
+        self._trees: OrderedDict = OrderedDict()
+        self._bfs_cache_size = bfs_cache_size
+        self._action_matrices: Dict[Optional[str], Tuple[List[sp.csr_matrix], List[np.ndarray]]] = {}
+
+    def index_of(self, node_id: str) -> int:
+        if node_id not in self.graph.index:
+            raise ValueError(f"Unknown state: {node_id}")
+        return self.graph.index[node_id]
+
+    def bfs_tree(self, node_id: str, direction: str = "out") -> Tuple[np.ndarray, np.ndarray]:
+        """Cached (depth, parent) arrays from one state; direction "in" gives distances to it"""
+        key = (node_id, direction)
+        if key in self._trees:
+            self._trees.move_to_end(key)
+            return self._trees[key]
+        tree = self.graph.bfs_tree(self.index_of(node_id), direction)
+        self._trees[key] = tree
+        if len(self._trees) > self._bfs_cache_size:
+            self._trees.popitem(last=False)
+        return tree
+
+    def reachable_from(self, node_id: str) -> Dict[str, int]:
+        depth, _ = self.bfs_tree(node_id)
+        reached = np.flatnonzero(depth > 0)
+        return dict(zip(self.graph.node_ids[reached].tolist(), depth[reached].tolist()))
+
+    def shortest_path(self, source_id: str, target_id: str) -> Optional[List[str]]:
+        path = self._shortest(self.index_of(source_id), self.index_of(target_id))
+        return None if path is None else self.graph.node_ids[path].tolist()
+
+    def _shortest(self, source: int, target: int) -> Optional[List[int]]:
+        node_ids = self.graph.node_ids
+        forward = self._trees.get((node_ids[source], "out"))
+        if forward is not None:
+            return None if forward[0][target] < 0 else self.graph.walk_parents(forward[1], target)[::-1]
+        backward = self._trees.get((node_ids[target], "in"))
+        if backward is not None:
+            return None if backward[0][source] < 0 else self.graph.walk_parents(backward[1], source)
+        return self.graph.bidirectional_path(source, target)
+
+    def k_shortest_paths(self, source_id: str, target_id: str, k: int = 3) -> List[Dict]:
+        """Up to k loopless paths in order of hop count (Yen's algorithm)"""
+        source, target = self.index_of(source_id), self.index_of(target_id)
+        first = self._shortest(source, target)
+        if first is None:
+            return []
+
+        n = self.graph.num_nodes
+        found = [first]
+        candidates: List[Tuple[int, List[int]]] = []
+        seen = {tuple(first)}
+        while len(found) < k:
+            previous = found[-1]
+            for i in range(len(previous) - 1):
+                spur, root = previous[i], previous[:i + 1]
+                blocked_edges = np.array(sorted({p[i] * n + p[i + 1] for p in found if len(p) > i + 1 and p[:i + 1] == root}), dtype=np.int64)
+                blocked_nodes = np.zeros(n, dtype=bool)
+                blocked_nodes[root[:-1]] = True
+                spur_path = self.graph.bidirectional_path(spur, target, blocked_nodes, blocked_edges)
+                if spur_path is None:
+                    continue
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    heapq.heappush(candidates, (len(candidate), candidate))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+
+        return [self._path_record(rank, path) for rank, path in enumerate(found, start=1)]
+
+    def _path_record(self, rank: int, path: List[int]) -> Dict:
+        node_ids = self.graph.node_ids[path].tolist()
+        return {
+            'rank': rank,
+            'hops': len(path) - 1,
+            'path': node_ids,
+            'actions': self.hop_actions(path),
+            'titles': [self.node_store.get_attribute(n, 'title', n) for n in node_ids]
+        }
+
+    def hop_actions(self, path: List[int]) -> List[str]:
+        if len(path) < 2 or not len(self._label_pairs):
+            return []
+        codes = np.asarray(path[:-1], dtype=np.int64) * self.graph.num_nodes + np.asarray(path[1:], dtype=np.int64)
+        positions = np.clip(np.searchsorted(self._label_pairs, codes), 0, len(self._label_pairs) - 1)
+        found = self._label_pairs[positions] == codes
+        return [str(self.actions[self._label_actions[p]]) if ok else '' for p, ok in zip(positions.tolist(), found.tolist())]
+
+    def _matrices_for(self, role: Optional[str]) -> Tuple[List[sp.csr_matrix], List[np.ndarray]]:
+        """Per-action transposed adjacency (traversal counts) and per-node outgoing counts"""
+        if role not in self._action_matrices:
+            n = self.graph.num_nodes
+            keep = np.ones(len(self.edge_src), dtype=bool) if role is None else self.roles[self.edge_role] == role
+            transposed, out_counts = [], []
+            for a in range(len(self.actions)):
+                chosen = keep & (self.edge_action == a)
+                weights = self.edge_weight[chosen]
+                transposed.append(sp.csr_matrix((weights, (self.edge_dst[chosen], self.edge_src[chosen])), shape=(n, n)))
+                out_counts.append(np.bincount(self.edge_src[chosen], weights=weights, minlength=n))
+            self._action_matrices[role] = (transposed, out_counts)
+        return self._action_matrices[role]
+
+    def action_sequences(self, min_length: int = 2, max_length: int = 3, top: int = 20, role: Optional[str] = None) -> List[Dict]:
+        """Most frequent action n-grams along walks in the state graph.
+
+        The count of a sequence a1..am is the number of walks whose hops carry those
+        actions, each hop weighted by how often it was traversed. Walk counts per end
+        state are propagated one action at a time (one sparse mat-vec per prefix), and
+        extending a prefix by one action is a single dot product.
+        """
+        transposed, out_counts = self._matrices_for(role)
+        results = []
+        # (prefix, walks ending at each state with that prefix); the empty prefix starts anywhere
+        stack = [((), np.ones(self.graph.num_nodes))]
+        while stack:
+            prefix, walks = stack.pop()
+            for a in range(len(self.actions)):
+                count = float(walks @ out_counts[a])
+                if count <= 0:
+                    continue
+                sequence = prefix + (a,)
+                if len(sequence) >= min_length:
+                    results.append((count, sequence))
+                if len(sequence) < max_length:
+                    stack.append((sequence, transposed[a] @ walks))
+
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [{
+            'sequence': " → ".join(str(self.actions[a]) for a in sequence),
+            'length': len(sequence),
+            'count': int(round(count))
+        } for count, sequence in results[:top]]
+
+    def funnel(self, steps: List[str]) -> List[Dict]:
+        """Conversion between consecutive states.
+
+        For each step, the share of recorded traversals leaving it that move one hop closer
+        to the next step (i.e. along some shortest route to it). Cumulative conversion is
+        the product of the step conversions; drop-off is its complement.
+        """
+        matrix = self.traversals
+        rows = []
+        cumulative = 1.0
+        for position, node_id in enumerate(steps):
+            row = {
+                'step': position + 1,
+                'state': node_id,
+                'title': self.node_store.get_attribute(node_id, 'title', node_id),
+                'hops_to_next': None,
+                'traversals_out': 0,
+                'continuing': 0,
+                'conversion': None,
+                'cumulative': round(cumulative, 4),
+                'drop_off': None
+            }
+            if position + 1 < len(steps):
+                current = self.index_of(node_id)
+                distance, _ = self.bfs_tree(steps[position + 1], "in")
+                start, end = matrix.indptr[current], matrix.indptr[current + 1]
+                neighbors, traversals = matrix.indices[start:end], matrix.data[start:end]
+                hops = int(distance[current])
+                continuing = float(traversals[distance[neighbors] == hops - 1].sum()) if hops > 0 else 0.0
+                total = float(traversals.sum())
+                conversion = continuing / total if total else 0.0
+                if hops == 0:
+                    conversion = 1.0  # Same state twice in a row
+                cumulative *= conversion
+                row.update({
+                    'hops_to_next': hops if hops >= 0 else None,
+                    'traversals_out': int(total),
+                    'continuing': int(continuing),
+                    'conversion': round(conversion, 4),
+                    'drop_off': round(1 - conversion, 4)
+                })
+            rows.append(row)
+        return rows
+
+
+def journey_table(rows: List[Dict]) -> pd.DataFrame:
+    """Flatten analysis rows for display and CSV export (list cells joined with arrows)"""
+    return pd.DataFrame([{k: " → ".join(map(str, v)) if isinstance(v, list) else v for k, v in row.items()} for row in rows])
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import LAYOUT_CACHE_DIR, LAYOUT_CACHE_MAX_BYTES
+
+class LayoutCache:
+    """On-disk store of computed layout positions.
+
+    Entries are keyed by a digest of the node and edge sets plus the layout type and its
+    parameters, so two crawls that happen to share node ids but differ in topology never
+    share positions. Each entry also records the node ids it was computed for and is
+    rejected on load if they do not match. Least recently used entries are evicted once
+    the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = LAYOUT_CACHE_DIR, max_bytes: int = LAYOUT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def graph_digest(node_ids: Iterable, edges: Iterable[Tuple]) -> str:
+        h = hashlib.sha256()
+        nodes = sorted(str(n) for n in node_ids)
+        h.update(f"nodes:{len(nodes)}\n".encode('utf-8'))
+        for n in nodes:
+            h.update(n.encode('utf-8') + b'\x00')
+        pairs = sorted((str(u), str(v)) for u, v in edges)
+        h.update(f"edges:{len(pairs)}\n".encode('utf-8'))
+        for u, v in pairs:
+            h.update(u.encode('utf-8') + b'\x01' + v.encode('utf-8') + b'\x00')
+        return h.hexdigest()
+
+    @staticmethod
+    def make_key(graph_digest: str, layout_type: str, params: Dict) -> str:
+        payload = json.dumps({'graph': graph_digest, 'layout': layout_type, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def load(self, key: str, node_ids: List) -> Optional[Dict]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                stored_ids = entry['ids']
+                coords = entry['positions']
+        except Exception:
+            # Truncated or corrupt entry; drop it and recompute
+            self._remove(path)
+            return None
+
+        by_str = {str(n): n for n in node_ids}
+        if len(stored_ids) != len(by_str) or any(i not in by_str for i in stored_ids.tolist()):
+            return None
+
+        os.utime(path)  # Mark as recently used for eviction
+        return {by_str[i]: coords[k] for k, i in enumerate(stored_ids.tolist())}
+
+    def save(self, key: str, positions: Dict):
+        ids = list(positions)
+        coords = np.array([positions[n] for n in ids], dtype=np.float64).reshape(-1, 2)
+        # A temp file per writer: sessions are threads of one process and may save the same key at once
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, ids=np.array([str(n) for n in ids], dtype=str), positions=coords)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,148 @@
+import multiprocessing
+import threading
+import networkx as nx
+import numpy as np
+from typing import Dict, List, Optional
+from config import AVAILABLE_LAYOUTS, LAYOUT_PRECOMPUTE_WORKERS
+from utils.layout_cache import LayoutCache
+from utils.networkx_utils import GraphView, compute_layout, layout_signature
+
+def _layout_task(node_ids: List[str], edge_src: np.ndarray, edge_dst: np.ndarray, layout_type: str,
+                 cache_dir: str, max_bytes: int, key: str) -> str:
+    """Worker: rebuild the view's topology, compute one layout and write it to the cache"""
+    G = nx.DiGraph()
+    G.add_nodes_from(node_ids)
+    G.add_edges_from((node_ids[u], node_ids[v]) for u, v in zip(edge_src.tolist(), edge_dst.tolist()))
+    LayoutCache(cache_dir, max_bytes).save(key, compute_layout(G, layout_type))
+    return layout_type
+
+
+class LayoutPrecomputer:
+    """Computes every layout of graph views in one shared pool of background processes.
+
+    Results go to the LayoutCache under the same keys the app looks up, so once a
+    layout finishes, selecting it is a cache load. One instance serves every session:
+    jobs are keyed by an owner (a session), and starting a different view for the same
+    owner replaces its job. Layouts no job needs any more are dropped before they
+    start, and a layout wanted by several jobs is computed once. At most `max_workers`
+    layouts are handed to the pool at a time, so the rest can still be dropped, and
+    the layout a session waits for goes ahead of the others.
+    Workers are spawned rather than forked, since the app process runs threads.
+    """
+
+    def __init__(self, cache: LayoutCache, max_workers: int = LAYOUT_PRECOMPUTE_WORKERS, layouts: List[str] = None):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.layouts = layouts or AVAILABLE_LAYOUTS
+        self._pool = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}      # owner -> {'digest', 'keys': {layout: key}, 'cached': set of layouts}
+        self._status: Dict[str, str] = {}     # key -> queued, running, done or failed
+        self._pending: List = []              # (key, task args) waiting for a free worker
+        self._running = 0
+        self._finished: Dict[str, threading.Event] = {}
+
+    def start(self, view: GraphView, first: Optional[str] = None, owner: str = "default"):
+        """Queue every layout of the view not cached yet; `first` is queued ahead of the rest"""
+        digest = view.get_graph_digest()
+        with self._lock:
+            job = self._jobs.get(owner)
+            if job is not None and job['digest'] == digest:
+                return
+            job = self._jobs[owner] = {'digest': digest, 'keys': {}, 'cached': set()}
+            node_ids = view.node_ids.tolist()
+            for layout_type in sorted(self.layouts, key=lambda layout: layout != first):
+                resolved, params = layout_signature(layout_type, view.num_nodes)
+                key = self.cache.make_key(digest, resolved, params)
+                if self.cache.contains(key):
+                    job['cached'].add(layout_type)
+                    continue
+                job['keys'][layout_type] = key
+                # Options that resolve to the same layout (e.g. an approximation) share one task
+                if self._status.get(key) not in ("queued", "running"):
+                    self._status[key] = "queued"
+                    self._finished[key] = threading.Event()
+                    task = (key, (node_ids, view.edge_src, view.edge_dst, resolved, self.cache.cache_dir, self.cache.max_bytes, key))
+                    if layout_type == first:
+                        self._pending.insert(0, task)
+                    else:
+                        self._pending.append(task)
+            self._drop_unneeded()
+            self._submit()
+
+    def progress(self, owner: str = "default") -> Dict[str, str]:
+        """Status per layout of the owner's job: cached, queued, running, done or failed"""
+        with self._lock:
+            job = self._jobs.get(owner)
+            if job is None:
+                return {}
+            statuses = {layout_type: "cached" for layout_type in job['cached']}
+            statuses.update({layout_type: self._status.get(key, "queued") for layout_type, key in job['keys'].items()})
+            return {layout_type: statuses[layout_type] for layout_type in self.layouts if layout_type in statuses}
+
+    def finished(self, owner: str = "default") -> bool:
+        return all(status not in ("queued", "running") for status in self.progress(owner).values())
+
+    def wait(self, layout_type: str, owner: str = "default", timeout: Optional[float] = None):
+        """Block until a queued layout is written to the cache (or failed / timed out)"""
+        with self._lock:
+            key = self._jobs.get(owner, {}).get('keys', {}).get(layout_type)
+            event = self._finished.get(key)
+            if event is not None and not event.is_set():
+                # Whoever waits goes first among the layouts not handed to a worker yet
+                for index, task in enumerate(self._pending):
+                    if task[0] == key:
+                        self._pending.insert(0, self._pending.pop(index))
+                        break
+        if event is not None:
+            event.wait(timeout)
+
+    def cancel(self, owner: str = "default"):
+        """Forget the owner's job; its layouts that have not started are dropped unless another job needs them"""
+        with self._lock:
+            self._jobs.pop(owner, None)
+            self._drop_unneeded()
+
+    def close(self):
+        """Terminate the workers and forget every job"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            for event in self._finished.values():
+                event.set()
+            self._jobs, self._status, self._pending, self._finished, self._running = {}, {}, [], {}, 0
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def _drop_unneeded(self):
+        """Drop pending layouts and finished statuses no job refers to; called with the lock held"""
+        needed = {key for job in self._jobs.values() for key in job['keys'].values()}
+        for task in self._pending:
+            if task[0] not in needed:
+                self._finished.pop(task[0]).set()
+        self._pending = [task for task in self._pending if task[0] in needed]
+        self._status = {key: status for key, status in self._status.items() if key in needed or status == "running"}
+
+    def _submit(self):
+        """Hand pending layouts to free workers; called with the lock held"""
+        while self._pending and self._running < self.max_workers:
+            key, args = self._pending.pop(0)
+            if self._pool is None:
+                self._pool = multiprocessing.get_context("spawn").Pool(self.max_workers)
+            self._status[key] = "running"
+            self._running += 1
+            self._pool.apply_async(_layout_task, args,
+                                   callback=lambda _, key=key: self._complete(key, "done"),
+                                   error_callback=lambda _, key=key: self._complete(key, "failed"))
+
+    def _complete(self, key: str, status: str):
+        # Runs on the pool's result thread
+        with self._lock:
+            if key not in self._finished:
+                return  # Closed meanwhile
+            self._running -= 1
+            self._status[key] = status
+            event = self._finished.pop(key, None)
+            if event is not None:
+                event.set()
+            self._submit()
@@ -1,57 +1,357 @@
+import importlib.util
 import networkx as nx
-from typing import Dict, List, Tuple
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 import plotly.graph_objects as go
+from config import LAYOUT_MAX_NODES, LAYOUT_APPROXIMATIONS, EGO_MAX_NODES
+from utils.csr_graph import CSRGraph, summarize_degrees
+from utils.layout_cache import LayoutCache
+from utils.node_store import NodeStore
+
+GRAPH_BACKENDS = ["networkx", "csr"]
+
+# Keyword arguments for each layout; part of the layout cache key
+LAYOUT_PARAMS = {
+    "spring": {"k": 0.5, "iterations": 50},
+    "hierarchical": {"prog": "dot"},
+    "circular": {},
+    "kamada_kawai": {},
+    "shell": {}
+}
 
 class NetworkXGraphBuilder:
-    def __init__(self, nodes: List[Dict], edges: List[Dict]):
+    def __init__(self, nodes: List[Dict], edges: List[Dict], node_store: NodeStore = None, backend: str = "networkx"):
         self.nodes = nodes
         self.edges = edges
+        self.node_store = node_store if node_store is not None else NodeStore(nodes)
+        self.backend = backend
         self.G = nx.DiGraph()
+        self.csr = None
+        self._adjacency = None
+        self._digest = None
+        self._attributes = {}
         
     def build_graph(self):
-        # Add nodes with attributes
+        self._index_records()
+        if self.backend == "csr":
+            self.csr = CSRGraph(self.node_ids.tolist(), self._record_src, self._record_dst)
+            return self.csr
+        
+        # Graph nodes carry only small scalar attributes; payloads stay in the node store
+        self.G.add_nodes_from((node_id, self.node_store.graph_attributes(node_id)) for node_id in self.node_ids.tolist())
+        
+        # Edges to ids outside the node list are skipped rather than creating attribute-less nodes
+        self.G.add_edges_from(
+            (edge['from'], edge['to'], {'action': edge['action'], 'role': edge['role']})
+            for edge, known in zip(self.edges, self._record_known.tolist())
+            if known
+        )
+        
+        return self.G
+    
+    def _index_records(self):
+        """Graph position per node id, per input row, and per edge record (endpoints both known)"""
+        index = {}
         for node in self.nodes:
-            self.G.add_node(
-                node['id'],
-                **{k: v for k, v in node.items() if k != 'id'}
-            )
+            index.setdefault(node['id'], len(index))
+        self.index = index
+        self.node_ids = np.array(list(index), dtype=object)
+        self.row_positions = np.fromiter((index[node['id']] for node in self.nodes), dtype=np.int64, count=len(self.nodes))
         
-        # Add edges
-        for edge in self.edges:
-            # Handle both 'from' field and missing 'from' field (infer from node relationships)
-            edge_from = edge.get('from', None)
-            edge_to = edge.get('to', None)
-            
-            if not edge_from:
-                # Skip edges without source - they're malformed
-                continue
-                
-            if not edge_to:
-                continue
-            
-            self.G.add_edge(
-                edge_from,
-                edge_to,
-                action=edge.get('action', ''),
-                role=edge.get('role', 'guest')
-            )
+        src = np.fromiter((index.get(e['from'], -1) for e in self.edges), dtype=np.int64, count=len(self.edges))
+        dst = np.fromiter((index.get(e['to'], -1) for e in self.edges), dtype=np.int64, count=len(self.edges))
+        self._record_known = (src >= 0) & (dst >= 0)
+        self.dropped_edges = len(self.edges) - int(self._record_known.sum())
+        self._record_src, self._record_dst = src[self._record_known], dst[self._record_known]
+        # Distinct edges, matching the DiGraph edge set
+        codes = np.unique(self._record_src * max(len(index), 1) + self._record_dst)
+        self.edge_src, self.edge_dst = codes // max(len(index), 1), codes % max(len(index), 1)
+    
+    def attribute_array(self, key: str, default=None) -> np.ndarray:
+        """One node attribute per graph position, computed once per key"""
+        if key not in self._attributes:
+            self._attributes[key] = np.array([self.node_store.get_attribute(n, key, default) for n in self.node_ids.tolist()], dtype=object)
+        return self._attributes[key]
+    
+    @property
+    def adjacency(self) -> CSRGraph:
+        """Distinct-edge CSR index over every graph position, built on first use (neighborhood queries)"""
+        if self._adjacency is None:
+            self._adjacency = self.csr or CSRGraph(self.node_ids.tolist(), self.edge_src, self.edge_dst)
+        return self._adjacency
+    
+    def view(self, mask: np.ndarray = None) -> 'GraphView':
+        """Induced subgraph over the input rows selected by a boolean mask (all rows if None)"""
+        if mask is None:
+            return GraphView(self, np.arange(len(self.node_ids)))
+        return GraphView(self, np.unique(self.row_positions[np.asarray(mask, dtype=bool)]))
+    
+    def get_depths(self, sources: List[str] = None, direction: str = "out") -> Dict[str, int]:
+        if self.csr is not None:
+            return self.csr.bfs_depths(sources, direction)
         
+        G = self._oriented_graph(direction)
+        if sources is None:
+            sources = [n for n, d in self.G.in_degree() if d == 0] or list(self.G)[:1]
+        sources = [s for s in sources if s in G]
+        if not sources:
+            return {}
+        return dict(nx.multi_source_dijkstra_path_length(G, sources))
+    
+    def get_connected_components(self, connection: str = "weak") -> List[set]:
+        if self.csr is not None:
+            return self.csr.connected_components(connection)
+        if connection == "strong":
+            return [set(c) for c in nx.strongly_connected_components(self.G)]
+        return [set(c) for c in nx.weakly_connected_components(self.G)]
+    
+    def get_pagerank(self, alpha: float = 0.85) -> Dict[str, float]:
+        if self.csr is not None:
+            return self.csr.pagerank(alpha)
+        return nx.pagerank(self.G, alpha=alpha)
+    
+    def get_degree_statistics(self) -> Dict:
+        if self.csr is not None:
+            return self.csr.degree_statistics()
+        
+        in_degrees = np.array([d for _, d in self.G.in_degree()], dtype=np.int64)
+        out_degrees = np.array([d for _, d in self.G.out_degree()], dtype=np.int64)
+        return {
+            'in': summarize_degrees(in_degrees),
+            'out': summarize_degrees(out_degrees),
+            'total': summarize_degrees(in_degrees + out_degrees)
+        }
+    
+    def get_subgraph(self, node_ids: List[str]):
+        if self.csr is not None:
+            return self.csr.subgraph(node_ids)
+        return self.G.subgraph(node_ids).copy()
+    
+    def _oriented_graph(self, direction: str):
+        if direction == "in":
+            return self.G.reverse(copy=False)
+        if direction == "both":
+            return self.G.to_undirected(as_view=True)
         return self.G
     
-    def get_layout_positions(self, layout_type: str) -> Dict:
-        if layout_type == "spring":
-            return nx.spring_layout(self.G, k=0.5, iterations=50)
-        elif layout_type == "hierarchical":
-            try:
-                return nx.nx_agraph.graphviz_layout(self.G, prog='dot')
-            except ImportError:
-                # Fallback to spring if pygraphviz is not available
-                return nx.spring_layout(self.G, k=0.5, iterations=50)
-        elif layout_type == "circular":
-            return nx.circular_layout(self.G)
-        elif layout_type == "kamada_kawai":
-            return nx.kamada_kawai_layout(self.G)
-        elif layout_type == "shell":
-            return nx.shell_layout(self.G)
-        else:
-            return nx.spring_layout(self.G, k=0.5, iterations=50)
\ No newline at end of file
+    def get_graph_digest(self) -> str:
+        if self._digest is None:
+            self._digest = LayoutCache.graph_digest(self.G.nodes(), self.G.edges())
+        return self._digest
+    
+    def get_layout_positions(self, layout_type: str, cache: LayoutCache = None) -> Dict:
+        if self.csr is not None and self.G.number_of_nodes() == 0:
+            # Layout algorithms are networkx-only; materialise the topology once
+            self.G = self.csr.to_networkx()
+        return cached_layout(self.G, layout_type, cache, self.get_graph_digest)
+
+
+class GraphView:
+    """Induced subgraph of a built graph, selected by graph positions.
+
+    Nothing is rebuilt per filter: the networkx graph is a subgraph view of the full
+    graph, edges are kept only when both endpoints are in the view, and node ids,
+    edges and attributes are slices of the builder's precomputed arrays renumbered to
+    view positions (0..num_nodes-1).
+    """
+
+    def __init__(self, builder: NetworkXGraphBuilder, positions: np.ndarray):
+        self.builder = builder
+        self.node_store = builder.node_store
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.node_ids = builder.node_ids[self.positions]
+
+        local = np.full(len(builder.node_ids), -1, dtype=np.int64)
+        local[self.positions] = np.arange(len(self.positions))
+        src, dst = local[builder.edge_src], local[builder.edge_dst]
+        inside = (src >= 0) & (dst >= 0)
+        self.edge_src, self.edge_dst = src[inside], dst[inside]
+        self._local = local
+        self._G = None
+        self._digest = None
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.positions)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_src)
+
+    @property
+    def G(self) -> nx.DiGraph:
+        if self._G is None:
+            if self.builder.G.number_of_nodes():
+                self._G = self.builder.G.subgraph(self.node_ids.tolist())
+            else:
+                # CSR backend: a small DiGraph over just this view
+                ids = self.node_ids.tolist()
+                self._G = nx.DiGraph()
+                self._G.add_nodes_from((n, self.node_store.graph_attributes(n)) for n in ids)
+                self._G.add_edges_from(zip(self.node_ids[self.edge_src].tolist(), self.node_ids[self.edge_dst].tolist()))
+        return self._G
+
+    def restrict(self, local_indices: np.ndarray) -> 'GraphView':
+        """Sub-view over some of this view's positions (e.g. a sample)"""
+        return GraphView(self.builder, np.sort(self.positions[np.asarray(local_indices, dtype=np.int64)]))
+
+    def nodes(self) -> List[Dict]:
+        return [self.node_store[n] for n in self.node_ids.tolist()]
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Whether each graph position is part of this view"""
+        return self._local[positions] >= 0
+
+    def ego(self, center: str, hops: int, direction: str = "both", roles: Optional[List[str]] = None,
+            max_nodes: int = EGO_MAX_NODES) -> 'EgoView':
+        """k-hop neighborhood of one node inside this view, optionally through nodes of some roles only"""
+        builder = self.builder
+        position = builder.index.get(center)
+        if position is None or not self.contains(np.array([position]))[0]:
+            raise ValueError(f"Unknown node: {center}")
+        role_array = builder.attribute_array('role', 'guest') if roles is not None else None
+
+        def allowed(candidates: np.ndarray) -> np.ndarray:
+            keep = self.contains(candidates)
+            if role_array is not None:
+                keep &= np.isin(role_array[candidates].astype(str), roles)
+            return keep
+
+        positions, levels, truncated = builder.adjacency.ego_levels(position, hops, direction, allowed, max_nodes)
+        return EgoView(builder, positions, levels, center, truncated)
+
+    def attribute_array(self, key: str, default=None) -> np.ndarray:
+        return self.builder.attribute_array(key, default)[self.positions]
+
+    def to_csr(self) -> CSRGraph:
+        return CSRGraph(self.node_ids.tolist(), self.edge_src, self.edge_dst)
+
+    def get_graph_digest(self) -> str:
+        if self._digest is None:
+            self._digest = LayoutCache.graph_digest(
+                self.node_ids.tolist(), zip(self.node_ids[self.edge_src].tolist(), self.node_ids[self.edge_dst].tolist())
+            )
+        return self._digest
+
+    def get_layout_positions(self, layout_type: str, cache: LayoutCache = None, sample: 'GraphView' = None) -> Dict:
+        """Positions of every node; with a smaller sample, the layout runs on the sample and is extended"""
+        if sample is not None and sample.num_nodes < self.num_nodes:
+            return self.extend_layout(sample, sample.get_layout_positions(layout_type, cache))
+        return cached_layout(self.G, layout_type, cache, self.get_graph_digest)
+
+    def extend_layout(self, sample: 'GraphView', positions: Dict) -> Dict:
+        """Positions for every node of this view from a layout of a sub-view.
+
+        Nodes outside the sample are placed hop by hop at the mean position of their
+        already placed neighbours, with a little jitter so siblings do not coincide;
+        nodes the sample cannot reach are spread on a ring around the layout.
+        """
+        csr = self.to_csr()
+        seeds = np.searchsorted(self.positions, sample.positions)
+        coords = np.zeros((self.num_nodes, 2), dtype=np.float64)
+        coords[seeds] = np.array([positions[n] for n in sample.node_ids.tolist()], dtype=np.float64).reshape(-1, 2)
+        placed = np.zeros(self.num_nodes, dtype=np.float64)
+        placed[seeds] = 1.0
+        extent = coords[seeds].max(axis=0) - coords[seeds].min(axis=0) if len(seeds) else np.ones(2)
+        spacing = max(float(extent.max()), 1e-9) / np.sqrt(max(len(seeds), 1))
+        rng = np.random.default_rng(42)
+
+        levels = csr.bfs_levels(seeds, "both")
+        matrix = csr.oriented("both")
+        order = np.argsort(levels, kind='stable')
+        bounds = np.searchsorted(levels[order], np.arange(1, max(int(levels.max()), 0) + 2))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            wave = order[start:end]
+            rows = matrix[wave]
+            # Unplaced coordinates are still zero, so only placed neighbours contribute
+            coords[wave] = (rows @ coords) / (rows @ placed)[:, None] + rng.normal(0.0, spacing / 2, (len(wave), 2))
+            placed[wave] = 1.0
+
+        unreached = np.flatnonzero(levels < 0)
+        if len(unreached):
+            reached = coords[levels >= 0]
+            center = reached.mean(axis=0) if len(reached) else np.zeros(2)
+            radius = 1.1 * np.sqrt(((reached - center) ** 2).sum(axis=1)).max() if len(reached) else 1.0
+            angles = np.linspace(0.0, 2 * np.pi, len(unreached), endpoint=False)
+            coords[unreached] = center + max(radius, spacing) * np.column_stack((np.cos(angles), np.sin(angles)))
+        return dict(zip(self.node_ids.tolist(), coords))
+
+
+class EgoView(GraphView):
+    """Neighborhood of one node, extracted by bounded BFS.
+
+    Built from the neighborhood's own rows of the adjacency index rather than by
+    filtering every edge of the graph, so its cost does not grow with the crawl.
+    `hops` holds each node's distance from the center, aligned with node_ids.
+    """
+
+    def __init__(self, builder: NetworkXGraphBuilder, positions: np.ndarray, hops: np.ndarray, center: str, truncated: bool):
+        order = np.argsort(positions, kind='stable')
+        self.builder = builder
+        self.node_store = builder.node_store
+        self.positions = np.asarray(positions, dtype=np.int64)[order]
+        self.node_ids = builder.node_ids[self.positions]
+        self.hops = np.asarray(hops, dtype=np.int64)[order]
+        self.center = center
+        self.truncated = truncated
+
+        sub = builder.adjacency.structure[self.positions][:, self.positions].tocoo()
+        self.edge_src, self.edge_dst = sub.row.astype(np.int64), sub.col.astype(np.int64)
+        self._local = None
+        self._G = None
+        self._digest = None
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        return np.isin(positions, self.positions)
+
+    def get_layout_positions(self, layout_type: str, cache: LayoutCache = None, sample: GraphView = None) -> Dict:
+        # Shells are the hop rings around the center
+        if layout_signature(layout_type, self.num_nodes)[0] == "shell":
+            rings = [self.node_ids[self.hops == hop].tolist() for hop in np.unique(self.hops).tolist()]
+            return nx.shell_layout(self.G, nlist=rings)
+        return super().get_layout_positions(layout_type, cache, sample)
+
+
+def cached_layout(G: nx.DiGraph, layout_type: str, cache: LayoutCache, digest) -> Dict:
+    """Layout positions for G, loaded from / saved to the cache when one is given"""
+    resolved, params = layout_signature(layout_type, G.number_of_nodes())
+    if cache is None:
+        return compute_layout(G, resolved)
+    
+    key = cache.make_key(digest(), resolved, params)
+    positions = cache.load(key, list(G.nodes()))
+    if positions is None:
+        positions = compute_layout(G, resolved)
+        cache.save(key, positions)
+    return positions
+
+
+def layout_signature(layout_type: str, num_nodes: int = 0) -> Tuple[str, Dict]:
+    """The layout actually computed for layout_type on a graph of num_nodes and its parameters, used as cache key"""
+    if layout_type == "hierarchical" and importlib.util.find_spec("pygraphviz") is None:
+        layout_type = "spring"
+    if layout_type not in LAYOUT_PARAMS:
+        layout_type = "spring"
+    # Expensive layouts are approximated by cheaper ones above their size limit
+    while num_nodes > LAYOUT_MAX_NODES.get(layout_type, num_nodes):
+        layout_type = LAYOUT_APPROXIMATIONS[layout_type]
+    return layout_type, LAYOUT_PARAMS[layout_type]
+
+
+def compute_layout(G: nx.DiGraph, layout_type: str) -> Dict:
+    if layout_type == "spring":
+        return nx.spring_layout(G, **LAYOUT_PARAMS["spring"])
+    elif layout_type == "hierarchical":
+        try:
+            return nx.nx_agraph.graphviz_layout(G, **LAYOUT_PARAMS["hierarchical"])
+        except ImportError:
+            # Fallback to spring if pygraphviz is not available
+            return nx.spring_layout(G, **LAYOUT_PARAMS["spring"])
+    elif layout_type == "circular":
+        return nx.circular_layout(G)
+    elif layout_type == "kamada_kawai":
+        return nx.kamada_kawai_layout(G)
+    elif layout_type == "shell":
+        return nx.shell_layout(G)
+    else:
+        return nx.spring_layout(G, **LAYOUT_PARAMS["spring"])
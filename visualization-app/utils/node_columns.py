@@ -0,0 +1,123 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional
+from utils.crawl_throughput import timestamps_ms
+
+def _count(value) -> int:
+    if isinstance(value, dict):
+        return value.get('total', 0) or 0
+    if isinstance(value, list):
+        return len(value)
+    return 0
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+# Column name -> extractor over a normalized node (see CrawlIngestor)
+NUMERIC_COLUMNS: Dict[str, Callable[[Dict], float]] = {
+    'depth': lambda n: n['depth'],
+    'simulated': lambda n: n['simulated'],
+    'timestamp': lambda n: _number(n.get('timestamp')),
+    'forms': lambda n: len(n['forms']),
+    'links': lambda n: len(n['links']),
+    'apis': lambda n: len(n['network']['requests']),
+    'has_auth': lambda n: bool(n['features'].get('hasAuth')),
+    'buttons': lambda n: _count(n['interactiveElements'].get('buttons')),
+    'checkboxes': lambda n: _count(n['interactiveElements'].get('checkboxes')),
+    'dropdowns': lambda n: _count(n['interactiveElements'].get('dropdowns')),
+    'draggables': lambda n: _count(n['interactiveElements'].get('draggables')),
+    'resizables': lambda n: _count(n['interactiveElements'].get('resizables')),
+    'selectables': lambda n: _count(n['interactiveElements'].get('selectables')),
+    'sortables': lambda n: _count(n['interactiveElements'].get('sortables')),
+    'lcp': lambda n: _number(n['performance'].get('webVitals', {}).get('LCP')),
+    'fid': lambda n: _number(n['performance'].get('webVitals', {}).get('FID')),
+    'cls': lambda n: _number(n['performance'].get('webVitals', {}).get('CLS')),
+    'fcp': lambda n: _number(n['performance'].get('webVitals', {}).get('FCP')),
+    'ttfb': lambda n: _number(n['performance'].get('webVitals', {}).get('TTFB')),
+    'aria_failures': lambda n: _number(n['accessibility'].get('ariaFailures')),
+}
+
+STRING_COLUMNS: Dict[str, Callable[[Dict], str]] = {
+    'id': lambda n: n['id'],
+    'url': lambda n: n['url'],
+    'title': lambda n: n['title'],
+    'role': lambda n: n['role'],
+}
+
+class StringColumn:
+    """Dictionary-encoded string column.
+
+    Equality is a code lookup plus one integer comparison; pattern matches run over the
+    distinct values only (far fewer than rows for role/url/title) and are memoized.
+    """
+
+    def __init__(self, values: List[str]):
+        # Object dtype throughout: a fixed-width unicode copy would be sized by the longest value
+        raw = np.empty(len(values), dtype=object)
+        raw[:] = values
+        codes, self.values = pd.factorize(raw, sort=True)
+        self.codes = codes.astype(np.int32)
+        self.lookup = {v: i for i, v in enumerate(self.values.tolist())}
+        self._pattern_cache: Dict[str, np.ndarray] = {}
+
+    def equals(self, value: str) -> np.ndarray:
+        code = self.lookup.get(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def isin(self, values: List[str]) -> np.ndarray:
+        codes = [self.lookup[v] for v in values if v in self.lookup]
+        return np.isin(self.codes, codes)
+
+    def search(self, pattern: str) -> np.ndarray:
+        """Rows whose value contains a match for the regular expression"""
+        matching = self._pattern_cache.get(pattern)
+        if matching is None:
+            regex = re.compile(pattern)
+            matching = np.array([regex.search(v) is not None for v in self.values.tolist()], dtype=bool)
+            self._pattern_cache[pattern] = matching
+        return matching[self.codes] if len(matching) else np.zeros(len(self.codes), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class NodeColumnTable:
+    """Per-node columns extracted once from a list of normalized nodes.
+
+    Row i corresponds to nodes[i]. Numeric columns are float64 (NaN where a metric is
+    absent), string columns are StringColumn indexes.
+    """
+
+    def __init__(self, nodes: List[Dict]):
+        self.nodes = nodes
+        self.numeric: Dict[str, np.ndarray] = {
+            name: np.fromiter((extract(n) for n in nodes), dtype=np.float64, count=len(nodes))
+            for name, extract in NUMERIC_COLUMNS.items()
+        }
+        self.strings: Dict[str, StringColumn] = {
+            name: StringColumn([extract(n) for n in nodes]) for name, extract in STRING_COLUMNS.items()
+        }
+        self._timestamps: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Epoch milliseconds per row (NaN where unusable); date strings are parsed once, on first use"""
+        if self._timestamps is None:
+            # Numeric timestamps are already a column; only the rest is parsed
+            timestamps = self.numeric['timestamp'].copy()
+            missing = np.flatnonzero(np.isnan(timestamps))
+            if len(missing):
+                nodes = self.nodes
+                timestamps[missing] = timestamps_ms([nodes[i].get('timestamp') for i in missing.tolist()])
+            self._timestamps = timestamps
+        return self._timestamps
+
+    def take(self, mask: np.ndarray) -> List[Dict]:
+        nodes = self.nodes
+        return [nodes[i] for i in np.flatnonzero(mask).tolist()]
@@ -0,0 +1,51 @@
+import numpy as np
+from typing import Dict, List
+from utils.node_columns import NodeColumnTable
+
+INTERACTIVE_ELEMENT_TYPES = ["Buttons", "Checkboxes", "Dropdowns", "Draggables", "Resizables", "Selectables", "Sortables"]
+
+class NodeFilter:
+    def __init__(self, role_filter: List[str], show_simulated: bool = True, interactive_filter: List[str] = None):
+        self.role_filter = role_filter
+        self.show_simulated = show_simulated
+        self.interactive_filter = interactive_filter or []
+
+    def apply(self, nodes: List[Dict]) -> List[Dict]:
+        # Nodes come from CrawlIngestor, so role/simulated/interactiveElements are always present
+        return [n for n in nodes if self.matches(n)]
+
+    def mask(self, table: NodeColumnTable) -> np.ndarray:
+        """Same selection as `apply`, evaluated over a column table"""
+        mask = table.strings['role'].isin(self.role_filter)
+        if not self.show_simulated:
+            mask &= table.numeric['simulated'] == 0
+        if self.interactive_filter and len(self.interactive_filter) < len(INTERACTIVE_ELEMENT_TYPES):
+            mask &= np.logical_or.reduce([table.numeric[t.lower()] > 0 for t in self.interactive_filter])
+        return mask
+
+    def matches(self, node: Dict) -> bool:
+        node_role = node['role']
+        is_simulated = node['simulated']
+
+        # Check role and simulated filters
+        if node_role not in self.role_filter or (not self.show_simulated and is_simulated):
+            return False
+
+        # Only filter on interactive elements if not all types are selected
+        if self.interactive_filter and len(self.interactive_filter) < len(INTERACTIVE_ELEMENT_TYPES):
+            return self._has_selected_elements(node['interactiveElements'])
+
+        return True
+
+    def _has_selected_elements(self, interactive_elements: Dict) -> bool:
+        for element_type in self.interactive_filter:
+            element_data = interactive_elements.get(element_type.lower(), {})
+
+            # Check if this element type has any items
+            if isinstance(element_data, dict):
+                if element_data.get('total', 0) > 0:
+                    return True
+            elif isinstance(element_data, list) and len(element_data) > 0:
+                return True
+
+        return False
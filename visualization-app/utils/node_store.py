@@ -0,0 +1,61 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+# Small scalar attributes copied onto graph nodes; everything else stays in the store
+GRAPH_ATTRIBUTES = ('url', 'title', 'role', 'depth', 'simulated')
+
+SCALAR_TYPES = (str, int, float, bool)
+
+class NodeStore:
+    """Single id -> node dict lookup shared by the graph builder, visualizer and exporters.
+
+    Node dicts are held by reference, so heavy payloads (forms, network, interactiveElements,
+    accessibility, ...) exist once no matter how many components need them.
+    """
+
+    def __init__(self, nodes: Optional[List[Dict]] = None):
+        self._nodes: Dict[str, Dict] = {}
+        if nodes:
+            self.add_many(nodes)
+
+    def add(self, node: Dict):
+        self._nodes[node['id']] = node
+
+    def add_many(self, nodes: List[Dict]):
+        for node in nodes:
+            self.add(node)
+
+    def get(self, node_id: str, default: Any = None) -> Optional[Dict]:
+        return self._nodes.get(node_id, default)
+
+    def get_attribute(self, node_id: str, key: str, default: Any = None) -> Any:
+        node = self._nodes.get(node_id)
+        return node.get(key, default) if node is not None else default
+
+    def graph_attributes(self, node_id: str) -> Dict:
+        node = self._nodes.get(node_id, {})
+        return {k: node[k] for k in GRAPH_ATTRIBUTES if isinstance(node.get(k), SCALAR_TYPES)}
+
+    def export_attributes(self, node_id: str) -> Dict:
+        """All attributes of a node in GraphML-safe form: scalars as-is, containers as JSON strings"""
+        attributes = {}
+        for k, v in self._nodes.get(node_id, {}).items():
+            if k == 'id' or v is None:
+                continue
+            attributes[k] = v if isinstance(v, SCALAR_TYPES) else json.dumps(v, default=str)
+        return attributes
+
+    def nodes(self) -> List[Dict]:
+        return list(self._nodes.values())
+
+    def __getitem__(self, node_id: str) -> Dict:
+        return self._nodes[node_id]
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._nodes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
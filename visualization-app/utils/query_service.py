@@ -0,0 +1,352 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import numpy as np
+from config import (QUERY_SERVICE_CACHE_SIZE, QUERY_SERVICE_HOST, QUERY_SERVICE_IDLE_TIMEOUT, QUERY_SERVICE_MAX_RESULTS,
+                    QUERY_SERVICE_PORT, QUERY_SERVICE_WORKERS)
+from components.testable_components import TestableComponentAnalyzer
+from utils.crawl_ingest import ingest_crawls
+from utils.crawl_workspace import CrawlWorkspace
+from utils.csr_graph import CSRGraph
+from utils.filter_expression import FilterExpression, compile_filter
+from utils.node_columns import NodeColumnTable
+from utils.node_store import NodeStore
+
+class QueryError(Exception):
+    """A request the service cannot answer; `status` is the HTTP status to reply with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class _LRU:
+    """Small thread-safe least-recently-used cache"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute: Callable):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        # Computed outside the lock; two racing requests may both compute, the result is the same
+        value = compute()
+        with self._lock:
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+
+class ResidentView:
+    """Everything the service keeps in memory for one crawl view.
+
+    The node store exists up front; the column table (filters) and CSR graph
+    (neighborhoods) are built by the first request that needs them and then shared.
+    """
+
+    def __init__(self, name: str, nodes: List[Dict], edges: List[Dict]):
+        self.name = name
+        self.nodes = nodes
+        self.edges = edges
+        self.node_store = NodeStore(nodes)
+        self._table = None
+        self._graph = None
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> NodeColumnTable:
+        with self._lock:
+            if self._table is None:
+                self._table = NodeColumnTable(self.nodes)
+            return self._table
+
+    @property
+    def graph(self) -> CSRGraph:
+        with self._lock:
+            if self._graph is None:
+                self._graph = CSRGraph.from_records((n['id'] for n in self.nodes), self.edges, keep_unknown=False)
+            return self._graph
+
+    def summary(self, node_id: str) -> Dict:
+        return dict(id=node_id, **self.node_store.graph_attributes(node_id))
+
+
+class CrawlQueryService:
+    """Query layer over parsed crawls, shared by all request threads.
+
+    Crawls are parsed once into a CrawlWorkspace; each view's node store, column
+    table and graph stay resident, compiled filters and per-node component analyses
+    are kept in LRU caches. Loading another crawl replaces the resident views, while
+    requests already running keep the views they started with.
+    """
+
+    def __init__(self, workspace: CrawlWorkspace = None, cache_size: int = QUERY_SERVICE_CACHE_SIZE,
+                 max_results: int = QUERY_SERVICE_MAX_RESULTS, load_dir: Optional[str] = None):
+        self.workspace = workspace or CrawlWorkspace()
+        self.max_results = max_results
+        self.load_dir = os.path.realpath(load_dir) if load_dir else None
+        self._views: Dict[str, ResidentView] = {}
+        self._lock = threading.Lock()
+        self._filters = _LRU(256)
+        self._components = _LRU(cache_size)
+
+    def load(self, path: str) -> List[Dict]:
+        """Parse a crawl file (plain, compressed or zip) into the workspace"""
+        if not os.path.isfile(path):
+            raise QueryError(f"No such file: {path}", 404)
+        loaded = []
+        try:
+            crawls = list(ingest_crawls(path, os.path.basename(path)))
+        except ValueError as e:
+            raise QueryError(f"{path}: {e}")
+        with self._lock:
+            for name, data in crawls:
+                if name in self.workspace:
+                    self.workspace.remove_crawl(name)
+                self.workspace.add_crawl(name, data, source_size=os.path.getsize(path), source=path)
+                loaded.append({'name': name, 'nodes': len(data['nodes']), 'issues': data['report'].to_dict()})
+            self._views = {}
+        return loaded
+
+    def load_requested(self, path: str) -> List[Dict]:
+        """Load a crawl a client asked for; only files under `load_dir` are allowed"""
+        if self.load_dir is None:
+            raise QueryError("Loading crawls over HTTP is disabled (start the service with --load-dir)", 403)
+        resolved = os.path.realpath(os.path.join(self.load_dir, path))
+        if os.path.commonpath([resolved, self.load_dir]) != self.load_dir:
+            raise QueryError(f"Not under the load directory: {path}", 403)
+        return self.load(resolved)
+
+    def _limit(self, limit: Optional[int]) -> int:
+        if limit is None:
+            return self.max_results
+        if limit < 1:
+            raise QueryError("limit must be at least 1")
+        return min(limit, self.max_results)
+
+    def view(self, name: Optional[str] = None) -> ResidentView:
+        with self._lock:
+            names = self.workspace.view_names()
+            if not names:
+                raise QueryError("No crawls loaded", 404)
+            name = name or names[0]
+            if name not in names:
+                raise QueryError(f"Unknown view: {name} (available: {', '.join(names)})", 404)
+            if name not in self._views:
+                nodes, edges = self.workspace.view(name)
+                self._views[name] = ResidentView(name, nodes, edges)
+            return self._views[name]
+
+    def views(self) -> List[Dict]:
+        with self._lock:
+            views = []
+            for name in self.workspace.view_names():
+                if name in self.workspace:
+                    crawl = self.workspace.crawls[name]
+                    nodes, edges = len(crawl['nodes']), len(crawl['edge_codes'])
+                else:
+                    merged = self.workspace.merge()
+                    nodes, edges = len(merged['nodes']), int(merged['weights'].sum())
+                views.append({'name': name, 'nodes': nodes, 'edges': edges, 'statistics': self.workspace.statistics(name)})
+            return views
+
+    def node(self, node_id: str, view: Optional[str] = None) -> Dict:
+        node = self.view(view).node_store.get(node_id)
+        if node is None:
+            raise QueryError(f"Unknown node: {node_id}", 404)
+        return node
+
+    def filter(self, expression: str = None, view: Optional[str] = None, offset: int = 0, limit: int = None,
+               fields: Optional[List[str]] = None) -> Dict:
+        """Nodes matching a filter expression (all nodes without one), one page at a time"""
+        resident = self.view(view)
+        table = resident.table
+        if expression:
+            compiled: FilterExpression = self._filters.get(expression, lambda: compile_filter(expression))
+            rows = np.flatnonzero(compiled.mask(table))
+        else:
+            rows = np.arange(len(table))
+        offset = max(offset, 0)
+        limit = self._limit(limit)
+        page = rows[offset:offset + limit].tolist()
+        nodes = table.nodes
+        if fields == ['*']:
+            items = [nodes[i] for i in page]
+        elif fields:
+            items = [{key: nodes[i].get(key) for key in ['id'] + [f for f in fields if f != 'id']} for i in page]
+        else:
+            items = [resident.summary(nodes[i]['id']) for i in page]
+        return {'view': resident.name, 'total': len(rows), 'offset': offset, 'nodes': items}
+
+    def neighborhood(self, node_id: str, view: Optional[str] = None, depth: int = 1, direction: str = "both",
+                     limit: int = None) -> Dict:
+        """Nodes within `depth` hops of a node and the edges among them"""
+        if direction not in ("out", "in", "both"):
+            raise QueryError(f"Unknown direction: {direction} (expected out, in or both)")
+        resident = self.view(view)
+        graph = resident.graph
+        if node_id not in graph.index:
+            raise QueryError(f"Unknown node: {node_id}", 404)
+        # Bounded BFS: the cost follows the neighborhood, not the crawl
+        keep, levels, truncated = graph.ego_levels(graph.index[node_id], depth, direction,
+                                                   max_nodes=self._limit(limit))
+        sub = graph.structure[keep][:, keep].tocoo()
+        ids = graph.node_ids
+        return {
+            'view': resident.name,
+            'center': node_id,
+            'truncated': truncated,
+            'nodes': [dict(resident.summary(ids[i]), hops=int(hop)) for i, hop in zip(keep.tolist(), levels.tolist())],
+            'edges': [{'from': ids[keep[u]], 'to': ids[keep[v]]} for u, v in zip(sub.row.tolist(), sub.col.tolist())]
+        }
+
+    def components(self, node_id: str, view: Optional[str] = None) -> Dict:
+        """Testable-component summary of a node, computed once per node payload"""
+        node = self.node(node_id, view)
+
+        def analyze():
+            analyzer = TestableComponentAnalyzer(node)
+            return {'id': node_id, 'counts': analyzer.count_components(), **analyzer.get_all_testable_components()}
+
+        # Keyed by payload identity (merged views share payloads with their crawls); the node is
+        # kept alongside so its id cannot be reused while the entry is cached
+        return self._components.get(id(node), lambda: (node, analyze()))[1]
+
+
+def _int_param(params: Dict, key: str, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(params[key][0]) if key in params else default
+    except ValueError:
+        raise QueryError(f"{key} must be an integer")
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over the server's CrawlQueryService.
+
+    GET  /health
+    GET  /views
+    GET  /nodes?view=&filter=&offset=&limit=&fields=id,url (fields=* for full nodes)
+    GET  /nodes/{id}?view=
+    GET  /nodes/{id}/neighborhood?view=&depth=&direction=out|in|both&limit=
+    GET  /nodes/{id}/components?view=
+    POST /crawls  {"path": "crawl.json.gz"} (relative to the service's load_dir; disabled without one)
+    """
+
+    # Keep-alive, so dashboards and CI jobs reuse one connection for many queries; idle
+    # connections are closed after the timeout so they do not hold a worker
+    protocol_version = "HTTP/1.1"
+    timeout = QUERY_SERVICE_IDLE_TIMEOUT
+    # Headers and body are separate writes; without this, Nagle plus delayed ACKs add ~40ms per reply
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._respond(self._route_get)
+
+    def do_POST(self):
+        self._respond(self._route_post)
+
+    def _route_get(self, parts: List[str], params: Dict) -> Dict:
+        service: CrawlQueryService = self.server.service
+        view = params.get('view', [None])[0]
+        if parts == ['health']:
+            return {'status': 'ok', 'crawls': len(service.workspace.crawl_names())}
+        if parts == ['views']:
+            return {'views': service.views()}
+        if parts and parts[0] == 'nodes':
+            if len(parts) == 1:
+                fields = params['fields'][0].split(',') if 'fields' in params else None
+                return service.filter(params.get('filter', [None])[0], view, _int_param(params, 'offset', 0),
+                                      _int_param(params, 'limit', None), fields)
+            if len(parts) == 2:
+                return service.node(parts[1], view)
+            if len(parts) == 3 and parts[2] == 'neighborhood':
+                return service.neighborhood(parts[1], view, _int_param(params, 'depth', 1),
+                                            params.get('direction', ['both'])[0], _int_param(params, 'limit', None))
+            if len(parts) == 3 and parts[2] == 'components':
+                return service.components(parts[1], view)
+        raise QueryError(f"Not found: /{'/'.join(parts)}", 404)
+
+    def _route_post(self, parts: List[str], params: Dict) -> Dict:
+        if parts != ['crawls']:
+            raise QueryError(f"Not found: /{'/'.join(parts)}", 404)
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise QueryError("Request body must be JSON")
+        if not isinstance(body, dict) or not isinstance(body.get('path'), str):
+            raise QueryError('Expected {"path": "<crawl file>"}')
+        return {'loaded': self.server.service.load_requested(body['path'])}
+
+    def _respond(self, route: Callable):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        try:
+            status, payload = 200, route(parts, parse_qs(url.query))
+        except QueryError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ValueError as e:
+            # FilterSyntaxError and other bad input from the query layer
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer whose connections are handled on a fixed pool of worker threads.
+
+    Unlike ThreadingHTTPServer, which starts a thread per connection, at most
+    `workers` connections are served at once; the rest wait in the pool's queue.
+    """
+
+    def __init__(self, address: Tuple[str, int], service: CrawlQueryService, workers: int = QUERY_SERVICE_WORKERS,
+                 verbose: bool = False):
+        super().__init__(address, QueryRequestHandler)
+        self.service = service
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-worker")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(paths: List[str], host: str = QUERY_SERVICE_HOST, port: int = QUERY_SERVICE_PORT,
+          workers: int = QUERY_SERVICE_WORKERS, verbose: bool = False, load_dir: Optional[str] = None) -> PooledHTTPServer:
+    """Load crawls and return a server ready for serve_forever()"""
+    service = CrawlQueryService(load_dir=load_dir)
+    for path in paths:
+        service.load(path)
+    return PooledHTTPServer((host, port), service, workers, verbose)
@@ -0,0 +1,164 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+Viewport = Tuple[float, float, float, float]  # (x_min, x_max, y_min, y_max)
+
+class GridSpatialIndex:
+    """Uniform grid pyramid over layout positions.
+
+    Level L splits the layout bounds into 2**L x 2**L cells. Points are sorted by their
+    finest-level cell so a viewport query only touches the cells it overlaps, a
+    summed-area table answers "how many nodes are visible" in O(1), and every level keeps
+    pre-aggregated node counts, centroids, dominant role and cell-to-cell edge weights
+    for zoomed-out rendering.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, edge_src: np.ndarray, edge_dst: np.ndarray,
+                 categories: Optional[np.ndarray] = None, max_level: int = 8):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        self.edge_src = np.asarray(edge_src, dtype=np.int64)
+        self.edge_dst = np.asarray(edge_dst, dtype=np.int64)
+        self.categories = np.zeros(len(self.xs), dtype=np.int64) if categories is None else np.asarray(categories, dtype=np.int64)
+        self.max_level = max_level
+        self.resolution = 2 ** max_level
+
+        if len(self.xs):
+            self.bounds = (self.xs.min(), self.xs.max(), self.ys.min(), self.ys.max())
+        else:
+            self.bounds = (0.0, 1.0, 0.0, 1.0)
+        x_min, x_max, y_min, y_max = self.bounds
+        # Pad degenerate (single point / collinear) layouts so every cell has a positive size
+        self.cell_w = max(x_max - x_min, 1e-9) / self.resolution
+        self.cell_h = max(y_max - y_min, 1e-9) / self.resolution
+
+        self.cx = self._column(self.xs)
+        self.cy = self._row(self.ys)
+        codes = self.cx * self.resolution + self.cy
+        self.order = np.argsort(codes, kind='stable')
+        self.sorted_codes = codes[self.order]
+
+        counts = np.bincount(codes, minlength=self.resolution ** 2).reshape(self.resolution, self.resolution)
+        self.summed_area = np.zeros((self.resolution + 1, self.resolution + 1), dtype=np.int64)
+        self.summed_area[1:, 1:] = counts.cumsum(axis=0).cumsum(axis=1)
+
+        self._edges_by_node = None
+        self._levels: Dict[int, Dict] = {}
+
+    @classmethod
+    def from_positions(cls, node_ids: List, positions: Dict, edges: List[Tuple], categories: Optional[np.ndarray] = None, max_level: int = 8) -> 'GridSpatialIndex':
+        index = {n: i for i, n in enumerate(node_ids)}
+        coords = np.array([positions[n] for n in node_ids], dtype=np.float64).reshape(-1, 2)
+        pairs = np.array([(index[u], index[v]) for u, v in edges if u in index and v in index], dtype=np.int64).reshape(-1, 2)
+        return cls(coords[:, 0], coords[:, 1], pairs[:, 0], pairs[:, 1], categories, max_level)
+
+    def _column(self, xs) -> np.ndarray:
+        return np.clip(((np.asarray(xs) - self.bounds[0]) / self.cell_w).astype(np.int64), 0, self.resolution - 1)
+
+    def _row(self, ys) -> np.ndarray:
+        return np.clip(((np.asarray(ys) - self.bounds[2]) / self.cell_h).astype(np.int64), 0, self.resolution - 1)
+
+    def _cell_range(self, viewport: Viewport) -> Tuple[int, int, int, int]:
+        x0, x1, y0, y1 = viewport
+        return int(self._column(x0)), int(self._column(x1)), int(self._row(y0)), int(self._row(y1))
+
+    def viewport_at(self, center_x: float, center_y: float, zoom: float) -> Viewport:
+        """Viewport centred at fractional layout coordinates (0..1) showing 1/zoom of each axis"""
+        x_min, x_max, y_min, y_max = self.bounds
+        half_w = (x_max - x_min) / (2 * zoom)
+        half_h = (y_max - y_min) / (2 * zoom)
+        x = x_min + center_x * (x_max - x_min)
+        y = y_min + center_y * (y_max - y_min)
+        return (x - half_w, x + half_w, y - half_h, y + half_h)
+
+    def count_in_view(self, viewport: Viewport) -> int:
+        """Nodes in the cells overlapping the viewport (an upper bound on the exact count)"""
+        c0, c1, r0, r1 = self._cell_range(viewport)
+        sat = self.summed_area
+        return int(sat[c1 + 1, r1 + 1] - sat[c0, r1 + 1] - sat[c1 + 1, r0] + sat[c0, r0])
+
+    def query(self, viewport: Viewport) -> np.ndarray:
+        """Indices of the points inside the viewport, touching only the overlapping cells"""
+        c0, c1, r0, r1 = self._cell_range(viewport)
+        columns = np.arange(c0, c1 + 1)
+        starts = np.searchsorted(self.sorted_codes, columns * self.resolution + r0, side='left')
+        ends = np.searchsorted(self.sorted_codes, columns * self.resolution + r1, side='right')
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        candidates = self.order[offsets + np.arange(lengths.sum())]
+
+        x0, x1, y0, y1 = viewport
+        xs, ys = self.xs[candidates], self.ys[candidates]
+        return np.sort(candidates[(xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)])
+
+    def incident_edges(self, nodes: np.ndarray, both_endpoints: bool = False) -> np.ndarray:
+        """Edge indices touching the given nodes, gathered through a node -> edge CSR"""
+        if self._edges_by_node is None:
+            endpoints = np.concatenate((self.edge_src, self.edge_dst))
+            edge_ids = np.concatenate((np.arange(len(self.edge_src)), np.arange(len(self.edge_dst))))
+            order = np.argsort(endpoints, kind='stable')
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(endpoints, minlength=len(self.xs)))))
+            self._edges_by_node = (indptr, edge_ids[order])
+
+        indptr, edge_ids = self._edges_by_node
+        starts = indptr[nodes]
+        lengths = indptr[nodes + 1] - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        edges = np.unique(edge_ids[offsets + np.arange(lengths.sum())])
+        if both_endpoints:
+            inside = np.zeros(len(self.xs), dtype=bool)
+            inside[nodes] = True
+            edges = edges[inside[self.edge_src[edges]] & inside[self.edge_dst[edges]]]
+        return edges
+
+    def level_for(self, viewport: Viewport, max_marks: int) -> int:
+        """Finest pyramid level whose cells overlapping the viewport stay within max_marks"""
+        c0, c1, r0, r1 = self._cell_range(viewport)
+        fraction = max((c1 - c0 + 1) * (r1 - r0 + 1), 1) / self.resolution ** 2
+        level = int(np.floor(np.log(max(max_marks, 1) / fraction) / np.log(4)))
+        return int(np.clip(level, 0, self.max_level))
+
+    def aggregate(self, level: int) -> Dict:
+        """Per-cell node counts, centroids and dominant category plus cell-pair edge weights"""
+        if level in self._levels:
+            return self._levels[level]
+
+        shift = self.max_level - level
+        side = 2 ** level
+        cells = (self.cx >> shift) * side + (self.cy >> shift)
+        counts = np.bincount(cells, minlength=side * side)
+        occupied = np.flatnonzero(counts)
+        safe = np.maximum(counts, 1)
+        cx = np.bincount(cells, weights=self.xs, minlength=side * side) / safe
+        cy = np.bincount(cells, weights=self.ys, minlength=side * side) / safe
+
+        num_categories = int(self.categories.max()) + 1 if len(self.categories) else 1
+        by_category = np.bincount(cells * num_categories + self.categories, minlength=side * side * num_categories)
+        dominant = by_category.reshape(side * side, num_categories).argmax(axis=1)
+
+        pair_codes = cells[self.edge_src] * (side * side) + cells[self.edge_dst]
+        pairs, weights = np.unique(pair_codes, return_counts=True)
+
+        self._levels[level] = {
+            'side': side,
+            'cells': occupied,
+            'counts': counts[occupied],
+            'x': cx[occupied],
+            'y': cy[occupied],
+            'category': dominant[occupied],
+            'edge_src_cell': pairs // (side * side),
+            'edge_dst_cell': pairs % (side * side),
+            'edge_weight': weights,
+            'centroid_x': cx,
+            'centroid_y': cy
+        }
+        return self._levels[level]
+
+    def cell_range_at(self, level: int, viewport: Viewport) -> Tuple[int, int, int, int]:
+        shift = self.max_level - level
+        c0, c1, r0, r1 = self._cell_range(viewport)
+        return (c0 >> shift, c1 >> shift, r0 >> shift, r1 >> shift)